@@ -1,28 +1,525 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from fractions import Fraction
+from itertools import combinations
+from math import lcm
+
 import numpy as np
-import nashpy as nash
 
-def solve_nash_equilibrium(matrix1, matrix2):
+import instrumentation
+from support_enumeration import support_enumeration
+from zero_sum import is_strategically_constant_sum, normalize_payoffs, solve_zero_sum_lp
+
+def _to_fraction(value):
+    """
+    Exact rational value of a payoff; floats are read as their shortest decimal repr.
+    """
+    if isinstance(value, (float, np.floating)):
+        return Fraction(repr(float(value)))
+    return Fraction(value)
+
+def _integer_payoffs(matrix):
+    """
+    Scales a payoff matrix to an object array of positive Python ints by a positive
+    affine transformation, which leaves the Nash equilibria unchanged.
+    """
+    fractions = [[_to_fraction(value) for value in row] for row in np.asarray(matrix).tolist()]
+    minimum = min(min(row) for row in fractions)
+    scale = lcm(*(value.denominator for row in fractions for value in row))
+    # Shift so every payoff is at least 1 before scaling
+    return np.array([[int((value - minimum) * scale) + scale for value in row] for row in fractions], dtype=object)
+
+def _lemke_howson_tableaux(matrix1, matrix2):
+    """
+    Integer tableaux of the best-response polytopes P = {x >= 0 : B^T x <= 1} and
+    Q = {y >= 0 : A y <= 1}. Label i < m is x_i in P and the i-th slack of Q, label
+    m + j is the j-th slack of P and y_j in Q.
+
+    Each tableau is a list [T, basis, determinant], where T has one column per label
+    plus the right-hand side and basis[r] is the label that is basic in row r.
+    """
+    A = _integer_payoffs(matrix1)
+    B = _integer_payoffs(matrix2)
+    m, n = A.shape
+
+    P = np.zeros((n, m + n + 1), dtype=object)
+    P[:, :m] = B.T
+    P[:, m:m + n] = np.identity(n, dtype=int)
+    P[:, -1] = 1
+
+    Q = np.zeros((m, m + n + 1), dtype=object)
+    Q[:, :m] = np.identity(m, dtype=int)
+    Q[:, m:m + n] = A
+    Q[:, -1] = 1
+
+    return [P, list(range(m, m + n)), 1], [Q, list(range(m)), 1]
+
+def _pivot(tableau, row, column):
+    """
+    Fraction-free (integer) pivot: every entry stays an exact Python int.
+    """
+    T, basis, determinant = tableau
+    pivot_row = T[row].copy()
+    pivot_value = pivot_row[column]
+    T[:] = (T * pivot_value - np.outer(T[:, column], pivot_row)) // determinant
+    T[row] = pivot_row
+    if pivot_value < 0:
+        # Keep the common denominator positive so entry signs are the true signs
+        T *= -1
+        pivot_value = -pivot_value
+    tableau[2] = pivot_value
+    leaving = basis[row]
+    basis[row] = column
+    return leaving
+
+def _lexicographic_min_ratio_row(tableau, column, initial_basis):
+    """
+    Leaving row of the lexicographic minimum ratio test, which never cycles even on
+    degenerate games.
+    """
+    T = tableau[0]
+    keys = [T.shape[1] - 1] + list(initial_basis)
+    best = None
+    for row in range(T.shape[0]):
+        if T[row, column] <= 0:
+            continue
+        if best is None:
+            best = row
+            continue
+        for key in keys:
+            # Compare T[row, key] / T[row, column] with T[best, key] / T[best, column]
+            difference = T[row, key] * T[best, column] - T[best, key] * T[row, column]
+            if difference != 0:
+                if difference < 0:
+                    best = row
+                break
+    if best is None:
+        raise ValueError("Unbounded pivot column; the payoff matrices are not valid.")
+    return best
+
+def _tableau_strategy(tableau, labels):
+    """
+    Normalised strategy read off the basic variables carrying the given labels.
+    """
+    T, basis, _ = tableau
+    values = [Fraction(0)] * len(labels)
+    for row, label in enumerate(basis):
+        if label in labels:
+            values[labels.index(label)] = Fraction(T[row, -1], T[row, label])
+    total = sum(values)
+    return np.array([value / total for value in values], dtype=object)
+
+def _apply_warm_start(P, Q, warm_start, m):
+    """
+    Pivots the given basis into both tableaux. Returns True if it is a complementary,
+    feasible basis of this game, i.e. it already describes an equilibrium.
+    """
+    for tableau, target in zip((P, Q), warm_start):
+        target = set(target)
+        if len(target) != len(tableau[1]):
+            return False
+        for label in target - set(tableau[1]):
+            rows = [row for row, basic in enumerate(tableau[1])
+                    if basic not in target and tableau[0][row, label] != 0]
+            if not rows:
+                return False
+            _pivot(tableau, rows[0], label)
+        if any(value < 0 for value in tableau[0][:, -1]):
+            return False
+
+    # Complementary: no label basic in both tableaux; non-artificial: some x_i is basic
+    return not set(P[1]) & set(Q[1]) and any(label < m for label in P[1])
+
+def _tableau_equilibrium(P, Q, m, n, exact):
+    """
+    (x, y, basis) read off complementary tableaux, as returned by lemke_howson.
+    """
+    x = _tableau_strategy(P, list(range(m)))
+    y = _tableau_strategy(Q, list(range(m, m + n)))
+    if not exact:
+        x = x.astype(float)
+        y = y.astype(float)
+    return x, y, (tuple(P[1]), tuple(Q[1]))
+
+def lemke_howson(matrix1, matrix2, initial_label=0, warm_start=None, exact=False, stop_event=None):
+    """
+    Finds one Nash equilibrium of a bimatrix game by Lemke-Howson complementary
+    pivoting on exact integer tableaux.
+
+    Parameters:
+    matrix1 (np.array): Payoff matrix for player 1 (ints, floats or Fractions)
+    matrix2 (np.array): Payoff matrix for player 2
+    initial_label (int): Label dropped first, 0..m-1 for player 1's strategies and
+                         m..m+n-1 for player 2's
+    warm_start (tuple): Basis returned for a previous, similar game; used directly
+                        if it is still a feasible complementary basis of this game
+    exact (bool): Return the strategies as arrays of Fractions instead of floats
+    stop_event (threading.Event or multiprocessing.Event): Abandon the search
+                                                          (return None) once it is set
+
+    Returns:
+    tuple: (player 1 strategy, player 2 strategy, basis) where basis can be passed
+           back as warm_start, or None if stopped
+    """
+    if matrix1.shape != matrix2.shape:
+        raise ValueError("The payoff matrices must have the same dimensions.")
+    m, n = matrix1.shape
+    if not 0 <= initial_label < m + n:
+        raise ValueError(f"The initial label must lie between 0 and {m + n - 1}.")
+
+    if warm_start is not None:
+        P, Q = _lemke_howson_tableaux(matrix1, matrix2)
+        if _apply_warm_start(P, Q, warm_start, m):
+            return _tableau_equilibrium(P, Q, m, n, exact)
+
+    P, Q = _lemke_howson_tableaux(matrix1, matrix2)
+    initial_bases = {id(P): list(P[1]), id(Q): list(Q[1])}
+
+    # Label i < m (x_i) starts non-basic in P, label m + j (y_j) in Q
+    tableau, other = (P, Q) if initial_label < m else (Q, P)
+    entering = initial_label
+    pivots = 0
+    while True:
+        if stop_event is not None and stop_event.is_set():
+            instrumentation.count("lemke_howson.pivots", pivots)
+            return None
+        row = _lexicographic_min_ratio_row(tableau, entering, initial_bases[id(tableau)])
+        leaving = _pivot(tableau, row, entering)
+        pivots += 1
+        if leaving == initial_label:
+            break
+        # The leaving label is now duplicated, so it enters the other tableau
+        entering = leaving
+        tableau, other = other, tableau
+    instrumentation.count("lemke_howson.pivots", pivots)
+    instrumentation.count("lemke_howson.paths")
+    return _tableau_equilibrium(P, Q, m, n, exact)
+
+# Stop flag shared with the worker processes of a lemke_howson_first race
+_race_stop_event = None
+
+def _init_race(stop_event):
+    global _race_stop_event
+    _race_stop_event = stop_event
+
+def _race_path(matrix1, matrix2, label, exact, record):
+    """
+    One path of a lemke_howson_first race, with the statistics it recorded in this
+    worker process if record is set (else None).
+    """
+    if not record:
+        return lemke_howson(matrix1, matrix2, label, None, exact, _race_stop_event), None
+    return instrumentation.instrumented(lemke_howson, matrix1, matrix2, label, None, exact, _race_stop_event)
+
+def lemke_howson_first(matrix1, matrix2, labels=None, workers=None, warm_start=None, exact=False):
+    """
+    Runs Lemke-Howson from the given initial labels and returns the first
+    equilibrium that completes. With several labels the paths race on a process
+    pool (the pivoting is pure Python and holds the GIL, so threads would only take
+    turns) and the remaining paths are stopped once one finishes.
+
+    Parameters:
+    matrix1 (np.array): Payoff matrix for player 1
+    matrix2 (np.array): Payoff matrix for player 2
+    labels (list): Initial labels to try (default: label 0 only, a single path)
+    workers (int): Number of worker processes (default: one per label, at most one
+                   per CPU); 1 follows the first label only
+    warm_start (tuple): Basis of a previous, similar game, tried before any pivoting
+    exact (bool): Return the strategies as arrays of Fractions instead of floats
+
+    Returns:
+    tuple: (player 1 strategy, player 2 strategy, basis) of the first equilibrium found
+    """
+    m, n = matrix1.shape
+    if warm_start is not None:
+        P, Q = _lemke_howson_tableaux(matrix1, matrix2)
+        if _apply_warm_start(P, Q, warm_start, m):
+            # The checked tableaux already hold the equilibrium
+            return _tableau_equilibrium(P, Q, m, n, exact)
+    labels = [0] if labels is None else list(labels)
+    if len(labels) == 1 or workers == 1:
+        return lemke_howson(matrix1, matrix2, labels[0], exact=exact)
+
+    stop_event = multiprocessing.Event()
+    executor = ProcessPoolExecutor(max_workers=workers or min(len(labels), os.cpu_count() or 1),
+                                   initializer=_init_race, initargs=(stop_event,))
+    futures = [executor.submit(_race_path, matrix1, matrix2, label, exact, instrumentation.enabled())
+               for label in labels]
+    try:
+        pending = set(futures)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                elif future.result()[0] is not None:
+                    return future.result()[0]
+        raise error
+    finally:
+        # Running paths notice the flag at their next pivot
+        stop_event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        for future in futures:
+            if not future.cancelled() and future.exception() is None and future.result()[1] is not None:
+                instrumentation.merge(future.result()[1])
+
+def _bareiss_solve(matrix, rhs):
+    """
+    Solves an integer system exactly with fraction-free (Bareiss) elimination.
+
+    Parameters:
+    matrix (list of lists): Square matrix of Python ints
+    rhs (list): Right-hand side of Python ints
+
+    Returns:
+    list: Solution as Fractions, or None if the matrix is singular
+    """
+    k = len(matrix)
+    rows = [list(row) + [value] for row, value in zip(matrix, rhs)]
+    previous = 1
+    for column in range(k):
+        pivot = next((row for row in range(column, k) if rows[row][column] != 0), None)
+        if pivot is None:
+            return None
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        for row in range(column + 1, k):
+            # Exact division: every entry stays an integer minor of the matrix
+            rows[row] = [(rows[row][j] * rows[column][column] - rows[column][j] * rows[row][column]) // previous
+                         for j in range(k + 1)]
+        previous = rows[column][column]
+
+    solution = [Fraction(0)] * k
+    for row in range(k - 1, -1, -1):
+        value = Fraction(rows[row][k]) - sum(rows[row][j] * solution[j] for j in range(row + 1, k))
+        solution[row] = value / rows[row][row]
+    return solution
+
+def _float_vertex_candidates(C, variable_labels, constraint_labels, tol, chunk_size):
+    """
+    Float prefilter over the bases of the polytope {z >= 0 : C z <= 1}. A basis is a
+    support S and a set T of tight constraints with |S| = |T|, and its vertex solves
+    C[T, S] z_S = 1.
+
+    Clearly infeasible bases are dropped. Every other basis is kept with a label mask
+    that may over-approximate the labels (near-zero values count as zero), so pairing
+    on these masks never misses an equilibrium. Bases whose float system is singular
+    are left to the exact path.
+
+    Returns:
+    list: (support, tight constraints, possible label mask) for every candidate
+    """
+    num_constraints, num_variables = C.shape
+    scaled = C / C.max()
+    candidates = []
+    for k in range(1, min(num_constraints, num_variables) + 1):
+        supports = np.array(list(combinations(range(num_variables), k)))
+        tights = np.array(list(combinations(range(num_constraints), k)))
+        total = len(supports) * len(tights)
+        for start in range(0, total, chunk_size):
+            pairs = np.arange(start, min(start + chunk_size, total))
+            S = supports[pairs // len(tights)]
+            T = tights[pairs % len(tights)]
+            system = scaled[T[:, :, None], S[:, None, :]]
+            singular_values = np.linalg.svd(system, compute_uv=False)
+            regular = singular_values[:, -1] > 1e-9 * singular_values[:, 0]
+            for index in np.flatnonzero(~regular).tolist():
+                candidates.append((tuple(S[index].tolist()), tuple(T[index].tolist()), None))
+
+            S, T = S[regular], T[regular]
+            z_S = np.linalg.solve(system[regular], np.ones((len(S), k, 1)))[:, :, 0]
+            z = np.zeros((len(S), num_variables))
+            np.put_along_axis(z, S, z_S, axis=1)
+            slack = 1 - z @ scaled.T
+            feasible = (z_S >= -tol).all(axis=1) & (slack >= -tol).all(axis=1)
+
+            zero = np.abs(z) <= tol
+            tight = np.abs(slack) <= tol
+            for index in np.flatnonzero(feasible).tolist():
+                mask = 0
+                for variable in np.flatnonzero(zero[index]).tolist():
+                    mask |= 1 << variable_labels[variable]
+                for constraint in np.flatnonzero(tight[index]).tolist():
+                    mask |= 1 << constraint_labels[constraint]
+                candidates.append((tuple(S[index].tolist()), tuple(T[index].tolist()), mask))
+    return candidates
+
+def _exact_vertex(C, support, tight, variable_labels, constraint_labels):
+    """
+    Exact vertex of {z >= 0 : C z <= 1} for one basis, with its exact label mask.
+
+    Returns:
+    tuple: (vertex as a tuple of Fractions, label mask), or None if the basis does not
+           give a vertex with positive values on the whole support
+    """
+    solution = _bareiss_solve([[C[row][column] for column in support] for row in tight], [1] * len(tight))
+    if solution is None or any(value <= 0 for value in solution):
+        return None
+    z = [Fraction(0)] * len(C[0])
+    for column, value in zip(support, solution):
+        z[column] = value
+
+    mask = 0
+    for variable, value in enumerate(z):
+        if value == 0:
+            mask |= 1 << variable_labels[variable]
+    for constraint, row in enumerate(C):
+        load = sum(row[column] * z[column] for column in support)
+        if load > 1:
+            return None
+        if load == 1:
+            mask |= 1 << constraint_labels[constraint]
+    return tuple(z), mask
+
+def exact_vertex_enumeration(matrix1, matrix2, tol=1e-9, chunk_size=2 ** 14):
+    """
+    Finds all extreme Nash equilibria with exact rational arithmetic, so degenerate
+    games get every equilibrium exactly once.
+
+    Equilibria are the completely labelled vertex pairs of the best-response polytopes
+    P = {x >= 0 : B^T x <= 1} and Q = {y >= 0 : A y <= 1} of the integer-scaled game.
+    A float pass discards infeasible bases and pairs the rest on over-approximated
+    labels. Only vertices that could be part of an equilibrium are recomputed with
+    Bareiss elimination, and the exact labels and coordinates decide the final pairs.
+
+    Parameters:
+    matrix1 (np.array): Payoff matrix for player 1 (ints, floats or Fractions)
+    matrix2 (np.array): Payoff matrix for player 2
+    tol (float): Tolerance of the float prefilter; it only decides what is
+                 recomputed exactly, never what is reported
+    chunk_size (int): Number of bases solved in one batched float call
+
+    Returns:
+    list: Equilibria as (player 1 strategy, player 2 strategy) arrays of Fractions
+    """
+    if matrix1.shape != matrix2.shape:
+        raise ValueError("The payoff matrices must have the same dimensions.")
+    m, n = matrix1.shape
+    A = _integer_payoffs(matrix1)
+    B = _integer_payoffs(matrix2)
+    full = (1 << (m + n)) - 1
+
+    # In P, x_i carries label i and column j of B the label m + j; Q is the mirror image
+    polytopes = [(B.T.tolist(), list(range(m)), list(range(m, m + n))),
+                 (A.tolist(), list(range(m, m + n)), list(range(m)))]
+    candidates = [_float_vertex_candidates(np.array(C, dtype=float), variable_labels, constraint_labels, tol,
+                                           chunk_size)
+                  for C, variable_labels, constraint_labels in polytopes]
+
+    exact_cache = [{}, {}]
+
+    def exact(player, support, tight):
+        key = (support, tight)
+        if key not in exact_cache[player]:
+            exact_cache[player][key] = _exact_vertex(*((polytopes[player][0], support, tight)
+                                                      + polytopes[player][1:]))
+        return exact_cache[player][key]
+
+    # Singular float systems have no reliable labels, so they are resolved exactly first
+    for player in (0, 1):
+        candidates[player] = [(support, tight, mask if mask is not None else
+                               (exact(player, support, tight) or (None, None))[1])
+                              for support, tight, mask in candidates[player]]
+        candidates[player] = [candidate for candidate in candidates[player] if candidate[2] is not None]
+
+    dtype = np.uint64 if m + n <= 64 else object
+    y_masks = np.array([mask for _, _, mask in candidates[1]], dtype=dtype)
+    equilibria = {}
+    for support, tight, mask in candidates[0]:
+        partners = np.flatnonzero((y_masks | dtype(mask)) == dtype(full)) if len(y_masks) else []
+        if not len(partners):
+            continue
+        x_vertex = exact(0, support, tight)
+        if x_vertex is None:
+            continue
+        for partner in partners.tolist():
+            y_vertex = exact(1, *candidates[1][partner][:2])
+            if y_vertex is not None and x_vertex[1] | y_vertex[1] == full:
+                equilibria.setdefault((x_vertex[0], y_vertex[0]), None)
+
+    result = []
+    for x, y in equilibria:
+        x_total, y_total = sum(x), sum(y)
+        result.append((np.array([value / x_total for value in x], dtype=object),
+                       np.array([value / y_total for value in y], dtype=object)))
+    return result
+
+def vertex_enumeration(matrix1, matrix2):
+    """
+    All Nash equilibria of a nondegenerate bimatrix game, by nashpy's vertex
+    enumeration.
+
+    Parameters:
+    matrix1 (np.array): Payoff matrix for player 1
+    matrix2 (np.array): Payoff matrix for player 2
+
+    Returns:
+    list: Equilibria as (x, y) pairs of mixed strategies
+    """
+    import nashpy as nash
+
+    with instrumentation.timer("nash.vertex_enumeration"):
+        return list(nash.Game(matrix1, matrix2).vertex_enumeration())
+
+def solve_nash_equilibrium(matrix1, matrix2, method="auto", exact=False):
     """
     Solve the Nash equilibrium for a two-player game using different methods.
     
     Parameters:
     matrix1 (np.array): Payoff matrix for player 1
     matrix2 (np.array): Payoff matrix for player 2
+    method (str): "enumeration" to list all equilibria with support and vertex
+                  enumeration, "lemke-howson" to find one equilibrium fast,
+                  "minimax" to solve a constant-sum game (up to rescaling each
+                  player's payoffs) with a single linear program, or "auto" to use
+                  "minimax" for such games and "enumeration" for all others
+    exact (bool): Compute in rational arithmetic and return Fractions; enumeration
+                  then runs exact vertex enumeration only, which lists every extreme
+                  equilibrium of degenerate games exactly once
     
+    Every equilibrium of a constant-sum game pays the same value, so "auto" (and
+    "minimax") return the one optimal pair under "Minimax LP", while enumeration
+    lists each extreme equilibrium under "Support Enumeration" and "Vertex
+    Enumeration". Exact arithmetic always enumerates.
+
     Returns:
     dict: A dictionary containing Nash equilibria found using different methods.
     """
     # Validate input matrices
     if matrix1.shape != matrix2.shape:
         raise ValueError("The payoff matrices must have the same dimensions.")
-    
-    game = nash.Game(matrix1, matrix2)
-    
+
+    if method == "lemke-howson":
+        with instrumentation.timer("nash.lemke_howson"):
+            x, y, _ = lemke_howson_first(matrix1, matrix2, exact=exact)
+        return {"Lemke-Howson": [(x, y)]}
+    if method == "auto":
+        # Decided on rescaled payoffs, as EquilibriumCache keys games, so that games
+        # sharing a cache entry are all routed the same way
+        constant_sum = not exact and is_strategically_constant_sum(matrix1, matrix2)
+        method = "minimax" if constant_sum else "enumeration"
+    if method == "minimax":
+        if exact:
+            raise ValueError("The minimax method does not support exact arithmetic.")
+        if not is_strategically_constant_sum(matrix1, matrix2):
+            raise ValueError("The minimax method needs a constant-sum game (up to rescaling each player's "
+                             "payoffs).")
+        with instrumentation.timer("nash.minimax"):
+            x, y, _ = solve_zero_sum_lp(normalize_payoffs(matrix1))
+        return {"Minimax LP": [(x, y)]}
+    if method != "enumeration":
+        raise ValueError(f"Unknown method: {method}")
+    if exact:
+        with instrumentation.timer("nash.exact_vertex_enumeration"):
+            return {"Exact Vertex Enumeration": exact_vertex_enumeration(matrix1, matrix2)}
+
     # Solve using support enumeration
-    support_equilibria = list(game.support_enumeration())
+    with instrumentation.timer("nash.support_enumeration"):
+        support_equilibria = support_enumeration(matrix1, matrix2)
     
     # Solve using vertex enumeration
-    vertex_equilibria = list(game.vertex_enumeration())
+    vertex_equilibria = vertex_enumeration(matrix1, matrix2)
     
     return {
         "Support Enumeration": support_equilibria,
@@ -51,23 +548,24 @@ test_cases = [
     (np.array([[1, 2, 3], [4, 5, 6], [7, 8, 9]]), np.array([[9, 8, 7], [6, 5, 4], [3, 2, 1]]))
 ]
 
-# Run predefined test cases
-for i, (A, B) in enumerate(test_cases, 1):
-    print(f"\nTest Case {i}:")
-    equilibria = solve_nash_equilibrium(A, B)
+if __name__ == "__main__":
+    # Run predefined test cases
+    for i, (A, B) in enumerate(test_cases, 1):
+        print(f"\nTest Case {i}:")
+        equilibria = solve_nash_equilibrium(A, B)
+        print("Nash Equilibria found:")
+        for method, eqs in equilibria.items():
+            print(f"\nMethod: {method}")
+            for eq in eqs:
+                print(f"  {eq}")
+
+    # Allow user input for custom payoff matrices
+    print("\n--- User-defined Game ---")
+    A_user, B_user = get_user_input_matrix()
+    equilibria_user = solve_nash_equilibrium(A_user, B_user)
+
     print("Nash Equilibria found:")
-    for method, eqs in equilibria.items():
+    for method, eqs in equilibria_user.items():
         print(f"\nMethod: {method}")
         for eq in eqs:
             print(f"  {eq}")
-
-# Allow user input for custom payoff matrices
-print("\n--- User-defined Game ---")
-A_user, B_user = get_user_input_matrix()
-equilibria_user = solve_nash_equilibrium(A_user, B_user)
-
-print("Nash Equilibria found:")
-for method, eqs in equilibria_user.items():
-    print(f"\nMethod: {method}")
-    for eq in eqs:
-        print(f"  {eq}")
@@ -1,9 +1,88 @@
+import math
+import os
+from collections import deque
+from statistics import NormalDist
+
 import numpy as np
-import nashpy as nash
-import warnings
 
-# Suppress runtime warnings from Nashpy
-warnings.filterwarnings("ignore", category=RuntimeWarning)
+from game_store import default_block_size, open_game
+
+def batch_pure_nash_equilibria(A, B):
+    """
+    Finds every pure Nash equilibrium in a whole stack of two-player games at once.
+
+    Parameters:
+    A (np.array): Payoff matrices for Player 1, shape (trials, n, m) or (n, m)
+    B (np.array): Payoff matrices for Player 2, same shape as A
+
+    Returns:
+    tuple: (has_equilibrium, counts, locations) where has_equilibrium holds one bool
+           per game, counts the number of pure equilibria per game, and locations is
+           an array of (game, row, column) indices of every pure equilibrium
+    """
+    A = np.asarray(A)
+    B = np.asarray(B)
+    if A.shape != B.shape:
+        raise ValueError("The payoff matrices must have the same dimensions.")
+    if A.ndim == 2:
+        A = A[np.newaxis]
+        B = B[np.newaxis]
+
+    # Column maxima of A are Player 1's best responses, row maxima of B are Player 2's
+    is_equilibrium = (A >= A.max(axis=1, keepdims=True)) & (B >= B.max(axis=2, keepdims=True))
+
+    counts = np.count_nonzero(is_equilibrium, axis=(1, 2))
+    return counts > 0, counts, np.argwhere(is_equilibrium)
+
+def find_pure_nash_equilibria_blocked(A, B, block_size=None):
+    """
+    Finds the pure Nash equilibria of one large two-player game row block by row block,
+    so A and B can be memory maps that do not fit in RAM.
+
+    Parameters:
+    A (np.array): Payoff matrix for Player 1 (may be a np.memmap)
+    B (np.array): Payoff matrix for Player 2 (may be a np.memmap)
+    block_size (int): Number of rows read at a time
+
+    Returns:
+    np.array: (row, column) indices of every pure Nash equilibrium
+    """
+    if A.shape != B.shape:
+        raise ValueError("The payoff matrices must have the same dimensions.")
+    if block_size is None:
+        block_size = default_block_size(A)
+
+    # Column maxima of A span all rows, so stream them first
+    column_max = None
+    for start in range(0, A.shape[0], block_size):
+        block_max = np.asarray(A[start:start + block_size]).max(axis=0)
+        column_max = block_max if column_max is None else np.maximum(column_max, block_max)
+
+    locations = []
+    for start in range(0, A.shape[0], block_size):
+        A_block = np.asarray(A[start:start + block_size])
+        B_block = np.asarray(B[start:start + block_size])
+        is_equilibrium = (A_block >= column_max) & (B_block >= B_block.max(axis=1, keepdims=True))
+        block_locations = np.argwhere(is_equilibrium)
+        block_locations[:, 0] += start
+        locations.append(block_locations)
+    if not locations:
+        return np.empty((0, 2), dtype=np.intp)
+    return np.concatenate(locations)
+
+def find_pure_nash_equilibria_from_file(path, block_size=None):
+    """
+    Pure Nash equilibria of a two-player game stored with game_store.save_game.
+
+    Parameters:
+    path (str): Path of the game file
+    block_size (int): Number of rows read at a time
+
+    Returns:
+    np.array: (row, column) indices of every pure Nash equilibrium
+    """
+    A, B = open_game(path)
+    return find_pure_nash_equilibria_blocked(A, B, block_size)
 
 def has_pure_nash_equilibrium(A, B):
     """
@@ -17,35 +96,180 @@ def has_pure_nash_equilibrium(A, B):
     Returns:
     bool: True if there exists at least one pure Nash equilibrium, False otherwise
     """
-    num_strategies = A.shape[0]
+    has_equilibrium, _, _ = batch_pure_nash_equilibria(A, B)
+    return bool(has_equilibrium[0])
+
+def _count_pure_nash(n, trials, batch_size, rng):
+    """
+    Counts random n x n games with a pure Nash equilibrium among `trials` games drawn
+    from rng (the global np.random state if None), batch_size games at a time.
+    """
+    if batch_size is None:
+        batch_size = max(1, 2 ** 22 // (n * n))
+    random = np.random.random_sample if rng is None else rng.random
 
-    for i in range(num_strategies):
-        for j in range(num_strategies):
-            # Check if player 1 has the best response at (i, j)
-            if A[i, j] >= np.max(A[:, j]) and B[i, j] >= np.max(B[i, :]):
-                return True  # Found a pure Nash equilibrium
-    return False
+    count = 0
+    for start in range(0, trials, batch_size):
+        size = min(batch_size, trials - start)
+        A = random((size, n, n))
+        B = random((size, n, n))
+        has_equilibrium, _, _ = batch_pure_nash_equilibria(A, B)
+        count += int(np.count_nonzero(has_equilibrium))
+    return count
 
-def estimate_pure_nash_probability(n, trials=10000):
+def estimate_pure_nash_probability(n, trials=10000, batch_size=None, rng=None):
     """
     Estimates the probability of a pure Nash equilibrium existing in an n x n random game.
 
     Parameters:
     n (int): Number of strategies per player
     trials (int): Number of random games to simulate
+    batch_size (int): Number of games generated and checked together (default keeps
+                      each batch at roughly 2**22 payoff entries)
+    rng (np.random.Generator): Source of the random games (default: the global
+                               np.random state)
 
     Returns:
     float: Estimated probability of a pure Nash equilibrium existing
     """
+    if trials < 1:
+        raise ValueError("At least one trial is needed.")
+    return _count_pure_nash(n, trials, batch_size, rng) / trials
+
+def _count_pure_nash_chunk(n, trials, seed_sequence, batch_size=None):
+    """
+    Counts random n x n games with a pure Nash equilibrium using its own random stream.
+    """
+    return _count_pure_nash(n, trials, batch_size, np.random.default_rng(seed_sequence))
+
+def wilson_interval(successes, trials, confidence=0.95):
+    """
+    Wilson score confidence interval for a binomial proportion.
+
+    Parameters:
+    successes (int): Number of successful trials
+    trials (int): Total number of trials
+    confidence (float): Confidence level of the interval
+
+    Returns:
+    tuple: Lower and upper bound of the interval
+    """
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / trials
+    denominator = 1 + z ** 2 / trials
+    center = (p + z ** 2 / (2 * trials)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / trials + z ** 2 / (4 * trials ** 2)) / denominator
+    return center - half_width, center + half_width
+
+def iter_pure_nash_estimates(n, trials=10000, chunk_size=None, workers=None, seed=None,
+                             confidence=0.95, target_half_width=None):
+    """
+    Runs the pure Nash Monte Carlo estimate in chunks on a process pool and yields
+    the running estimate after every chunk.
+
+    Every chunk draws from its own stream spawned from one SeedSequence, and chunks
+    are accumulated in order, so the sequence of estimates (including the point where
+    early stopping kicks in) is identical for any number of workers.
+
+    Parameters:
+    n (int): Number of strategies per player
+    trials (int): Maximum number of random games to simulate
+    chunk_size (int): Number of games per chunk
+    workers (int): Number of worker processes (default: all CPUs)
+    seed (int): Seed of the root SeedSequence
+    confidence (float): Confidence level of the reported interval
+    target_half_width (float): Stop once the interval half-width is below this value
+
+    Yields:
+    dict: Trials done, successes, estimate, confidence interval and its half-width
+    """
+    if trials < 1:
+        raise ValueError("At least one trial is needed.")
+    if chunk_size is None:
+        chunk_size = max(1, 2 ** 24 // (n * n))
+    chunk_size = min(chunk_size, trials)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    sizes = [chunk_size] * (trials // chunk_size)
+    if trials % chunk_size:
+        sizes.append(trials % chunk_size)
+    streams = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    done = 0
     count = 0
-    for _ in range(trials):
-        A = np.random.rand(n, n)
-        B = np.random.rand(n, n)
-        if has_pure_nash_equilibrium(A, B):
-            count += 1
-    return count / trials
-
-# Running the probability estimation for different values of n
-for n in [2, 3, 5, 10]:
-    probability = estimate_pure_nash_probability(n, trials=1000)
-    print(f"Estimated probability of pure Nash equilibrium for {n}x{n} game: {probability:.4f}")
\ No newline at end of file
+
+    def partial_result():
+        low, high = wilson_interval(count, done, confidence)
+        return {
+            "trials": done,
+            "successes": count,
+            "estimate": count / done,
+            "confidence_interval": (low, high),
+            "half_width": (high - low) / 2,
+        }
+
+    if workers == 1:
+        for size, stream in zip(sizes, streams):
+            count += _count_pure_nash_chunk(n, size, stream)
+            done += size
+            result = partial_result()
+            yield result
+            if target_half_width is not None and result["half_width"] < target_half_width:
+                return
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Keep a bounded window of chunks in flight so early stopping wastes little work
+        pending = deque()
+        next_chunk = 0
+        try:
+            while next_chunk < len(sizes) or pending:
+                while next_chunk < len(sizes) and len(pending) < 2 * workers:
+                    pending.append((sizes[next_chunk], executor.submit(
+                        _count_pure_nash_chunk, n, sizes[next_chunk], streams[next_chunk])))
+                    next_chunk += 1
+
+                size, future = pending.popleft()
+                count += future.result()
+                done += size
+                result = partial_result()
+                yield result
+                if target_half_width is not None and result["half_width"] < target_half_width:
+                    return
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+def parallel_estimate_pure_nash_probability(n, trials=10000, chunk_size=None, workers=None, seed=None,
+                                            confidence=0.95, target_half_width=None, callback=None):
+    """
+    Seeded, parallel version of estimate_pure_nash_probability with a confidence interval.
+
+    Parameters:
+    n (int): Number of strategies per player
+    trials (int): Maximum number of random games to simulate
+    chunk_size (int): Number of games per chunk
+    workers (int): Number of worker processes (default: all CPUs)
+    seed (int): Seed of the root SeedSequence
+    confidence (float): Confidence level of the reported interval
+    target_half_width (float): Stop once the interval half-width is below this value
+    callback (callable): Called with every partial result as chunks complete
+
+    Returns:
+    dict: Final estimate, confidence interval, half-width and number of trials used
+    """
+    result = None
+    for result in iter_pure_nash_estimates(n, trials, chunk_size, workers, seed,
+                                           confidence, target_half_width):
+        if callback is not None:
+            callback(result)
+    return result
+
+if __name__ == "__main__":
+    # Running the probability estimation for different values of n
+    for n in [2, 3, 5, 10]:
+        probability = estimate_pure_nash_probability(n, trials=1000)
+        print(f"Estimated probability of pure Nash equilibrium for {n}x{n} game: {probability:.4f}")
@@ -1,6 +1,78 @@
 import numpy as np
-import itertools
-from scipy.optimize import linprog
+
+from game_store import default_block_size, open_game
+
+def find_pure_nash_equilibria(payoff_tensors, block_size=None):
+    """
+    Finds every pure Nash equilibrium of an N-player game given as payoff tensors.
+    Each player's best-response value is computed once along its own axis and all
+    profiles are checked with one broadcasted comparison per player.
+
+    Parameters:
+    payoff_tensors (list of np.array): One payoff tensor per player, all of shape
+                                       (s_1, ..., s_N); axis p is player p's strategy
+    block_size (int): If given, scan the tensors in blocks of this many strategies of
+                      the first player so only one block per player is held in memory
+                      (works with np.memmap tensors)
+
+    Returns:
+    list: List of strategy profiles that are pure Nash equilibria
+    """
+    num_players = len(payoff_tensors)
+    shape = payoff_tensors[0].shape
+    if len(shape) != num_players:
+        raise ValueError("Each payoff tensor must have one axis per player.")
+    if any(tensor.shape != shape for tensor in payoff_tensors):
+        raise ValueError("All payoff tensors must have the same shape.")
+
+    if block_size is None or block_size >= shape[0]:
+        return _pure_nash_block(payoff_tensors, 0, shape[0], None)
+
+    # First pass: the first player's best-response value, which spans all blocks
+    first_max = None
+    for start in range(0, shape[0], block_size):
+        block_max = np.asarray(payoff_tensors[0][start:start + block_size]).max(axis=0, keepdims=True)
+        first_max = block_max if first_max is None else np.maximum(first_max, block_max)
+
+    # Second pass: every other player's best response lies entirely inside a block
+    equilibria = []
+    for start in range(0, shape[0], block_size):
+        stop = min(start + block_size, shape[0])
+        equilibria.extend(_pure_nash_block(payoff_tensors, start, stop, first_max))
+    return equilibria
+
+def _pure_nash_block(payoff_tensors, start, stop, first_max):
+    """
+    Pure Nash equilibria whose first-player strategy lies in [start, stop).
+    """
+    block = np.asarray(payoff_tensors[0][start:stop])
+    if first_max is None:
+        first_max = block.max(axis=0, keepdims=True)
+    is_equilibrium = block >= first_max
+
+    for player in range(1, len(payoff_tensors)):
+        block = np.asarray(payoff_tensors[player][start:stop])
+        is_equilibrium &= block >= block.max(axis=player, keepdims=True)
+
+    locations = np.argwhere(is_equilibrium)
+    locations[:, 0] += start
+    return [tuple(int(s) for s in profile) for profile in locations]
+
+def find_pure_nash_equilibria_from_file(path, max_block_bytes=2 ** 28):
+    """
+    Pure Nash equilibria of an N-player game stored with game_store.save_game,
+    scanned block by block through memory maps.
+
+    Parameters:
+    path (str): Path of the game file
+    max_block_bytes (int): Memory budget for one block of one player's tensor
+
+    Returns:
+    list: List of strategy profiles that are pure Nash equilibria
+    """
+    payoff_tensors = open_game(path)
+    block_size = default_block_size(payoff_tensors[0], max_block_bytes)
+    return find_pure_nash_equilibria(payoff_tensors, block_size=block_size)
 
 def find_nash_equilibrium_three_player(payoff_matrices):
     """
@@ -14,36 +86,17 @@ def find_nash_equilibrium_three_player(payoff_matrices):
     list: List of strategy profiles that are Nash equilibria
     """
     A, B, C = payoff_matrices
-    num_strategies = A.shape[0]
-    equilibria = []
-    
-    for strategies in itertools.product(range(num_strategies), repeat=3):
-        i, j, k = strategies
-        
-        # Best response check for Player 1
-        if A[i, j, k] < max(A[:, j, k]):
-            continue
-        
-        # Best response check for Player 2
-        if B[i, j, k] < max(B[i, :, k]):
-            continue
-        
-        # Best response check for Player 3
-        if C[i, j, k] < max(C[i, j, :]):
-            continue
-        
-        equilibria.append(strategies)
-    
-    return equilibria
+    return find_pure_nash_equilibria([A, B, C])
 
-# Example payoff matrices for a 3x3x3 three-player zero-sum game
-A = np.random.randint(-5, 5, (3, 3, 3))
-B = np.random.randint(-5, 5, (3, 3, 3))
-C = -(A + B)  # Ensure zero-sum condition
+if __name__ == "__main__":
+    # Example payoff matrices for a 3x3x3 three-player zero-sum game
+    A = np.random.randint(-5, 5, (3, 3, 3))
+    B = np.random.randint(-5, 5, (3, 3, 3))
+    C = -(A + B)  # Ensure zero-sum condition
 
-# Compute Nash equilibria
-nash_equilibria = find_nash_equilibrium_three_player((A, B, C))
+    # Compute Nash equilibria
+    nash_equilibria = find_nash_equilibrium_three_player((A, B, C))
 
-print("Nash Equilibria:")
-for eq in nash_equilibria:
-    print(eq)
\ No newline at end of file
+    print("Nash Equilibria:")
+    for eq in nash_equilibria:
+        print(eq)
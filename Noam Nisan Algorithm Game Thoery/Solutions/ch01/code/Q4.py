@@ -1,40 +1,230 @@
-import networkx as nx
+from collections import deque
+
+import numpy as np
+
+import instrumentation
+from csr_graph import CSRGraph
+
+def _payoff_tables(nodes, payoffs):
+    """
+    One payoff table per node index. Accepts graphical-game tables {node: array} and
+    the original {(player, strategy): payoff} format, where a payoff depends only on
+    the player's own strategy.
+    """
+    first_key = next(iter(payoffs))
+    if isinstance(first_key, tuple) and len(first_key) == 2 and np.ndim(payoffs[first_key]) == 0:
+        num_strategies = {}
+        for node, strategy in payoffs:
+            num_strategies[node] = max(num_strategies.get(node, 0), strategy + 1)
+        tables = {node: np.full(count, -np.inf) for node, count in num_strategies.items()}
+        for (node, strategy), payoff in payoffs.items():
+            tables[node][strategy] = payoff
+        return [tables[node] for node in nodes]
+    return [np.asarray(payoffs[node]) for node in nodes]
+
+def _tree_order(indptr, indices):
+    """
+    Iterative BFS over every component: returns the visiting order and parent list
+    (-1 for component roots). Raises ValueError if the graph has a cycle.
+    """
+    num_nodes = len(indptr) - 1
+    parent = [-1] * num_nodes
+    visited = [False] * num_nodes
+    order = []
+    for root in range(num_nodes):
+        if visited[root]:
+            continue
+        visited[root] = True
+        queue = deque([root])
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for neighbor in indices[indptr[node]:indptr[node + 1]]:
+                if neighbor == parent[node]:
+                    continue
+                if visited[neighbor]:
+                    raise ValueError("The graph must be a tree (or a forest).")
+                visited[neighbor] = True
+                parent[neighbor] = node
+                queue.append(neighbor)
+    return order, parent
+
+def _solve_graphical_tree(indptr, indices, tables):
+    """
+    Bottom-up tabular DP for pure equilibria of a graphical game on a tree.
+
+    feasible[v][s_p, s_v] is True if v's subtree can be put in equilibrium with v
+    playing s_v while its parent plays s_p (s_p is always 0 for a root). Work per
+    node is proportional to the size of its payoff table.
+
+    Returns:
+    np.array: A pure Nash equilibrium (strategy per node index), or None
+    """
+    # Plain Python ints are much cheaper than NumPy scalars in the per-node loops
+    indptr = indptr.tolist()
+    indices = indices.tolist()
+    order, parent = _tree_order(indptr, indices)
+    num_nodes = len(tables)
+    if instrumentation.enabled():
+        # The depth a recursive version of this DP would reach
+        depth = [0] * num_nodes
+        for v in order:
+            if parent[v] >= 0:
+                depth[v] = depth[parent[v]] + 1
+        instrumentation.maximum("tree.depth", max(depth))
+        instrumentation.count("tree.nodes", num_nodes)
+    feasible = [None] * num_nodes
+    witness = [None] * num_nodes
+
+    for v in reversed(order):
+        neighbors = indices[indptr[v]:indptr[v + 1]]
+        table = tables[v]
+        best_response = table >= table.max(axis=0, keepdims=True)
+        children = [c for c in neighbors if c != parent[v]]
+
+        if table.ndim == 1:
+            # Payoff ignores the neighbours: v can play any best response as long as
+            # every child subtree has some feasible strategy against it
+            ok = best_response.copy()
+            for c in children:
+                ok &= feasible[c].any(axis=1)
+            num_parent = 1 if parent[v] < 0 else len(tables[parent[v]])
+            feasible[v] = np.broadcast_to(ok, (num_parent, len(ok)))
+            continue
+
+        if table.ndim != len(neighbors) + 1:
+            raise ValueError("A payoff table needs one axis for the node and one per neighbour.")
+
+        # Restrict v's best responses to child strategies whose subtrees are feasible
+        mask = best_response
+        for axis, c in enumerate(neighbors, 1):
+            if c == parent[v]:
+                continue
+            shape = [1] * table.ndim
+            shape[0], shape[axis] = feasible[c].shape
+            mask = mask & feasible[c].reshape(shape)
+
+        # Axes ordered as (own, parent, children...), children flattened
+        child_axes = [axis for axis, c in enumerate(neighbors, 1) if c != parent[v]]
+        parent_axes = [axis for axis, c in enumerate(neighbors, 1) if c == parent[v]]
+        mask = np.transpose(mask, [0] + parent_axes + child_axes)
+        if not parent_axes:
+            mask = mask[:, np.newaxis]
+        flat = mask.reshape(mask.shape[0], mask.shape[1], -1)
+        feasible[v] = flat.any(axis=2).T
+        # First feasible joint child assignment for every (own, parent) pair
+        witness[v] = (flat.argmax(axis=2), mask.shape[2:])
+
+    # Top-down: fix each root, then read the children's strategies off the witnesses
+    profile = np.full(num_nodes, -1, dtype=np.int64)
+    for v in order:
+        if parent[v] < 0:
+            choices = np.flatnonzero(feasible[v][0])
+            if len(choices) == 0:
+                return None
+            profile[v] = choices[0]
+        s_v = profile[v]
+        s_p = 0 if parent[v] < 0 else profile[parent[v]]
+        children = [c for c in indices[indptr[v]:indptr[v + 1]] if c != parent[v]]
+        if tables[v].ndim == 1:
+            for c in children:
+                profile[c] = feasible[c][s_v].argmax()
+        elif children:
+            first, child_shape = witness[v]
+            for c, s_c in zip(children, np.unravel_index(first[s_v, s_p], child_shape)):
+                profile[c] = s_c
+    return profile
+
+def _check_forest(graph):
+    """
+    Vectorized tree check for a CSRGraph: a forest has exactly n - c edges.
+    """
+    from scipy.sparse.csgraph import connected_components
+
+    num_components, _ = connected_components(graph.to_scipy(), directed=False)
+    if graph.num_edges != graph.num_nodes - num_components:
+        raise ValueError("The graph must be a tree (or a forest).")
+
+def find_pure_nash_tree_profile(graph, payoffs):
+    """
+    Finds a pure Nash equilibrium of a graphical game on a tree (or forest).
+
+    Parameters:
+    graph (nx.Graph or CSRGraph): A tree graph where nodes are players.
+    payoffs (dict, list or np.array): One of
+        - payoffs[node] = array whose axis 0 is the node's own strategy and axes 1..
+          the strategies of the node's neighbours, in graph.neighbors order (a 1-D
+          array means the payoff ignores the neighbours); a list indexed by node
+          for a CSRGraph,
+        - an array of shape (n_nodes, n_strategies) of payoffs that depend only on
+          each node's own strategy,
+        - the original payoffs[(player, strategy)] format.
+
+    Returns:
+    dict or np.array: Strategy of every player in a pure Nash equilibrium (an array
+                      indexed by node for a CSRGraph), or None if none exists.
+    """
+    csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_networkx(graph)
+    if csr.num_nodes == 0:
+        return {} if csr is not graph else np.zeros(0, dtype=np.int64)
+
+    with instrumentation.timer("tree.solve"):
+        if isinstance(payoffs, np.ndarray) and payoffs.ndim == 2:
+            # Payoffs ignore the neighbours, so every node simply plays a best response
+            _check_forest(csr)
+            profile = payoffs.argmax(axis=1)
+        elif csr is graph:
+            profile = _solve_graphical_tree(csr.indptr, csr.indices, [np.asarray(table) for table in payoffs])
+        else:
+            profile = _solve_graphical_tree(csr.indptr, csr.indices, _payoff_tables(csr.labels, payoffs))
+
+    if profile is None or csr is graph:
+        return profile
+    return {node: int(strategy) for node, strategy in zip(csr.labels, profile)}
 
 def find_pure_nash_tree(graph, payoffs):
     """
-    Determines if a pure Nash equilibrium exists in a 2-strategy n-player tree game.
+    Determines if a pure Nash equilibrium exists in an n-player graphical game on a tree.
 
     Parameters:
-    graph (nx.Graph): A tree graph where nodes are players.
-    payoffs (dict): A dictionary where payoffs[(player, strategy)] gives the player's payoff.
+    graph (nx.Graph or CSRGraph): A tree graph where nodes are players.
+    payoffs (dict, list or np.array): Payoffs in any format accepted by
+                                      find_pure_nash_tree_profile.
 
     Returns:
     bool: True if a pure Nash equilibrium exists, False otherwise.
     """
+    return find_pure_nash_tree_profile(graph, payoffs) is not None
 
-    def dfs(node, parent, chosen_strategy):
-        """
-        Tree DP to check if the current node's chosen strategy is stable given its neighbors.
-        """
-        for neighbor in graph.neighbors(node):
-            if neighbor == parent:  # Avoid revisiting parent in tree
-                continue
+def find_pure_nash_graph_profile(graph, interaction, own=None, seed=None):
+    """
+    Finds a pure Nash equilibrium of a pairwise graphical game on any graph, cycles
+    included, by best-response dynamics (see best_response.best_response_dynamics).
+    Node v earns own[v][s_v] + sum over neighbours u of w_vu * interaction[s_v, s_u],
+    where w_vu is the edge weight (1 for unweighted graphs).
 
-            # Try both strategies (0 and 1) for neighbor
-            valid = False
-            for neighbor_strategy in [0, 1]:
-                # Check if choosing this strategy ensures a stable equilibrium
-                if payoffs[(neighbor, neighbor_strategy)] >= payoffs[(neighbor, 1 - neighbor_strategy)]:
-                    if dfs(neighbor, node, neighbor_strategy):
-                        valid = True
-                        break
+    Parameters:
+    graph (nx.Graph or CSRGraph): Interaction graph where nodes are players.
+    interaction (np.array): (S, S) payoff of a strategy against a neighbour's strategy.
+    own (dict or np.array): Payoffs depending only on a node's own strategy, as
+                            {node: array of S payoffs} or an (n_nodes, S) array in
+                            node order (optional).
+    seed (int): Seed for the random choices of the dynamics.
 
-            if not valid:
-                return False
-        return True
+    Returns:
+    dict or np.array: Strategy of every player in a pure Nash equilibrium (an array
+                      indexed by node for a CSRGraph), or None if none was found,
+                      which can only happen in games without an exact potential.
+    """
+    from best_response import best_response_dynamics
 
-    root = list(graph.nodes())[0]  # Start from an arbitrary node
-    return dfs(root, None, 0) or dfs(root, None, 1)  # Try both strategies for root
+    csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_networkx(graph)
+    if isinstance(own, dict):
+        own = np.array([own[node] for node in csr.labels], dtype=float)
+    profile = best_response_dynamics(csr, interaction, own, seed=seed)
+    if profile is None or csr is graph:
+        return profile
+    return {node: int(strategy) for node, strategy in zip(csr.labels, profile)}
 
 def get_user_input_tree():
     """
@@ -60,6 +250,8 @@ def get_user_input_tree():
     graph (nx.Graph): The input tree graph.
     payoffs (dict): The input payoff values.
     """
+    import networkx as nx
+
     G = nx.Graph()
     n = int(input("Enter number of nodes in the tree: "))
 
@@ -84,11 +276,10 @@ def get_user_input_tree():
     
     return G, payoffs
 
-# Inform user about predefined test cases
-print("\nRunning predefined test cases...")
+# Predefined test cases (tree edges and payoffs)
 test_cases = [
     {
-        "graph": nx.Graph([(0, 1), (1, 2), (1, 3)]),
+        "edges": [(0, 1), (1, 2), (1, 3)],
         "payoffs": {
             (0, 0): 3, (0, 1): 4,
             (1, 0): 2, (1, 1): 5,
@@ -97,7 +288,7 @@ test_cases = [
         }
     },
     {
-        "graph": nx.Graph([(0, 1), (1, 2)]),
+        "edges": [(0, 1), (1, 2)],
         "payoffs": {
             (0, 0): 1, (0, 1): 2,
             (1, 0): 2, (1, 1): 3,
@@ -106,14 +297,24 @@ test_cases = [
     }
 ]
 
-# Run predefined test cases
-for i, test in enumerate(test_cases, 1):
-    print(f"\nTest Case {i}:")
-    result = find_pure_nash_tree(test["graph"], test["payoffs"])
-    print(f"Has Pure Nash Equilibrium: {result}")
-
-# Allow user input for custom cases
-print("\n--- User-defined Test Case ---")
-G_user, payoffs_user = get_user_input_tree()
-result_user = find_pure_nash_tree(G_user, payoffs_user)
-print(f"User-defined Test Case - Has Pure Nash Equilibrium: {result_user}")
\ No newline at end of file
+if __name__ == "__main__":
+    import networkx as nx
+
+    print("\nRunning predefined test cases...")
+
+    # Run predefined test cases
+    for i, test in enumerate(test_cases, 1):
+        print(f"\nTest Case {i}:")
+        result = find_pure_nash_tree(nx.Graph(test["edges"]), test["payoffs"])
+        print(f"Has Pure Nash Equilibrium: {result}")
+
+    # Coordination on a cycle, which the tree solver rejects
+    cycle = nx.cycle_graph(6)
+    print("\nCoordination on a 6-cycle:",
+          find_pure_nash_graph_profile(cycle, np.eye(2), {v: [0, 0.5 * (v % 2)] for v in cycle}, seed=0))
+
+    # Allow user input for custom cases
+    print("\n--- User-defined Test Case ---")
+    G_user, payoffs_user = get_user_input_tree()
+    result_user = find_pure_nash_tree(G_user, payoffs_user)
+    print(f"User-defined Test Case - Has Pure Nash Equilibrium: {result_user}")
@@ -1,9 +1,67 @@
+import numpy as np
 
+import instrumentation
 
-from scipy.optimize import linprog
-import numpy as np
+def _deviation_constraints(n, u_on, u_off):
+    """
+    Sparse correlated-equilibrium constraints over all 2^n profiles. Bit i of a
+    profile index is player i's choice (1 = "on").
+
+    For every player there are two rows: told "on" but switching to "off" must not
+    gain, and told "off" but switching to "on" must not gain.
+
+    Returns:
+    scipy.sparse.csr_matrix: (2n, 2^n) constraint matrix for A_ub p <= 0
+    """
+    from scipy import sparse
+
+    profiles = np.arange(2 ** n, dtype=np.int64)
+    num_on = np.zeros(2 ** n, dtype=np.int64)
+    for player in range(n):
+        num_on += (profiles >> player) & 1
+
+    # Gain from switching on -> off and off -> on, indexed by how many others are on
+    gain_off = np.asarray(u_off, dtype=float)[:n] - np.asarray(u_on, dtype=float)[:n]
 
-def find_correlated_equilibrium(n, u_on, u_off):
+    rows, cols, data = [], [], []
+    for player in range(n):
+        is_on = ((profiles >> player) & 1).astype(bool)
+        others_on = num_on - is_on
+        coefficients = np.where(is_on, gain_off[others_on], -gain_off[others_on])
+        nonzero = coefficients != 0
+        rows.append(2 * player + (~is_on[nonzero]))
+        cols.append(profiles[nonzero])
+        data.append(coefficients[nonzero])
+
+    return sparse.csr_matrix((np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+                             shape=(2 * n, 2 ** n))
+
+def _symmetric_correlated_equilibrium(n, u_on, u_off):
+    """
+    Correlated equilibrium that treats players anonymously: q[c] is the probability
+    that exactly c players are "on", spread uniformly over those profiles.
+
+    A player who is "on" in a profile with c players on sees c - 1 others on, and
+    is "on" in a fraction c / n of those profiles ((n - c) / n for "off"), so the
+    2n deviation constraints collapse to two rows over n + 1 variables.
+    """
+    from scipy.optimize import linprog
+
+    u_on = np.asarray(u_on, dtype=float)[:n]
+    u_off = np.asarray(u_off, dtype=float)[:n]
+    counts = np.arange(n + 1)
+
+    constraints = np.zeros((2, n + 1))
+    # Told "on" with c players on (c >= 1), switching to "off"
+    constraints[0, 1:] = counts[1:] / n * (u_off - u_on)
+    # Told "off" with c players on (c <= n - 1), switching to "on"
+    constraints[1, :-1] = (n - counts[:-1]) / n * (u_on - u_off)
+
+    with instrumentation.timer("correlated_equilibrium.solve"):
+        return linprog(c=np.zeros(n + 1), A_eq=np.ones((1, n + 1)), b_eq=[1], A_ub=constraints,
+                       b_ub=np.zeros(2), method='highs')
+
+def find_correlated_equilibrium(n, u_on, u_off, symmetric=False):
     """
     Finds a correlated equilibrium for an n-player symmetric game with "on" and "off" strategies.
     
@@ -11,33 +69,91 @@ def find_correlated_equilibrium(n, u_on, u_off):
     n (int): Number of players.
     u_on (list): List of payoffs when choosing "on" given k other players chose "on".
     u_off (list): List of payoffs when choosing "off" given k other players chose "on".
+    symmetric (bool): Look for an anonymous equilibrium over the number of players
+                      who are "on" (n + 1 variables instead of 2^n).
     
     Returns:
-    dict: Probability distribution over strategy profiles.
+    dict: Probability distribution over strategy profiles, or over the number of
+          players choosing "on" in symmetric mode.
     """
+    if len(u_on) < n or len(u_off) < n:
+        raise ValueError("Payoffs are needed for k = 0, ..., n - 1 other players choosing 'on'.")
+
+    from scipy import sparse
+    from scipy.optimize import linprog
+
+    if symmetric:
+        res = _symmetric_correlated_equilibrium(n, u_on, u_off)
+        if res.success:
+            return {c: round(float(p), 3) for c, p in enumerate(res.x)}
+        return "No correlated equilibrium found."
+
     # Number of strategy profiles (each player can be "on" or "off")
     num_profiles = 2 ** n
 
-    # Construct probability variables (one for each profile)
-    P = np.ones(num_profiles) / num_profiles  # Initialize uniform distribution
-
     # Constraints: Each player must not benefit from deviation
-    constraints = []
-    b = []
+    with instrumentation.timer("correlated_equilibrium.build"):
+        constraints = _deviation_constraints(n, u_on, u_off)
+    instrumentation.count("correlated_equilibrium.lp_rows", constraints.shape[0] + 1)
+    instrumentation.count("correlated_equilibrium.lp_columns", num_profiles)
+    instrumentation.count("correlated_equilibrium.lp_nonzeros", constraints.nnz + num_profiles)
 
-    for k in range(n):  # Number of other players choosing "on"
-        # Expected utility constraints
-        constraints.append([1 if bin(i).count("1") == k else 0 for i in range(num_profiles)])
-        b.append(u_on[k] - u_off[k])
-
-    # Solve LP: Find valid P satisfying all constraints
-    res = linprog(c=np.zeros(num_profiles), A_eq=[np.ones(num_profiles)], b_eq=[1], A_ub=constraints, b_ub=b, method='highs')
+    # Solve LP: Find a distribution P satisfying all constraints
+    with instrumentation.timer("correlated_equilibrium.solve"):
+        res = linprog(c=np.zeros(num_profiles), A_eq=sparse.csr_matrix(np.ones((1, num_profiles))), b_eq=[1],
+                      A_ub=constraints, b_ub=np.zeros(2 * n), method='highs')
 
     if res.success:
-        return {bin(i)[2:].zfill(n): round(p, 3) for i, p in enumerate(res.x)}
+        return {bin(i)[2:].zfill(n): round(float(p), 3) for i, p in enumerate(res.x)}
     else:
         return "No correlated equilibrium found."
 
+def onoff_payoff_oracle(u_on, u_off):
+    """
+    Payoff oracle of the on/off game for no_regret.regret_matching: action 1 is
+    "on", and a player's payoff depends on its action and on how many others are on.
+
+    Parameters:
+    u_on (list): Payoffs for choosing "on" given k other players chose "on"
+    u_off (list): Payoffs for choosing "off" given k other players chose "on"
+
+    Returns:
+    callable: oracle(player, profiles) giving the player's payoff in every profile
+    """
+    u_on = np.asarray(u_on, dtype=float)
+    u_off = np.asarray(u_off, dtype=float)
+
+    def oracle(player, profiles):
+        others_on = profiles.sum(axis=1) - profiles[:, player]
+        return np.where(profiles[:, player] == 1, u_on[others_on], u_off[others_on])
+    return oracle
+
+def approximate_correlated_equilibrium(n, u_on, u_off, rounds=10000, sequences=64, tol=None, seed=None):
+    """
+    Approximate correlated equilibrium of the on/off game by regret-matching
+    dynamics instead of the 2^n-variable LP, for games with many players. Only the
+    profiles that play actually visits are stored.
+
+    Parameters:
+    n (int): Number of players.
+    u_on (list): List of payoffs when choosing "on" given k other players chose "on".
+    u_off (list): List of payoffs when choosing "off" given k other players chose "on".
+    rounds (int): Maximum number of rounds of play per sequence
+    sequences (int): Number of independent sequences simulated together
+    tol (float): Stop once the maximum conditional regret is at most this
+    seed (int): Seed for the random choices
+
+    Returns:
+    tuple: Probability of every visited profile (keyed like find_correlated_equilibrium,
+           player i being bit i from the right) and the maximum conditional regret
+    """
+    if len(u_on) < n or len(u_off) < n:
+        raise ValueError("Payoffs are needed for k = 0, ..., n - 1 other players choosing 'on'.")
+    from no_regret import regret_matching
+
+    distribution, epsilon = regret_matching(onoff_payoff_oracle(u_on, u_off), [2] * n, rounds, sequences, tol, seed)
+    return {"".join(map(str, reversed(profile))): p for profile, p in distribution.items()}, epsilon
+
 def get_user_input_game():
     """
     Allows the user to input a custom n-player game setup.
@@ -67,20 +183,22 @@ def get_user_input_game():
     return n, u_on, u_off
 
 # Predefined test cases
-print("\nRunning predefined test cases...")
 test_cases = [
     (4, [3, 4, 5, 6], [2, 3, 4, 5]),
     (3, [2, 3, 4], [1, 2, 3])
 ]
 
-# Run predefined test cases
-for i, (n, u_on, u_off) in enumerate(test_cases, 1):
-    print(f"\nTest Case {i}:")
-    result = find_correlated_equilibrium(n, u_on, u_off)
-    print("Correlated Equilibrium Distribution:", result)
-
-# Allow user input for custom cases
-print("\n--- User-defined Test Case ---")
-n_user, u_on_user, u_off_user = get_user_input_game()
-result_user = find_correlated_equilibrium(n_user, u_on_user, u_off_user)
-print("User-defined Test Case - Correlated Equilibrium Distribution:", result_user)
\ No newline at end of file
+if __name__ == "__main__":
+    print("\nRunning predefined test cases...")
+
+    # Run predefined test cases
+    for i, (n, u_on, u_off) in enumerate(test_cases, 1):
+        print(f"\nTest Case {i}:")
+        result = find_correlated_equilibrium(n, u_on, u_off)
+        print("Correlated Equilibrium Distribution:", result)
+
+    # Allow user input for custom cases
+    print("\n--- User-defined Test Case ---")
+    n_user, u_on_user, u_off_user = get_user_input_game()
+    result_user = find_correlated_equilibrium(n_user, u_on_user, u_off_user)
+    print("User-defined Test Case - Correlated Equilibrium Distribution:", result_user)
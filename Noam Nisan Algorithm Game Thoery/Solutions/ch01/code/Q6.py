@@ -1,42 +1,171 @@
+import math
+
 import numpy as np
-import nashpy as nash
 
-def epsilon_approximate_nash(payoff_matrix_1, payoff_matrix_2, epsilon=0.1):
+from zero_sum import is_strategically_constant_sum, solve_zero_sum
+
+def _normalize_payoffs(matrix):
     """
-    Finds an epsilon-approximate Nash equilibrium with small support.
-    
+    Rescales a payoff matrix to [0, 1], the scale on which epsilon is measured.
+    A positive affine rescaling does not change which strategies are best responses.
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    low, high = matrix.min(), matrix.max()
+    if high == low:
+        return np.zeros_like(matrix)
+    return (matrix - low) / (high - low)
+
+def measured_epsilon(payoff_matrix_1, payoff_matrix_2, p1_mixed, p2_mixed):
+    """
+    Largest gain either player can get by deviating, i.e. the epsilon for which the
+    strategies form an epsilon-Nash equilibrium, with payoffs rescaled to [0, 1].
+
     Parameters:
     payoff_matrix_1 (np.array): Payoff matrix for Player 1
     payoff_matrix_2 (np.array): Payoff matrix for Player 2
-    epsilon (float): Approximation factor
+    p1_mixed (np.array): Mixed strategy of Player 1, or a stack of them (k, m)
+    p2_mixed (np.array): Mixed strategy of Player 2, or a stack of them (k, n)
 
     Returns:
-    tuple: Approximate mixed strategy for both players
+    float or np.array: Achieved epsilon (one per pair for stacked strategies)
     """
-    game = nash.Game(payoff_matrix_1, payoff_matrix_2)
-    equilibria = list(game.support_enumeration())
+    A = _normalize_payoffs(payoff_matrix_1)
+    B = _normalize_payoffs(payoff_matrix_2)
+    row_payoffs = p2_mixed @ A.T
+    col_payoffs = p1_mixed @ B
+    row_regret = row_payoffs.max(axis=-1) - (p1_mixed * row_payoffs).sum(axis=-1)
+    col_regret = col_payoffs.max(axis=-1) - (p2_mixed * col_payoffs).sum(axis=-1)
+    return np.maximum(row_regret, col_regret)
 
-    if not equilibria:
-        return "No Nash equilibrium found"
+def fictitious_play(payoff_matrix_1, payoff_matrix_2, epsilon=0.1, max_iterations=100000):
+    """
+    Simultaneous fictitious play: both players best-respond to the other's empirical
+    mix. Stops as soon as the empirical mixes form an epsilon-Nash equilibrium.
 
-    # Select a Nash equilibrium
-    p1_mixed, p2_mixed = equilibria[0]
+    Fictitious play need not converge in general-sum games, so the best pair seen is
+    returned together with its measured epsilon.
 
-    # Reduce the support size to O(log n)
-    num_strategies = len(p1_mixed)
-    support_size = max(1, int(np.log2(num_strategies)))  # O(log n) strategies
+    Parameters:
+    payoff_matrix_1 (np.array): Payoff matrix for Player 1
+    payoff_matrix_2 (np.array): Payoff matrix for Player 2
+    epsilon (float): Target epsilon (payoffs rescaled to [0, 1])
+    max_iterations (int): Maximum number of rounds
+
+    Returns:
+    tuple: Mixed strategy for both players and the achieved epsilon
+    """
+    A = _normalize_payoffs(payoff_matrix_1)
+    B = _normalize_payoffs(payoff_matrix_2)
+    A_columns = np.ascontiguousarray(A.T)
+    m, n = A.shape
+
+    counts_1 = np.zeros(m)
+    counts_2 = np.zeros(n)
+    # Payoff of every pure strategy against the opponent's play so far
+    row_payoffs = np.zeros(m)
+    col_payoffs = np.zeros(n)
+    i = j = 0
+    best = None
+    for t in range(1, max_iterations + 1):
+        counts_1[i] += 1
+        counts_2[j] += 1
+        row_payoffs += A_columns[j]
+        col_payoffs += B[i]
+
+        # Regrets of the empirical mixes come straight from the running payoffs
+        achieved = max(row_payoffs.max() - counts_1 @ row_payoffs / t,
+                       col_payoffs.max() - counts_2 @ col_payoffs / t) / t
+        if best is None or achieved < best[2]:
+            best = (counts_1 / t, counts_2 / t, achieved)
+            if achieved <= epsilon:
+                break
+
+        i = int(row_payoffs.argmax())
+        j = int(col_payoffs.argmax())
+    return best
+
+def sample_small_support(payoff_matrix_1, payoff_matrix_2, p1_mixed, p2_mixed, k, samples=32, rng=None):
+    """
+    Lipton-Markakis-Mehta sampling: draws k pure strategies from each mixed strategy
+    and plays them uniformly, for several independent draws at once.
+
+    Parameters:
+    payoff_matrix_1 (np.array): Payoff matrix for Player 1
+    payoff_matrix_2 (np.array): Payoff matrix for Player 2
+    p1_mixed (np.array): Mixed strategy of Player 1 to sample from
+    p2_mixed (np.array): Mixed strategy of Player 2 to sample from
+    k (int): Number of samples per player (support size at most k)
+    samples (int): Number of independent k-uniform pairs to try
+    rng (np.random.Generator): Random generator
+
+    Returns:
+    tuple: The k-uniform pair with the smallest epsilon, and that epsilon
+    """
+    rng = np.random.default_rng(rng)
+    m, n = len(p1_mixed), len(p2_mixed)
+    draws_1 = rng.choice(m, size=(samples, k), p=p1_mixed / p1_mixed.sum())
+    draws_2 = rng.choice(n, size=(samples, k), p=p2_mixed / p2_mixed.sum())
+
+    rows = np.repeat(np.arange(samples), k)
+    X = np.zeros((samples, m))
+    Y = np.zeros((samples, n))
+    np.add.at(X, (rows, draws_1.ravel()), 1 / k)
+    np.add.at(Y, (rows, draws_2.ravel()), 1 / k)
+
+    achieved = measured_epsilon(payoff_matrix_1, payoff_matrix_2, X, Y)
+    best = int(achieved.argmin())
+    return X[best], Y[best], float(achieved[best])
+
+def epsilon_approximate_nash(payoff_matrix_1, payoff_matrix_2, epsilon=0.1, samples=32, max_iterations=100000,
+                             seed=None):
+    """
+    Finds an epsilon-approximate Nash equilibrium with small support.
+
+    A candidate mix is computed by fictitious play, then k-uniform strategies are
+    sampled from it for k = 1, 2, 4, ... up to the Lipton-Markakis-Mehta bound
+    12 ln(n) / epsilon^2, and the first pair whose verified epsilon meets the target
+    is returned. Epsilon is measured with payoffs rescaled to [0, 1].
+
+    For constant-sum games (up to rescaling each player's payoffs) the candidate is a
+    minimax pair instead: from one HiGHS linear program, or from optimistic
+    multiplicative weights for very large games.
     
-    def reduce_support(mixed_strategy):
-        """ Reduce support by keeping top O(log n) probabilities """
-        sorted_indices = np.argsort(-mixed_strategy)[:support_size]
-        reduced_strategy = np.zeros_like(mixed_strategy)
-        reduced_strategy[sorted_indices] = 1 / support_size
-        return reduced_strategy
+    Parameters:
+    payoff_matrix_1 (np.array): Payoff matrix for Player 1
+    payoff_matrix_2 (np.array): Payoff matrix for Player 2
+    epsilon (float): Approximation factor
+    samples (int): Number of k-uniform pairs drawn for every k
+    max_iterations (int): Maximum number of fictitious play (or multiplicative
+                          weights) rounds
+    seed (int): Seed for the sampling
 
-    approx_p1 = reduce_support(p1_mixed)
-    approx_p2 = reduce_support(p2_mixed)
+    Returns:
+    tuple: Approximate mixed strategy for both players and the achieved epsilon
+    """
+    if payoff_matrix_1.shape != payoff_matrix_2.shape:
+        raise ValueError("The payoff matrices must have the same dimensions.")
+    rng = np.random.default_rng(seed)
+
+    # Aim below the target so that sampling has room to lose some accuracy
+    if is_strategically_constant_sum(payoff_matrix_1, payoff_matrix_2):
+        p1_candidate, p2_candidate, _, _ = solve_zero_sum(_normalize_payoffs(payoff_matrix_1), tol=epsilon / 2,
+                                                          max_iterations=max_iterations)
+        candidate_epsilon = measured_epsilon(payoff_matrix_1, payoff_matrix_2, p1_candidate, p2_candidate)
+    else:
+        candidate = fictitious_play(payoff_matrix_1, payoff_matrix_2, epsilon / 2, max_iterations)
+        p1_candidate, p2_candidate, candidate_epsilon = candidate
+
+    n = max(payoff_matrix_1.shape)
+    k_max = math.ceil(12 * math.log(max(n, 2)) / epsilon ** 2)
+    k = 1
+    while k < k_max:
+        p1_mixed, p2_mixed, achieved = sample_small_support(
+            payoff_matrix_1, payoff_matrix_2, p1_candidate, p2_candidate, k, samples, rng)
+        if achieved <= epsilon:
+            return p1_mixed, p2_mixed, achieved
+        k *= 2
 
-    return approx_p1, approx_p2
+    return p1_candidate, p2_candidate, float(candidate_epsilon)
 
 def get_user_input_game():
     """
@@ -56,7 +185,6 @@ def get_user_input_game():
     return payoff_matrix_1, payoff_matrix_2
 
 # Predefined test cases
-print("\nRunning predefined test cases...")
 test_cases = [
     (
         np.array([[3, 0], [5, 1]]), 
@@ -68,14 +196,17 @@ test_cases = [
     )
 ]
 
-# Run predefined test cases
-for i, (A, B) in enumerate(test_cases, 1):
-    print(f"\nTest Case {i}:")
-    approx_equilibrium = epsilon_approximate_nash(A, B)
-    print("Epsilon-Approximate Nash Equilibrium:", approx_equilibrium)
-
-# Allow user input for custom cases
-print("\n--- User-defined Test Case ---")
-A_user, B_user = get_user_input_game()
-approx_equilibrium_user = epsilon_approximate_nash(A_user, B_user)
-print("User-defined Test Case - Epsilon-Approximate Nash Equilibrium:", approx_equilibrium_user)
+if __name__ == "__main__":
+    print("\nRunning predefined test cases...")
+
+    # Run predefined test cases
+    for i, (A, B) in enumerate(test_cases, 1):
+        print(f"\nTest Case {i}:")
+        approx_equilibrium = epsilon_approximate_nash(A, B)
+        print("Epsilon-Approximate Nash Equilibrium:", approx_equilibrium)
+
+    # Allow user input for custom cases
+    print("\n--- User-defined Test Case ---")
+    A_user, B_user = get_user_input_game()
+    approx_equilibrium_user = epsilon_approximate_nash(A_user, B_user)
+    print("User-defined Test Case - Epsilon-Approximate Nash Equilibrium:", approx_equilibrium_user)
@@ -1,69 +1,189 @@
+from functools import lru_cache
+
 import numpy as np
-import sympy as sp
 
-def total_income_monopoly(demand_function, q_symbol):
+import instrumentation
+
+class _DemandModel:
+    """
+    Revenue-maximizing solutions of one demand function, derived symbolically once
+    and compiled to NumPy functions of (n_firms, *parameters).
+    """
+    __slots__ = ("parameters", "monopoly", "competition")
+
+    def __init__(self, parameters, monopoly, competition):
+        self.parameters = parameters
+        self.monopoly = monopoly
+        self.competition = competition
+
+def _newton_roots(foc, slope, arguments, iterations=100):
+    """
+    Largest root of foc(x, *arguments) found by vectorized Newton iterations started
+    from a grid of quantities, for first-order conditions sympy cannot solve.
+    """
+    shape = np.broadcast(*arguments).shape if arguments else ()
+    starts = np.geomspace(1e-3, 1e3, 13).reshape((-1,) + (1,) * len(shape))
+    x = np.broadcast_to(starts, starts.shape[:1] + shape).astype(float)
+    with np.errstate(all="ignore"):
+        for _ in range(iterations):
+            x = x - foc(x, *arguments) / slope(x, *arguments)
+        converged = np.isfinite(x) & (np.abs(foc(x, *arguments)) <= 1e-9 * (1 + np.abs(x)))
+    return np.where(converged, x, -np.inf).max(axis=0)
+
+def _optimum(revenue, variable, arguments):
+    """
+    Compiles the revenue at the largest stationary point of `revenue` in `variable`
+    (the root the symbolic solver used to pick) as a vectorized function of `arguments`.
+    """
+    import sympy as sp
+
+    foc = sp.diff(revenue, variable)
+    revenue_function = sp.lambdify((variable,) + arguments, revenue, "numpy")
+    # Closed forms are only tried where they exist: sp.solve can spend seconds before
+    # giving up on transcendental equations, and quartic formulas are unstable
+    try:
+        degree = sp.Poly(sp.numer(sp.together(foc)), variable).degree()
+    except sp.PolynomialError:
+        degree = None
+    roots = sp.solve(foc, variable) if degree is not None and degree <= 3 else None
+
+    if roots is None:
+        # No closed form: find the root numerically for every argument
+        foc_function = sp.lambdify((variable,) + arguments, foc, "numpy")
+        slope_function = sp.lambdify((variable,) + arguments, sp.diff(foc, variable), "numpy")
+
+        def evaluate(*values):
+            values = [np.asarray(value, dtype=float) for value in values]
+            root = _newton_roots(foc_function, slope_function, values)
+            with np.errstate(all="ignore"):
+                return np.where(np.isfinite(root), revenue_function(np.where(np.isfinite(root), root, 0.0), *values),
+                                np.nan)
+        return evaluate
+
+    root_functions = [sp.lambdify(arguments, root, "numpy") for root in roots]
+
+    def evaluate(*values):
+        # Evaluate in complex arithmetic and keep the real roots, as max() did symbolically
+        values = [np.asarray(value, dtype=complex) for value in values]
+        shape = np.broadcast(*values).shape if values else ()
+        best = np.full(shape, -np.inf)
+        with np.errstate(all="ignore"):
+            for root_function in root_functions:
+                root = np.broadcast_to(np.asarray(root_function(*values), dtype=complex), shape)
+                real = np.isfinite(root) & (np.abs(root.imag) <= 1e-12 * (1 + np.abs(root.real)))
+                best = np.where(real, np.maximum(best, root.real), best)
+            found = np.isfinite(best)
+            income = revenue_function(np.where(found, best, 0.0), *[value.real for value in values])
+        return np.where(found, income, np.nan)
+    return evaluate
+
+@lru_cache(maxsize=4096)
+def _demand_model(p_function, q_name="q"):
+    """
+    Symbolic derivation for one demand function, cached per string. The number of
+    firms stays a symbol, so one derivation serves every n_firms.
+    """
+    import sympy as sp
+
+    with instrumentation.timer("bertrand.symbolic"):
+        q = sp.Symbol(q_name)
+        q_i = sp.Symbol("q_i")
+        n = sp.Dummy("n")
+        demand_function = sp.sympify(p_function)
+        parameters = tuple(sorted((symbol for symbol in demand_function.free_symbols if symbol != q),
+                                  key=lambda symbol: symbol.name))
+
+        monopoly = _optimum(q * demand_function, q, parameters)
+        competition = _optimum(n * q_i * demand_function.subs(q, n * q_i), q_i, (n,) + parameters)
+    return _DemandModel(tuple(symbol.name for symbol in parameters), monopoly, competition)
+
+def _parameter_values(model, params):
+    missing = [name for name in model.parameters if name not in params]
+    if missing:
+        raise ValueError(f"Values are needed for the demand parameters: {', '.join(missing)}.")
+    return [params[name] for name in model.parameters]
+
+def _to_float(value):
+    value = float(value)
+    return None if np.isnan(value) else value
+
+def total_income_monopoly(demand_function, q_symbol, **params):
     """
     Computes the total income for a monopolist given a demand function.
 
     Parameters:
-    demand_function (sympy expression): Demand-price function p(q)
+    demand_function (sympy expression or str): Demand-price function p(q)
     q_symbol (sympy.Symbol): Symbol representing quantity q
+    params: Values of any other symbols in the demand function
 
     Returns:
     float: Revenue R_m for monopolist
     """
-    revenue = q_symbol * demand_function
-    optimal_q = sp.solve(sp.diff(revenue, q_symbol), q_symbol)
-    if optimal_q:
-        q_m = max(optimal_q)  # Choose the valid root
-        return revenue.subs(q_symbol, q_m).evalf()
-    return None
+    model = _demand_model(str(demand_function), q_symbol.name)
+    return _to_float(model.monopoly(*_parameter_values(model, params)))
 
-def total_income_competition(demand_function, q_symbol, n_firms):
+def total_income_competition(demand_function, q_symbol, n_firms, **params):
     """
     Computes the total income for an n-firm competitive market.
 
     Parameters:
-    demand_function (sympy expression): Demand-price function p(q)
+    demand_function (sympy expression or str): Demand-price function p(q)
     q_symbol (sympy.Symbol): Symbol representing quantity q
     n_firms (int): Number of competing firms
+    params: Values of any other symbols in the demand function
 
     Returns:
     float: Total revenue in competitive setting
     """
-    q_i = sp.Symbol("q_i")
-    total_q = n_firms * q_i
-    revenue_per_firm = q_i * demand_function.subs(q_symbol, total_q)
-    optimal_q_i = sp.solve(sp.diff(revenue_per_firm, q_i), q_i)
-    
-    if optimal_q_i:
-        q_c = max(optimal_q_i)  # Choose the valid root
-        return n_firms * revenue_per_firm.subs(q_i, q_c).evalf()
-    return None
+    model = _demand_model(str(demand_function), q_symbol.name)
+    return _to_float(model.competition(n_firms, *_parameter_values(model, params)))
 
-def analyze_bertrand_game(p_function, n_firms):
+def bertrand_revenue_curves(p_function, n_firms, **params):
     """
-    Analyzes the Bertrand game for both monopoly and competition.
+    Monopoly and competition revenues for whole arrays of firm counts and demand
+    parameters in one vectorized call. The symbolic solution of each demand function
+    is derived once and cached; functions without a closed-form solution are solved
+    numerically.
 
     Parameters:
-    p_function (str): Demand-price function as a string, e.g., "1 - q"
-    n_firms (int): Number of competing firms
+    p_function (str): Demand-price function as a string, e.g., "a - b*q"
+    n_firms (np.array): Numbers of competing firms
+    params: Values (scalars or arrays) of the other symbols, e.g. a=..., b=...
 
     Returns:
-    dict: Monopolist and competition total revenues
+    dict: Arrays of monopolist and competition revenues and their ratio (NaN where
+          no optimum exists), broadcast over n_firms and the parameters
     """
-    q = sp.Symbol("q")
-    demand_function = sp.sympify(p_function)
-
-    monopoly_income = total_income_monopoly(demand_function, q)
-    competition_income = total_income_competition(demand_function, q, n_firms)
-
+    model = _demand_model(p_function)
+    values = _parameter_values(model, params)
+    n_firms, *values = np.broadcast_arrays(np.asarray(n_firms, dtype=float), *map(np.asarray, values))
+
+    with instrumentation.timer("bertrand.numeric"):
+        monopoly_income = np.broadcast_to(model.monopoly(*values), n_firms.shape)
+        competition_income = np.broadcast_to(model.competition(n_firms, *values), n_firms.shape)
+    with np.errstate(all="ignore"):
+        ratio = np.where(competition_income != 0, monopoly_income / competition_income, np.nan)
     return {
         "Monopoly Income": monopoly_income,
         "Competition Income": competition_income,
-        "Monopoly vs. Competition Ratio": monopoly_income / competition_income if competition_income else None
+        "Monopoly vs. Competition Ratio": ratio
     }
 
+def analyze_bertrand_game(p_function, n_firms, **params):
+    """
+    Analyzes the Bertrand game for both monopoly and competition.
+
+    Parameters:
+    p_function (str): Demand-price function as a string, e.g., "1 - q"
+    n_firms (int): Number of competing firms
+    params: Values of any other symbols in the demand function
+
+    Returns:
+    dict: Monopolist and competition total revenues
+    """
+    curves = bertrand_revenue_curves(p_function, n_firms, **params)
+    return {key: _to_float(value) for key, value in curves.items()}
+
 def get_user_input():
     """
     Allows the user to input a custom demand function and number of firms.
@@ -76,20 +196,22 @@ def get_user_input():
     return p_function, n_firms
 
 # Predefined test cases
-print("\nRunning predefined test cases...")
 test_cases = [
     ("1 - q", 2),
     ("2 - 0.5*q", 3)
 ]
 
-# Run predefined test cases
-for i, (p_func, n) in enumerate(test_cases, 1):
-    print(f"\nTest Case {i}:")
-    result = analyze_bertrand_game(p_func, n)
-    print("Analysis Result:", result)
-
-# Allow user input for custom cases
-print("\n--- User-defined Test Case ---")
-user_p_func, user_n_firms = get_user_input()
-user_result = analyze_bertrand_game(user_p_func, user_n_firms)
-print("User-defined Test Case - Analysis Result:", user_result)
+if __name__ == "__main__":
+    print("\nRunning predefined test cases...")
+
+    # Run predefined test cases
+    for i, (p_func, n) in enumerate(test_cases, 1):
+        print(f"\nTest Case {i}:")
+        result = analyze_bertrand_game(p_func, n)
+        print("Analysis Result:", result)
+
+    # Allow user input for custom cases
+    print("\n--- User-defined Test Case ---")
+    user_p_func, user_n_firms = get_user_input()
+    user_result = analyze_bertrand_game(user_p_func, user_n_firms)
+    print("User-defined Test Case - Analysis Result:", user_result)
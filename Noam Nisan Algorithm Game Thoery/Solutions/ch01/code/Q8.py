@@ -1,28 +1,68 @@
-import networkx as nx
+import numpy as np
 
-def compute_mst_cost_sharing(graph):
+from csr_graph import CSRGraph
+from dynamic_mst import DynamicMST
+from mst_engine import bird_allocation, dense_weights, shapley_cost_shares
+
+def compute_mst_cost_sharing(graph, method="bird", root=0, samples=1000, workers=1, seed=None):
     """
     Computes the minimum spanning tree (MST) and assigns cost-sharing among agents.
 
     Parameters:
-    graph (nx.Graph): A complete graph with weighted edges.
+    graph (nx.Graph, CSRGraph or np.array): A complete graph with weighted edges
+                                            (a dense weight matrix for large instances).
+    method (str): "bird" charges every agent its edge towards the root in the MST,
+                  "shapley" estimates the Shapley value by sampling arrival orders
+    root (int): The root node (a node name for networkx graphs)
+    samples (int): Number of arrival orders sampled for "shapley"
+    workers (int): Number of worker processes for "shapley" (None uses all CPUs)
+    seed (int): Random seed for "shapley"
 
     Returns:
-    dict: Cost allocation for each agent.
+    tuple: Cost allocation for each agent and the MST (same graph type as the input,
+           a CSRGraph for a weight matrix)
+    """
+    if method not in ("bird", "shapley"):
+        raise ValueError("The cost-sharing method must be 'bird' or 'shapley'.")
+
+    networkx_input = not isinstance(graph, (CSRGraph, np.ndarray))
+    if networkx_input:
+        graph = CSRGraph.from_networkx(graph)
+        root = graph.labels.index(root)
+    labels = graph.labels if isinstance(graph, CSRGraph) and graph.labels is not None else None
+
+    # Bird's rule is exactly the parent-edge cost of every node in the MST rooted at the root
+    bird_costs, parents = bird_allocation(graph, root)
+    agents = np.flatnonzero(parents >= 0)
+    mst = CSRGraph.from_edges(len(parents), agents, parents[agents], bird_costs[agents], labels)
+
+    if method == "bird":
+        shares = bird_costs
+    else:
+        weights = dense_weights(graph) if isinstance(graph, CSRGraph) else graph
+        shares, _ = shapley_cost_shares(weights, root, samples, workers, seed)
+
+    names = labels if labels is not None else range(len(parents))
+    cost_allocation = {names[agent]: share for agent, share in zip(agents.tolist(), shares[agents].tolist())}
+    return cost_allocation, (mst.to_networkx() if networkx_input else mst)
+
+def dynamic_mst_cost_sharing(graph, root=0):
     """
-    # Compute MST using Kruskal's algorithm
-    mst = nx.minimum_spanning_tree(graph, algorithm='kruskal')
+    Builds a DynamicMST for a graph whose edge costs change over time. Its
+    set_weight and delete_edge methods repair the MST locally and return only the
+    Bird cost allocations that changed.
 
-    # Assign cost to each agent based on their first connection in the MST
-    cost_allocation = {}
-    for edge in mst.edges(data=True):
-        node1, node2, cost = edge[0], edge[1], edge[2]['weight']
-        if node1 == 0:
-            cost_allocation[node2] = cost
-        elif node2 == 0:
-            cost_allocation[node1] = cost
+    Parameters:
+    graph (nx.Graph or CSRGraph): A graph with weighted edges.
+    root (int): The root node (a node name for networkx graphs)
 
-    return cost_allocation, mst
+    Returns:
+    DynamicMST: The dynamic MST; allocation() gives the full cost allocation
+    """
+    if not isinstance(graph, CSRGraph):
+        graph = CSRGraph.from_networkx(graph)
+        root = graph.labels.index(root)
+    return DynamicMST.from_graph(graph, root)
 
 def get_user_input_graph():
     """
@@ -31,6 +71,8 @@ def get_user_input_graph():
     Returns:
     nx.Graph: The input graph.
     """
+    import networkx as nx
+
     G = nx.Graph()
     n = int(input("Enter number of agents (excluding root node 0): ")) + 1
 
@@ -45,23 +87,27 @@ def get_user_input_graph():
 
     return G
 
-# Predefined test cases
-print("\nRunning predefined test cases...")
+# Predefined test cases (weighted edge lists)
 test_cases = [
-    nx.Graph([(0, 1, {'weight': 3}), (0, 2, {'weight': 2}), (1, 2, {'weight': 1})]),
-    nx.Graph([(0, 1, {'weight': 4}), (0, 2, {'weight': 5}), (1, 2, {'weight': 2}), (2, 3, {'weight': 3})])
+    [(0, 1, {'weight': 3}), (0, 2, {'weight': 2}), (1, 2, {'weight': 1})],
+    [(0, 1, {'weight': 4}), (0, 2, {'weight': 5}), (1, 2, {'weight': 2}), (2, 3, {'weight': 3})]
 ]
 
-# Run predefined test cases
-for i, test_graph in enumerate(test_cases, 1):
-    print(f"\nTest Case {i}:")
-    cost_allocation, mst = compute_mst_cost_sharing(test_graph)
-    print("Cost Allocation:", cost_allocation)
-    print("Minimum Spanning Tree Edges:", list(mst.edges(data=True)))
-
-# Allow user input for custom cases
-print("\n--- User-defined Test Case ---")
-user_graph = get_user_input_graph()
-user_cost_allocation, user_mst = compute_mst_cost_sharing(user_graph)
-print("User-defined Test Case - Cost Allocation:", user_cost_allocation)
-print("User-defined Test Case - Minimum Spanning Tree Edges:", list(user_mst.edges(data=True)))
+if __name__ == "__main__":
+    import networkx as nx
+
+    print("\nRunning predefined test cases...")
+
+    # Run predefined test cases
+    for i, test_edges in enumerate(test_cases, 1):
+        print(f"\nTest Case {i}:")
+        cost_allocation, mst = compute_mst_cost_sharing(nx.Graph(test_edges))
+        print("Cost Allocation:", cost_allocation)
+        print("Minimum Spanning Tree Edges:", list(mst.edges(data=True)))
+
+    # Allow user input for custom cases
+    print("\n--- User-defined Test Case ---")
+    user_graph = get_user_input_graph()
+    user_cost_allocation, user_mst = compute_mst_cost_sharing(user_graph)
+    print("User-defined Test Case - Cost Allocation:", user_cost_allocation)
+    print("User-defined Test Case - Minimum Spanning Tree Edges:", list(user_mst.edges(data=True)))
@@ -0,0 +1,258 @@
+"""
+Non-interactive batch entry point for the Q1-Q8 solvers.
+
+Reads games from a JSONL or NPZ file (or from stdin), solves them and streams
+one JSON line per game to stdout or an output file:
+
+    python batch_solve.py nash games.jsonl -o results.jsonl
+    cat games.jsonl | python batch_solve.py correlated
+    python batch_solve.py pure-nash games.npz
+
+JSONL record formats (an optional "id" is echoed back):
+    nash, pure-nash, epsilon  {"A": [[...]], "B": [[...]], "epsilon": 0.1, "method": "auto", "exact": false}
+    pure-nash-n               {"payoffs": [tensor_1, ..., tensor_N]}
+    tree                      {"edges": [[u, v], ...], "payoffs": [[node, strategy, payoff], ...]}
+    correlated                {"n": 4, "u_on": [...], "u_off": [...]}
+    bertrand                  {"p_function": "a - q", "n_firms": 2, "params": {"a": 1}}
+    mst                       {"edges": [[u, v, cost], ...], "method": "bird"}
+
+NPZ input holds stacked games: arrays "A" and "B" of shape (games, n, m) for the
+two-player solvers, or "payoffs" of shape (games, N, s_1, ..., s_N) for pure-nash-n.
+"""
+import argparse
+import importlib
+import io
+import json
+import sys
+from fractions import Fraction
+from itertools import islice
+
+import numpy as np
+
+def _solve_nash(record):
+    Q1 = importlib.import_module("Q1")
+    return Q1.solve_nash_equilibrium(np.asarray(record["A"]), np.asarray(record["B"]),
+                                     record.get("method", "auto"), record.get("exact", False))
+
+def _solve_pure_nash_n(record):
+    Q3 = importlib.import_module("Q3")
+    return Q3.find_pure_nash_equilibria([np.asarray(tensor) for tensor in record["payoffs"]])
+
+def _solve_tree(record):
+    import networkx as nx
+    Q4 = importlib.import_module("Q4")
+    graph = nx.Graph([tuple(edge) for edge in record["edges"]])
+    payoffs = {(node, strategy): payoff for node, strategy, payoff in record["payoffs"]}
+    return Q4.find_pure_nash_tree(graph, payoffs)
+
+def _solve_correlated(record):
+    Q5 = importlib.import_module("Q5")
+    return Q5.find_correlated_equilibrium(record["n"], record["u_on"], record["u_off"])
+
+def _solve_epsilon(record):
+    Q6 = importlib.import_module("Q6")
+    return Q6.epsilon_approximate_nash(np.asarray(record["A"], dtype=float), np.asarray(record["B"], dtype=float),
+                                       record.get("epsilon", 0.1))
+
+def _solve_bertrand(record):
+    Q7 = importlib.import_module("Q7")
+    return Q7.analyze_bertrand_game(record["p_function"], record["n_firms"], **record.get("params", {}))
+
+def _solve_mst(record):
+    import networkx as nx
+    Q8 = importlib.import_module("Q8")
+    graph = nx.Graph()
+    graph.add_weighted_edges_from(tuple(edge) for edge in record["edges"])
+    cost_allocation, mst = Q8.compute_mst_cost_sharing(graph, record.get("method", "bird"))
+    return {"cost_allocation": cost_allocation, "mst_edges": mst}
+
+# Solvers that handle one record at a time; pure-nash is vectorized over whole stacks
+SOLVERS = {
+    "nash": _solve_nash,
+    "pure-nash-n": _solve_pure_nash_n,
+    "tree": _solve_tree,
+    "correlated": _solve_correlated,
+    "epsilon": _solve_epsilon,
+    "bertrand": _solve_bertrand,
+    "mst": _solve_mst,
+}
+
+def _json_default(value):
+    """
+    Converts solver results (NumPy values, fractions, sympy numbers, graphs) to JSON.
+    """
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, Fraction):
+        return str(value)
+    if hasattr(value, "edges"):
+        return [[u, v, data.get("weight")] for u, v, data in value.edges(data=True)]
+    return float(value)
+
+def _read_source(path):
+    """
+    Returns ("npz", archive) or ("jsonl", line iterator) for a path or "-" for stdin.
+    """
+    if path == "-":
+        data = sys.stdin.buffer.read()
+        if data[:2] == b"PK":
+            return "npz", np.load(io.BytesIO(data))
+        return "jsonl", io.StringIO(data.decode())
+    if path.endswith(".npz"):
+        return "npz", np.load(path)
+    return "jsonl", open(path)
+
+class _MalformedRecord(dict):
+    """
+    Stands in for a JSONL line that is not a JSON object; holds the line's id and
+    the error, which the solvers report in place of a result.
+    """
+
+def _iter_records(lines):
+    for index, line in enumerate(lines):
+        if line.strip():
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                yield _MalformedRecord(id=index, error=f"Malformed JSON: {error}")
+                continue
+            if not isinstance(record, dict):
+                yield _MalformedRecord(id=index, error="The record must be a JSON object.")
+                continue
+            record.setdefault("id", index)
+            yield record
+
+def _pure_nash_results(ids, A, B):
+    Q2 = importlib.import_module("Q2")
+    has_equilibrium, counts, locations = Q2.batch_pure_nash_equilibria(A, B)
+    # Split the (game, row, column) locations into one list per game
+    per_game = np.split(locations[:, 1:], np.cumsum(counts)[:-1])
+    for game_id, exists, count, game_locations in zip(ids, has_equilibrium, counts, per_game):
+        yield {"id": game_id, "result": {"has_pure_nash": bool(exists), "count": int(count),
+                                         "equilibria": game_locations.tolist()}}
+
+def solve_pure_nash_jsonl(lines, chunk_size=4096):
+    """
+    Solves pure-Nash records in chunks, stacking same-shape games into one batch call.
+
+    Parameters:
+    lines (iterable): JSONL lines with "A" and "B" payoff matrices
+    chunk_size (int): Number of records parsed and solved together
+
+    Yields:
+    dict: One result record per game, in input order
+    """
+    records = _iter_records(lines)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        results = {}
+        by_shape = {}
+        for position, record in enumerate(chunk):
+            if isinstance(record, _MalformedRecord):
+                results[position] = dict(record)
+                continue
+            try:
+                A = np.asarray(record["A"], dtype=float)
+                B = np.asarray(record["B"], dtype=float)
+            except KeyError as error:
+                results[position] = {"id": record["id"], "error": f"The record has no {error} payoff matrix."}
+                continue
+            except (TypeError, ValueError) as error:
+                results[position] = {"id": record["id"], "error": str(error)}
+                continue
+            if A.ndim != 2:
+                results[position] = {"id": record["id"], "error": "The payoff matrices must be two-dimensional."}
+                continue
+            if A.shape != B.shape:
+                results[position] = {"id": record["id"], "error": "The payoff matrices must have the same dimensions."}
+                continue
+            by_shape.setdefault(A.shape, []).append((position, A, B))
+        for games in by_shape.values():
+            positions, As, Bs = zip(*games)
+            ids = [chunk[position]["id"] for position in positions]
+            for position, result in zip(positions, _pure_nash_results(ids, np.stack(As), np.stack(Bs))):
+                results[position] = result
+        for position in range(len(chunk)):
+            yield results[position]
+
+def solve_records(solver, records):
+    """
+    Solves records one by one, reporting failures per game instead of aborting.
+
+    Parameters:
+    solver (str): Name of the solver in SOLVERS
+    records (iterable): Parsed input records
+
+    Yields:
+    dict: One result record per game, in input order
+    """
+    solve = SOLVERS[solver]
+    for record in records:
+        if isinstance(record, _MalformedRecord):
+            yield dict(record)
+            continue
+        try:
+            yield {"id": record["id"], "result": solve(record)}
+        except Exception as error:
+            yield {"id": record["id"], "error": str(error)}
+
+def solve_npz(solver, archive, chunk_size=4096):
+    """
+    Solves a stack of games stored in an NPZ archive.
+
+    Parameters:
+    solver (str): "pure-nash", "nash", "epsilon" or "pure-nash-n"
+    archive (NpzFile): Archive with stacked "A"/"B" or "payoffs" arrays
+    chunk_size (int): Number of games solved together for pure-nash
+
+    Yields:
+    dict: One result record per game, in input order
+    """
+    if solver == "pure-nash-n":
+        payoffs = archive["payoffs"]
+        records = ({"id": index, "payoffs": list(game)} for index, game in enumerate(payoffs))
+        yield from solve_records(solver, records)
+        return
+    if solver not in ("pure-nash", "nash", "epsilon"):
+        raise ValueError(f"NPZ input is not supported for the {solver} solver.")
+
+    A = archive["A"]
+    B = archive["B"]
+    if solver == "pure-nash":
+        for start in range(0, len(A), chunk_size):
+            stop = min(start + chunk_size, len(A))
+            yield from _pure_nash_results(range(start, stop), A[start:stop], B[start:stop])
+        return
+    records = ({"id": index, "A": A[index], "B": B[index]} for index in range(len(A)))
+    yield from solve_records(solver, records)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve many games from a JSONL/NPZ file or stdin.")
+    parser.add_argument("solver", choices=sorted(list(SOLVERS) + ["pure-nash"]))
+    parser.add_argument("input", nargs="?", default="-", help="JSONL or NPZ file, '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file, '-' for stdout")
+    parser.add_argument("--chunk-size", type=int, default=4096, help="Games solved together in vectorized solvers")
+    args = parser.parse_args(argv)
+
+    kind, source = _read_source(args.input)
+    if kind == "npz":
+        results = solve_npz(args.solver, source, args.chunk_size)
+    elif args.solver == "pure-nash":
+        results = solve_pure_nash_jsonl(source, args.chunk_size)
+    else:
+        results = solve_records(args.solver, _iter_records(source))
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        for result in results:
+            output.write(json.dumps(result, default=_json_default) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == "__main__":
+    main()
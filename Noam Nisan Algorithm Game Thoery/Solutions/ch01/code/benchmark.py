@@ -0,0 +1,466 @@
+"""
+Scaling benchmarks for the Q1-Q8 solvers.
+
+Every case runs a solver over a ladder of input sizes built by the generators
+below. Each (case, size) point runs in a fresh interpreter, so the peak RSS it
+reports belongs to that point alone and no cache carries over between points.
+Wall time (best of several repeats, plus the cold first call), peak RSS and
+throughput are written as JSON:
+
+    python benchmark.py --output results.json
+    python benchmark.py Q2-pure-nash Q8-bird-dense --quick
+
+Against a stored baseline, slower or larger points are reported as regressions
+(exit status 1):
+
+    python benchmark.py --baseline baseline.json --tolerance 1.5
+
+Every case also fits the slope of log(time) against log(work), where work is the
+natural size of the input (payoff entries, support pairs, nodes, ...), and flags
+a slope above the case's bound, which is how a polynomial path that has turned
+exponential shows up without any baseline.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Points faster than this are too noisy to fit or compare
+NOISE_FLOOR = 1e-3
+
+def random_bimatrix(n, rng, m=None):
+    """
+    Parameters:
+    n (int): Number of strategies of player 1
+    rng (np.random.Generator): Random generator
+    m (int): Number of strategies of player 2 (default: n)
+
+    Returns:
+    tuple: Payoff matrices with independent uniform entries
+    """
+    m = n if m is None else m
+    return rng.random((n, m)), rng.random((n, m))
+
+def random_zero_sum(n, rng):
+    """
+    Returns:
+    tuple: Integer payoff matrix A of an n x n game and -A
+    """
+    A = rng.integers(-10, 11, (n, n)).astype(float)
+    return A, -A
+
+def random_tensors(players, strategies, rng):
+    """
+    Parameters:
+    players (int): Number of players
+    strategies (int): Number of strategies of every player
+    rng (np.random.Generator): Random generator
+
+    Returns:
+    list: One payoff tensor per player, each of shape (strategies,) * players
+    """
+    return [rng.random((strategies,) * players) for _ in range(players)]
+
+def random_tree(n, rng):
+    """
+    Random recursive tree: node v > 0 hangs from one of the three nodes before it,
+    which keeps degrees small.
+
+    Returns:
+    CSRGraph: Tree on n nodes
+    """
+    from csr_graph import CSRGraph
+
+    children = np.arange(1, n)
+    parents = children - 1 - np.minimum(rng.integers(0, 3, n - 1), children - 1)
+    return CSRGraph.from_edges(n, parents, children)
+
+def random_tree_game(n, rng, strategies=2):
+    """
+    Graphical game on a random tree with payoffs depending on the neighbours.
+
+    Returns:
+    tuple: CSRGraph and the payoff table of every node (own strategy first, then
+           the neighbours in CSR order)
+    """
+    tree = random_tree(n, rng)
+    degrees = tree.degree().tolist()
+    tables = [rng.random((strategies,) * (degree + 1)) for degree in degrees]
+    return tree, tables
+
+def complete_weighted_graph(n, rng):
+    """
+    Returns:
+    np.array: Symmetric (n, n) weight matrix of a complete graph, zero diagonal
+    """
+    weights = rng.random((n, n))
+    weights = np.triu(weights, 1)
+    return weights + weights.T
+
+def sparse_weighted_graph(n, rng, degree=8):
+    """
+    Connected sparse graph: a random tree plus n * (degree / 2 - 1) random edges.
+
+    Returns:
+    CSRGraph: Weighted graph on n nodes
+    """
+    from csr_graph import CSRGraph
+
+    children = np.arange(1, n)
+    parents = rng.integers(0, children)
+    extra = n * (degree // 2 - 1)
+    u = np.concatenate((parents, rng.integers(0, n, extra)))
+    v = np.concatenate((children, rng.integers(0, n, extra)))
+    # Drop self-loops and repeated edges
+    keys = np.unique(np.minimum(u, v) * n + np.maximum(u, v))
+    u, v = keys // n, keys % n
+    keep = u != v
+    return CSRGraph.from_edges(n, u[keep], v[keep], rng.random(int(keep.sum())))
+
+def onoff_game(n, rng):
+    """
+    Returns:
+    tuple: n and random payoffs u_on, u_off indexed by the number of others "on"
+    """
+    return n, rng.random(n).tolist(), rng.random(n).tolist()
+
+def demand_curves(size, rng):
+    """
+    Linear demand curves with random intercepts, slopes and firm counts.
+
+    Returns:
+    tuple: Demand function, firm counts and the parameter arrays
+    """
+    return "a - b*q", rng.integers(2, 20, size), {"a": rng.uniform(5, 15, size), "b": rng.uniform(0.5, 2, size)}
+
+def _q1_enumeration(n, rng):
+    from support_enumeration import support_enumeration
+
+    A, B = random_bimatrix(n, rng)
+    return lambda: support_enumeration(A, B, eliminate_dominated=False)
+
+def _q1_lemke_howson(n, rng):
+    from Q1 import lemke_howson_first
+
+    A, B = random_bimatrix(n, rng)
+    return lambda: lemke_howson_first(A, B, labels=[0], workers=1)
+
+def _q1_zero_sum(n, rng):
+    from Q1 import solve_nash_equilibrium
+
+    A, B = random_zero_sum(n, rng)
+    return lambda: solve_nash_equilibrium(A, B, method="minimax")
+
+def _q2_pure_nash(n, rng):
+    from Q2 import batch_pure_nash_equilibria
+
+    A = rng.random((256, n, n))
+    B = rng.random((256, n, n))
+    return lambda: batch_pure_nash_equilibria(A, B)
+
+def _q3_pure_nash(strategies, rng):
+    from Q3 import find_pure_nash_equilibria
+
+    tensors = random_tensors(3, strategies, rng)
+    return lambda: find_pure_nash_equilibria(tensors)
+
+def _q4_tree(n, rng):
+    from Q4 import find_pure_nash_tree_profile
+
+    tree, tables = random_tree_game(n, rng)
+    return lambda: find_pure_nash_tree_profile(tree, tables)
+
+def _q4_best_response(n, rng):
+    from Q4 import find_pure_nash_graph_profile
+
+    graph = sparse_weighted_graph(n, rng, degree=20)
+    own = rng.random((n, 3)) * 3
+    return lambda: find_pure_nash_graph_profile(graph, np.eye(3), own, seed=0)
+
+def _q5_correlated(n, rng):
+    from Q5 import find_correlated_equilibrium
+
+    game = onoff_game(n, rng)
+    return lambda: find_correlated_equilibrium(*game)
+
+def _q6_epsilon(n, rng):
+    from Q6 import epsilon_approximate_nash
+
+    A, B = random_bimatrix(n, rng)
+    return lambda: epsilon_approximate_nash(A, B, epsilon=0.1, seed=0)
+
+def _q7_curves(size, rng):
+    from Q7 import bertrand_revenue_curves
+
+    p_function, n_firms, params = demand_curves(size, rng)
+    return lambda: bertrand_revenue_curves(p_function, n_firms, **params)
+
+def _oligopoly(markets, rng):
+    from oligopoly import oligopoly_equilibria
+
+    costs = rng.uniform(0, 5, (markets, 8))
+    params = {"a": rng.uniform(10, 20, markets), "b": rng.uniform(0.5, 2, markets)}
+    return lambda: oligopoly_equilibria("a - b*q", costs, **params)
+
+def _q8_bird_dense(n, rng):
+    from Q8 import compute_mst_cost_sharing
+
+    weights = complete_weighted_graph(n, rng)
+    return lambda: compute_mst_cost_sharing(weights)
+
+def _q8_bird_sparse(n, rng):
+    from Q8 import compute_mst_cost_sharing
+
+    graph = sparse_weighted_graph(n, rng)
+    return lambda: compute_mst_cost_sharing(graph)
+
+def _q8_shapley(n, rng):
+    from Q8 import compute_mst_cost_sharing
+
+    weights = complete_weighted_graph(n, rng)
+    return lambda: compute_mst_cost_sharing(weights, method="shapley", samples=16, seed=0)
+
+def _q8_dynamic(n, rng):
+    from Q8 import dynamic_mst_cost_sharing
+
+    graph = sparse_weighted_graph(n, rng)
+    u, v, _ = graph.edges()
+    picks = rng.integers(0, len(u), 1000)
+    new_weights = rng.random(1000)
+
+    def run():
+        mst = dynamic_mst_cost_sharing(graph)
+        for edge, weight in zip(picks.tolist(), new_weights.tolist()):
+            mst.set_weight(int(u[edge]), int(v[edge]), weight)
+    return run
+
+# Case name -> (setup, size ladder, work of a size, largest acceptable log-log slope
+# of time against work). setup(size, rng) builds the input and returns the call to
+# time. Work counts what the solver is expected to be linear (or near-linear) in.
+CASES = {
+    "Q1-support-enumeration": (_q1_enumeration, [3, 4, 5, 6, 7, 8], lambda n: math.comb(2 * n, n), 1.5),
+    "Q1-lemke-howson": (_q1_lemke_howson, [8, 16, 32, 48, 64], lambda n: n * n, 2.0),
+    "Q1-zero-sum": (_q1_zero_sum, [50, 100, 200, 400], lambda n: n * n, 2.0),
+    "Q2-pure-nash": (_q2_pure_nash, [8, 16, 32, 64, 128], lambda n: 256 * n * n, 1.3),
+    "Q3-pure-nash": (_q3_pure_nash, [8, 16, 32, 64, 96], lambda s: s ** 3, 1.3),
+    "Q4-tree-dp": (_q4_tree, [1000, 4000, 16000, 64000], lambda n: n, 1.3),
+    "Q4-best-response": (_q4_best_response, [5000, 20000, 80000, 320000], lambda n: 20 * n, 1.3),
+    "Q5-correlated": (_q5_correlated, [6, 8, 10, 12, 14], lambda n: n * 2 ** n, 1.5),
+    "Q6-epsilon-nash": (_q6_epsilon, [10, 20, 40, 80, 160], lambda n: n * n, 2.0),
+    "Q7-bertrand-curves": (_q7_curves, [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6], lambda n: n, 1.3),
+    "oligopoly": (_oligopoly, [10 ** 3, 10 ** 4, 10 ** 5], lambda n: n * 8, 1.3),
+    "Q8-bird-dense": (_q8_bird_dense, [250, 500, 1000, 2000], lambda n: n * n, 1.3),
+    "Q8-bird-sparse": (_q8_bird_sparse, [10 ** 4, 4 * 10 ** 4, 16 * 10 ** 4], lambda n: 4 * n, 1.3),
+    "Q8-shapley": (_q8_shapley, [16, 32, 64, 128], lambda n: n * n, 1.5),
+    "Q8-dynamic": (_q8_dynamic, [10 ** 3, 10 ** 4, 10 ** 5], lambda n: n, 1.0),
+}
+
+def _peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None where unknown)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+def run_point(case, size, repeats=3, seed=0):
+    """
+    Runs one (case, size) point in the current process.
+
+    Parameters:
+    case (str): Name of a case in CASES
+    size (int): Input size
+    repeats (int): Number of timed calls after the first (cold) one
+    seed (int): Seed of the input generator
+
+    Returns:
+    dict: Wall times, peak RSS and throughput of the point
+    """
+    setup, _, work, _ = CASES[case]
+    run = setup(size, np.random.default_rng(seed))
+    input_rss = _peak_rss_mb()
+
+    start = time.perf_counter()
+    run()
+    first = time.perf_counter() - start
+    best = first
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    return {
+        "case": case,
+        "size": size,
+        "work": work(size),
+        "seconds": best,
+        "first_seconds": first,
+        "throughput": work(size) / best if best > 0 else None,
+        "input_rss_mb": input_rss,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+def measure_point(case, size, repeats=3, seed=0, timeout=60.0):
+    """
+    Runs one (case, size) point in a fresh interpreter.
+
+    Returns:
+    dict: The point's measurements, or a record with an "error" ("timeout" or the
+          worker's last stderr line)
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    command = [sys.executable, os.path.abspath(__file__), "--point", case, str(size),
+               "--repeats", str(repeats), "--seed", str(seed)]
+    try:
+        completed = subprocess.run(command, cwd=here, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"case": case, "size": size, "error": "timeout"}
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines()
+        return {"case": case, "size": size, "error": lines[-1] if lines else f"exit {completed.returncode}"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def scaling_slope(points):
+    """
+    Least-squares slope of log(seconds) against log(work) over the points above the
+    noise floor.
+
+    Parameters:
+    points (list): Measurements of one case
+
+    Returns:
+    float: The slope, or None with fewer than two usable points
+    """
+    usable = [point for point in points if "error" not in point and point["seconds"] >= NOISE_FLOOR]
+    if len(usable) < 2 or len({point["work"] for point in usable}) < 2:
+        return None
+    work = np.log([point["work"] for point in usable])
+    seconds = np.log([point["seconds"] for point in usable])
+    return float(np.polyfit(work, seconds, 1)[0])
+
+def compare_with_baseline(results, baseline, tolerance=1.5):
+    """
+    Points that got slower or bigger than the baseline by more than the tolerance
+    factor (with small absolute margins to ignore noise).
+
+    Parameters:
+    results (list): Current measurements
+    baseline (list): Measurements of a previous run
+    tolerance (float): Accepted ratio of current to baseline time and peak RSS
+
+    Returns:
+    list: Human-readable descriptions of the regressions
+    """
+    previous = {(point["case"], point["size"]): point for point in baseline if "error" not in point}
+    regressions = []
+    for point in results:
+        old = previous.get((point["case"], point["size"]))
+        if old is None:
+            continue
+        name = f"{point['case']} size {point['size']}"
+        if "error" in point:
+            regressions.append(f"{name}: {point['error']} (baseline {old['seconds']:.4f} s)")
+            continue
+        if point["seconds"] > tolerance * old["seconds"] + 5 * NOISE_FLOOR:
+            regressions.append(f"{name}: {point['seconds']:.4f} s vs. baseline {old['seconds']:.4f} s")
+        if (point["peak_rss_mb"] is not None and old.get("peak_rss_mb") is not None
+                and point["peak_rss_mb"] > tolerance * old["peak_rss_mb"] + 16):
+            regressions.append(f"{name}: {point['peak_rss_mb']:.0f} MB peak RSS vs. baseline "
+                               f"{old['peak_rss_mb']:.0f} MB")
+    return regressions
+
+def run_benchmarks(cases, repeats=3, seed=0, timeout=60.0, quick=False, log=None):
+    """
+    Runs the size ladder of every case. A ladder stops at its first failed or timed
+    out point, since larger sizes would only fail more slowly.
+
+    Parameters:
+    cases (list): Case names
+    repeats (int): Timed calls per point after the cold one
+    seed (int): Seed of the input generators
+    timeout (float): Seconds allowed per point
+    quick (bool): Run only the three smallest sizes of each ladder
+    log (file): Where to print progress (None for silence)
+
+    Returns:
+    tuple: All measurements and the fitted slope of every case
+    """
+    results = []
+    slopes = {}
+    for case in cases:
+        _, sizes, _, max_slope = CASES[case]
+        points = []
+        for size in sizes[:3] if quick else sizes:
+            point = measure_point(case, size, repeats, seed, timeout)
+            points.append(point)
+            if log is not None:
+                if "error" in point:
+                    print(f"{case:24} {size:>9}  {point['error']}", file=log)
+                else:
+                    print(f"{case:24} {size:>9}  {point['seconds']:10.4f} s  {point['peak_rss_mb'] or 0:8.1f} MB  "
+                          f"{point['throughput'] or 0:12.4g} work/s", file=log)
+            if "error" in point:
+                break
+        results.extend(points)
+        slopes[case] = {"slope": scaling_slope(points), "max_slope": max_slope}
+    return results, slopes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark how the Q1-Q8 solvers scale with input size.")
+    parser.add_argument("cases", nargs="*", default=list(CASES), help="Cases to run (default: all)")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed calls per point after the cold one")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the input generators")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds allowed per point")
+    parser.add_argument("--quick", action="store_true", help="Run only the three smallest sizes of each case")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="Accepted ratio of time and peak RSS to the baseline")
+    parser.add_argument("--point", nargs=2, metavar=("CASE", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.point:
+        # Worker mode: measure one point and print it for the parent process
+        print(json.dumps(run_point(args.point[0], int(args.point[1]), args.repeats, args.seed)))
+        return 0
+
+    unknown = [case for case in args.cases if case not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)} (choose from {', '.join(CASES)})")
+
+    results, slopes = run_benchmarks(args.cases, args.repeats, args.seed, args.timeout, args.quick, sys.stdout)
+    failures = [f"{point['case']} size {point['size']}: {point['error']}" for point in results if "error" in point]
+    failures += [f"{case}: time grows as work^{fit['slope']:.2f}, expected at most work^{fit['max_slope']}"
+                 for case, fit in slopes.items() if fit["slope"] is not None and fit["slope"] > fit["max_slope"]]
+    if args.baseline:
+        with open(args.baseline) as file:
+            failures += compare_with_baseline(results, json.load(file)["results"], args.tolerance)
+
+    if args.output:
+        report = {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "cpus": os.cpu_count(),
+            "results": results,
+            "scaling": slopes,
+            "regressions": failures,
+        }
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
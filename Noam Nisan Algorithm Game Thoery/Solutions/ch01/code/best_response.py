@@ -0,0 +1,263 @@
+import numpy as np
+
+import instrumentation
+from csr_graph import CSRGraph
+
+def is_exact_potential(interaction):
+    """
+    Checks whether a pairwise graphical game is an exact potential game. In these
+    games node v earns own[v, s_v] + sum over neighbours u of w_vu * M[s_v, s_u], and
+    the two-player game on every edge must be a potential game. That holds when M
+    and M^T have the same double differences
+    M[i, j] - M[i', j] - M[i, j'] + M[i', j'], because edge weights are symmetric in a
+    CSRGraph. Own payoffs never break the property.
+
+    Parameters:
+    interaction (np.array): (S, S) payoff M[own strategy, neighbour's strategy]
+
+    Returns:
+    bool: True if every game with this interaction matrix has an exact potential
+    """
+    M = np.asarray(interaction, dtype=float)
+    # All double differences are sums of the ones anchored at (0, 0)
+    anchored = M - M[:1, :] - M[:, :1] + M[0, 0]
+    scale = 1.0 + np.abs(M).max() if M.size else 1.0
+    return bool(np.abs(anchored - anchored.T).max(initial=0.0) <= 1e-9 * scale)
+
+def _rows(indptr, nodes):
+    """
+    Adjacency slots of a subset of nodes: returns (slots, owner) where
+    indices[slots] are the neighbours and owner the position in `nodes` of the node
+    each slot belongs to.
+    """
+    starts = indptr[nodes]
+    counts = indptr[nodes + 1] - starts
+    total = int(counts.sum())
+    offsets = np.cumsum(counts) - counts
+    slots = np.repeat(starts - offsets, counts) + np.arange(total)
+    owner = np.repeat(np.arange(len(nodes)), counts)
+    return slots, owner
+
+def _distinct(values, scratch):
+    """
+    Distinct entries of an array of node indices, without sorting. scratch holds one
+    integer per node; its contents are overwritten.
+    """
+    positions = np.arange(len(values))
+    scratch[values] = positions
+    return values[scratch[values] == positions]
+
+def _fields(graph, weights, interaction, own, profile):
+    """
+    Payoff of every node for every strategy against the current profile, computed
+    from scratch: F[a, v] = own[v, a] + sum over neighbours u of w_vu * M[a, s_u].
+    Strategies are the rows so that updating one strategy touches contiguous memory.
+    """
+    from scipy import sparse
+
+    n = graph.num_nodes
+    adjacency = sparse.csr_matrix((weights, graph.indices, graph.indptr), shape=(n, n))
+    fields = np.asarray(adjacency @ interaction.T[profile])
+    if own is not None:
+        fields += own
+    return np.ascontiguousarray(fields.T)
+
+def _gains(fields, profile, nodes):
+    """
+    How much each of `nodes` would gain by switching to a best response.
+    """
+    best = fields[0, nodes]
+    for row in fields[1:]:
+        np.maximum(best, row[nodes], out=best)
+    return best - fields.ravel()[profile[nodes] * fields.shape[1] + nodes]
+
+def _color_classes(indptr, indices, rng):
+    """
+    Splits the nodes into classes of pairwise non-adjacent nodes (Jones-Plassmann
+    with random priorities): a node joins the class after the latest class of its
+    higher-priority neighbours. Every round handles only the nodes it colours, so the
+    total work is proportional to the number of edges.
+
+    Returns:
+    tuple: Class of every node, the nodes sorted by class and the start of every
+           class in that order (CSR-style, one more entry than classes)
+    """
+    n = len(indptr) - 1
+    priority = rng.permutation(n).astype(indices.dtype)
+    # lower[slot] is True if the slot's neighbour has a lower priority than its owner
+    lower = priority[indices] < np.repeat(priority, np.diff(indptr))
+    del priority
+    # Number of higher-priority neighbours of every node
+    waiting = np.bincount(indices[lower], minlength=n)
+    color = np.full(n, -1, dtype=np.int64)
+    # Working space of _distinct, kept apart from the colours it would overwrite
+    scratch = np.empty(n, dtype=np.int64)
+    frontier = np.flatnonzero(waiting == 0)
+    current = 0
+    while len(frontier):
+        color[frontier] = current
+        slots, _ = _rows(indptr, frontier)
+        slots = slots[lower[slots]]
+        np.subtract.at(waiting, indices[slots], 1)
+        released = _distinct(indices[slots], scratch)
+        frontier = released[waiting[released] == 0]
+        current += 1
+    order = np.argsort(color, kind="stable")
+    starts = np.zeros(current + 1, dtype=np.int64)
+    np.cumsum(np.bincount(color, minlength=current), out=starts[1:])
+    return color, order, starts
+
+def best_response_dynamics(graph, interaction, own=None, initial=None, tol=1e-9, max_rounds=100000,
+                           max_restarts=10, seed=None):
+    """
+    Pure Nash equilibrium of a pairwise graphical game on any graph (cycles
+    allowed), found by asynchronous best-response dynamics. Node v earns
+    own[v, s_v] + sum over neighbours u of w_vu * M[s_v, s_u].
+
+    The nodes are first split into classes of pairwise non-adjacent nodes, so all
+    unhappy nodes of a class (those with a strictly better strategy) can switch to a
+    best response together, exactly as if they moved one after another. A priority
+    queue over the classes, keyed by an upper bound on the largest gain in each,
+    picks the class to serve next. After a move, the payoff table F[v, :] of every
+    neighbour of a mover is updated from the mover's adjacency list, and only those
+    neighbours are re-examined. The work per move is therefore proportional to the
+    mover's degree.
+
+    In exact potential games (see is_exact_potential) every move raises the
+    potential, so the dynamics converge. In other games the profile is tracked with
+    a Zobrist hash: a repeated hash means the deterministic dynamics are in a
+    cycle, and they restart from a random profile.
+
+    Parameters:
+    graph (CSRGraph): Interaction graph (weights default to 1)
+    interaction (np.array): (S, S) payoff M[own strategy, neighbour's strategy]
+    own (np.array): (n, S) payoffs that depend only on a node's own strategy (optional)
+    initial (np.array): Starting strategy of every node (random if None)
+    tol (float): Gains up to this, relative to the payoff scale, count as no gain
+    max_rounds (int): Class moves per attempt before giving up on it
+    max_restarts (int): Random restarts after a cycle or an attempt running out of rounds
+    seed (int): Seed for the colouring, the starting profiles and the hash keys
+
+    Returns:
+    np.array: Strategy of every node in a pure Nash equilibrium, or None if none was
+              found within max_restarts restarts
+    """
+    interaction = np.asarray(interaction, dtype=float)
+    num_strategies = interaction.shape[0]
+    if interaction.ndim != 2 or interaction.shape[1] != num_strategies:
+        raise ValueError("The interaction matrix must be square (one row and column per strategy).")
+    n = graph.num_nodes
+    if own is not None:
+        own = np.asarray(own, dtype=float)
+        if own.shape != (n, num_strategies):
+            raise ValueError("Own payoffs need one row per node and one column per strategy.")
+    if initial is not None and np.shape(initial) != (n,):
+        raise ValueError("The initial profile needs one strategy per node.")
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    indptr = graph.indptr
+    indices = graph.indices
+    weights = np.ones(len(indices)) if graph.weights is None else graph.weights
+    rng = np.random.default_rng(seed)
+    potential = is_exact_potential(interaction)
+    scale = np.abs(interaction).max() * (np.abs(weights).max(initial=0.0) if len(weights) else 0.0)
+    if own is not None:
+        scale += np.abs(own).max()
+    threshold = tol * (1.0 + scale)
+    keys = None if potential else rng.integers(0, 2 ** 63, (n, num_strategies), dtype=np.int64)
+
+    if initial is None:
+        profile = rng.integers(0, num_strategies, n)
+    else:
+        profile = np.array(initial, dtype=np.int64)
+    moves = 0
+    rounds = 0
+    with instrumentation.timer("best_response.solve"):
+        color, by_color, color_starts = _color_classes(indptr, indices, rng)
+        for attempt in range(max_restarts + 1):
+            if attempt:
+                profile = rng.integers(0, num_strategies, n)
+                instrumentation.count("best_response.restarts")
+            fields = _fields(graph, weights, interaction, own, profile)
+            gain = _gains(fields, profile, np.arange(n))
+            # Upper bound on the largest gain in every class: raised whenever a
+            # node's gain is recomputed, lowered only when the class is served
+            bound = np.zeros(len(color_starts) - 1)
+            np.maximum.at(bound, color, gain)
+            if keys is not None:
+                fingerprint = np.bitwise_xor.reduce(keys[np.arange(n), profile])
+                seen = {int(fingerprint)}
+
+            for _ in range(max_rounds):
+                served = int(bound.argmax())
+                if bound[served] <= threshold:
+                    # Incremental updates accumulate rounding, so confirm from scratch
+                    fields = _fields(graph, weights, interaction, own, profile)
+                    gain = _gains(fields, profile, np.arange(n))
+                    np.maximum.at(bound, color, gain)
+                    if bound.max() <= threshold:
+                        instrumentation.count("best_response.moves", moves)
+                        instrumentation.count("best_response.rounds", rounds)
+                        return profile
+                    continue
+                bound[served] = 0.0
+                members = by_color[color_starts[served]:color_starts[served + 1]]
+                movers = members[gain[members] > threshold]
+                if len(movers) == 0:
+                    continue
+                rounds += 1
+                old = profile[movers]
+                new = fields[:, movers].argmax(axis=0)
+                profile[movers] = new
+                moves += len(movers)
+
+                # Each neighbour u of a mover v gains w_uv * (M[:, new] - M[:, old])
+                slots, owner = _rows(indptr, movers)
+                targets = indices[slots]
+                edge_weights = weights[slots]
+                change = interaction[:, new] - interaction[:, old]
+                for strategy in range(num_strategies):
+                    np.add.at(fields[strategy], targets, edge_weights * change[strategy][owner])
+                # Movers are not adjacent, so their own tables did not change. A
+                # neighbour of several movers is simply re-examined several times
+                gain[movers] = 0.0
+                touched_gain = _gains(fields, profile, targets)
+                gain[targets] = touched_gain
+                np.maximum.at(bound, color[targets], touched_gain)
+
+                if keys is not None:
+                    fingerprint ^= np.bitwise_xor.reduce(keys[movers, old] ^ keys[movers, new])
+                    if int(fingerprint) in seen:
+                        break
+                    seen.add(int(fingerprint))
+
+    instrumentation.count("best_response.moves", moves)
+    instrumentation.count("best_response.rounds", rounds)
+    return None
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n, extra = 10 ** 5, 10 ** 6
+    u = np.concatenate((np.arange(1, n), rng.integers(0, n, extra)))
+    v = np.concatenate((rng.integers(0, np.arange(1, n)), rng.integers(0, n, extra)))
+    keep = u != v
+    graph = CSRGraph.from_edges(n, u[keep], v[keep], rng.random(int(keep.sum())))
+
+    # Coordination with private preferences is a potential game
+    coordination = np.eye(3)
+    own = rng.random((n, 3)) * 3
+    start = time.perf_counter()
+    profile = best_response_dynamics(graph, coordination, own, seed=0)
+    print(f"Coordination on {n} nodes and {graph.num_edges} edges: potential "
+          f"{is_exact_potential(coordination)}, solved in {time.perf_counter() - start:.2f} s")
+
+    # Rock-paper-scissors against both neighbours is not a potential game; on a
+    # triangle it has no pure equilibrium, anti-coordination on a triangle has one
+    triangle = CSRGraph.from_edges(3, [0, 1, 2], [1, 2, 0])
+    rps = np.array([[0, -1, 1], [1, 0, -1], [-1, 1, 0]])
+    print("Rock-paper-scissors on a triangle: potential", is_exact_potential(rps),
+          "equilibrium", best_response_dynamics(triangle, rps, seed=0))
+    print("Anti-coordination on a triangle:", best_response_dynamics(triangle, 1 - np.eye(2), seed=0))
@@ -0,0 +1,79 @@
+"""
+Import-time regression gate for the solver modules.
+
+Imports every module in a fresh interpreter under `python -X importtime` and fails
+(exit status 1) if a heavy dependency is loaded at import time or a module's
+cumulative import time exceeds the budget:
+
+    python check_import_time.py --budget-ms 300
+
+This is why the solver modules import nashpy, scipy, sympy and networkx inside
+the functions that need them rather than at the top of the file.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+MODULES = ["solvers", "Q1", "Q2", "Q3", "Q4", "Q5", "Q6", "Q7", "Q8", "game_store", "support_enumeration",
+           "batch_solve", "csr_graph", "mst_engine", "dynamic_mst",
+           "oligopoly", "equilibrium_cache", "zero_sum", "instrumentation", "service", "no_regret", "best_response"]
+
+# Packages that must only be imported when a solver that needs them is called
+HEAVY_DEPENDENCIES = ["nashpy", "scipy", "sympy", "networkx"]
+
+def measure_import(module, repeats=3):
+    """
+    Measures one module's import in fresh interpreters with -X importtime.
+
+    Parameters:
+    module (str): Module name importable from this directory
+    repeats (int): Number of fresh interpreters; the fastest run is kept
+
+    Returns:
+    tuple: (cumulative import time in microseconds, set of top-level packages imported)
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    best = None
+    imported = set()
+    for _ in range(repeats):
+        completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                   cwd=here, capture_output=True, text=True, check=True)
+        cumulative = None
+        for line in completed.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            fields = [field.strip() for field in line[len("import time:"):].split("|")]
+            if not fields[0].isdigit():
+                continue  # column header
+            name = fields[2]
+            imported.add(name.split(".")[0])
+            if name == module:
+                cumulative = int(fields[1])
+        if cumulative is not None and (best is None or cumulative < best):
+            best = cumulative
+    return best, imported
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fail if importing the solvers is slow or loads heavy packages.")
+    parser.add_argument("--budget-ms", type=float, default=300.0, help="Maximum cumulative import time per module")
+    parser.add_argument("--repeats", type=int, default=3, help="Fresh interpreters per module (fastest run kept)")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    args = parser.parse_args(argv)
+
+    failures = []
+    for module in args.modules:
+        cumulative, imported = measure_import(module, args.repeats)
+        heavy = sorted(set(HEAVY_DEPENDENCIES) & imported)
+        print(f"{module:<12} {cumulative / 1000:8.1f} ms" + (f"  eager: {', '.join(heavy)}" if heavy else ""))
+        if heavy:
+            failures.append(f"{module} imports {', '.join(heavy)} at import time")
+        if cumulative / 1000 > args.budget_ms:
+            failures.append(f"{module} takes {cumulative / 1000:.1f} ms to import (budget {args.budget_ms} ms)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
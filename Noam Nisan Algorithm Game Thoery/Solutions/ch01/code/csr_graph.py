@@ -0,0 +1,148 @@
+import numpy as np
+
+class CSRGraph:
+    """
+    Undirected graph stored as compressed sparse rows, with every edge kept in both
+    directions: the neighbours of node v are indices[indptr[v]:indptr[v + 1]] and
+    weights[indptr[v]:indptr[v + 1]] holds the matching edge weights.
+
+    Nodes are the integers 0..num_nodes-1; `labels` optionally records the original
+    node names (e.g. of a networkx graph), labels[v] being the name of node v.
+    """
+    __slots__ = ("indptr", "indices", "weights", "labels")
+
+    def __init__(self, indptr, indices, weights=None, labels=None):
+        self.indptr = np.asarray(indptr)
+        self.indices = np.asarray(indices)
+        self.weights = None if weights is None else np.asarray(weights, dtype=float)
+        self.labels = labels
+
+    @property
+    def num_nodes(self):
+        return len(self.indptr) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.indices) // 2
+
+    def __repr__(self):
+        return f"CSRGraph(num_nodes={self.num_nodes}, num_edges={self.num_edges})"
+
+    def degree(self):
+        """
+        Returns:
+        np.array: Degree of every node
+        """
+        return np.diff(self.indptr)
+
+    def neighbors(self, node):
+        """
+        Parameters:
+        node (int): Node index
+
+        Returns:
+        np.array: Indices of the node's neighbours
+        """
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def edges(self):
+        """
+        Every undirected edge once, as arrays (u, v, weight) with u < v.
+
+        Returns:
+        tuple: Endpoint arrays and weight array (None for unweighted graphs)
+        """
+        sources = np.repeat(np.arange(self.num_nodes, dtype=self.indices.dtype), self.degree())
+        once = sources < self.indices
+        weights = None if self.weights is None else self.weights[once]
+        return sources[once], self.indices[once], weights
+
+    @classmethod
+    def from_edges(cls, num_nodes, u, v, weights=None, labels=None):
+        """
+        Builds a graph from undirected edge arrays with one vectorized sort.
+
+        Parameters:
+        num_nodes (int): Number of nodes
+        u (np.array): First endpoint of every edge
+        v (np.array): Second endpoint of every edge
+        weights (np.array): Weight of every edge (optional)
+        labels (list): Original node names (optional)
+
+        Returns:
+        CSRGraph: The graph
+        """
+        index_dtype = np.int32 if num_nodes < 2 ** 31 else np.int64
+        u = np.asarray(u, dtype=index_dtype)
+        v = np.asarray(v, dtype=index_dtype)
+        sources = np.concatenate((u, v))
+        targets = np.concatenate((v, u))
+        # Stable sort by source keeps each node's neighbours in input order
+        order = np.argsort(sources, kind="stable")
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=num_nodes), out=indptr[1:])
+        stored_weights = None
+        if weights is not None:
+            weights = np.asarray(weights, dtype=float)
+            stored_weights = np.concatenate((weights, weights))[order]
+        return cls(indptr, targets[order], stored_weights, labels)
+
+    @classmethod
+    def from_networkx(cls, graph, weight="weight"):
+        """
+        Converts a networkx graph; node v of the result is list(graph.nodes())[v] and
+        its neighbours keep the order of graph.neighbors.
+
+        Parameters:
+        graph (nx.Graph): Undirected graph
+        weight (str): Edge attribute holding the weight (edges without it get None
+                      if no edge has it, 1.0 otherwise)
+
+        Returns:
+        CSRGraph: The graph, with labels set to the networkx node names
+        """
+        nodes = list(graph.nodes())
+        position = {node: v for v, node in enumerate(nodes)}
+        adjacency = graph.adj
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum([len(adjacency[node]) for node in nodes], out=indptr[1:])
+        index_dtype = np.int32 if len(nodes) < 2 ** 31 else np.int64
+        indices = np.fromiter((position[neighbor] for node in nodes for neighbor in adjacency[node]),
+                              dtype=index_dtype, count=int(indptr[-1]))
+        weights = np.fromiter((data.get(weight, 1.0) for node in nodes for data in adjacency[node].values()),
+                              dtype=float, count=int(indptr[-1]))
+        has_weights = any(weight in data for _, _, data in graph.edges(data=True))
+        return cls(indptr, indices, weights if has_weights else None, nodes)
+
+    def to_networkx(self, weight="weight"):
+        """
+        Converts back to a networkx graph, using the stored labels as node names.
+
+        Parameters:
+        weight (str): Edge attribute to store the weights in
+
+        Returns:
+        nx.Graph: The graph
+        """
+        import networkx as nx
+
+        labels = self.labels if self.labels is not None else range(self.num_nodes)
+        graph = nx.Graph()
+        graph.add_nodes_from(labels)
+        u, v, weights = self.edges()
+        if weights is None:
+            graph.add_edges_from((labels[a], labels[b]) for a, b in zip(u.tolist(), v.tolist()))
+        else:
+            graph.add_edges_from((labels[a], labels[b], {weight: w})
+                                 for a, b, w in zip(u.tolist(), v.tolist(), weights.tolist()))
+        return graph
+
+    def to_scipy(self):
+        """
+        Returns:
+        scipy.sparse.csr_matrix: Weighted adjacency matrix (weights 1 if unweighted)
+        """
+        from scipy import sparse
+
+        data = np.ones(len(self.indices)) if self.weights is None else self.weights
+        return sparse.csr_matrix((data, self.indices, self.indptr), shape=(self.num_nodes, self.num_nodes))
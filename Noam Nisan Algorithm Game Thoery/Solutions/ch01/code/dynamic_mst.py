@@ -0,0 +1,493 @@
+import math
+from bisect import bisect_left, insort
+
+import numpy as np
+
+from mst_engine import kruskal
+
+class _LinkCutTree:
+    """
+    Link-cut tree over plain lists, answering path-maximum queries. Node 0 is a
+    null sentinel; every other node carries a value and `best[x]` is the node with
+    the largest value in x's splay subtree.
+    """
+    __slots__ = ("left", "right", "up", "flip", "value", "best")
+
+    def __init__(self, size):
+        self.left = [0] * (size + 1)
+        self.right = [0] * (size + 1)
+        self.up = [0] * (size + 1)
+        self.flip = [False] * (size + 1)
+        self.value = [-math.inf] * (size + 1)
+        self.best = list(range(size + 1))
+
+    def _is_root(self, x):
+        parent = self.up[x]
+        return parent == 0 or (self.left[parent] != x and self.right[parent] != x)
+
+    def _update(self, x):
+        value = self.value
+        best = x
+        left, right = self.left[x], self.right[x]
+        if left and value[self.best[left]] > value[best]:
+            best = self.best[left]
+        if right and value[self.best[right]] > value[best]:
+            best = self.best[right]
+        self.best[x] = best
+
+    def _push(self, x):
+        if self.flip[x]:
+            left, right = self.left[x], self.right[x]
+            self.left[x], self.right[x] = right, left
+            if left:
+                self.flip[left] = not self.flip[left]
+            if right:
+                self.flip[right] = not self.flip[right]
+            self.flip[x] = False
+
+    def _rotate(self, x):
+        parent = self.up[x]
+        grandparent = self.up[parent]
+        if not self._is_root(parent):
+            if self.left[grandparent] == parent:
+                self.left[grandparent] = x
+            else:
+                self.right[grandparent] = x
+        self.up[x] = grandparent
+        if self.left[parent] == x:
+            child = self.right[x]
+            self.left[parent] = child
+            self.right[x] = parent
+        else:
+            child = self.left[x]
+            self.right[parent] = child
+            self.left[x] = parent
+        if child:
+            self.up[child] = parent
+        self.up[parent] = x
+        self._update(parent)
+        self._update(x)
+
+    def _splay(self, x):
+        # Pending reversals must be pushed down from the top before rotating
+        path = [x]
+        while not self._is_root(path[-1]):
+            path.append(self.up[path[-1]])
+        for node in reversed(path):
+            self._push(node)
+
+        while not self._is_root(x):
+            parent = self.up[x]
+            if not self._is_root(parent):
+                grandparent = self.up[parent]
+                if (self.left[grandparent] == parent) == (self.left[parent] == x):
+                    self._rotate(parent)
+                else:
+                    self._rotate(x)
+            self._rotate(x)
+
+    def _access(self, x):
+        last = 0
+        node = x
+        while node:
+            self._splay(node)
+            self.right[node] = last
+            self._update(node)
+            last = node
+            node = self.up[node]
+        self._splay(x)
+
+    def _evert(self, x):
+        self._access(x)
+        self.flip[x] = not self.flip[x]
+
+    def find_root(self, x):
+        self._access(x)
+        while True:
+            self._push(x)
+            if not self.left[x]:
+                break
+            x = self.left[x]
+        self._splay(x)
+        return x
+
+    def connected(self, x, y):
+        return x == y or self.find_root(x) == self.find_root(y)
+
+    def link(self, x, y):
+        self._evert(x)
+        self.up[x] = y
+
+    def cut(self, x, y):
+        self._evert(x)
+        self._access(y)
+        self.left[y] = 0
+        self.up[x] = 0
+        self._update(y)
+
+    def set_value(self, x, value):
+        self._access(x)
+        self.value[x] = value
+        self._update(x)
+
+    def path_max(self, x, y):
+        self._evert(x)
+        self._access(y)
+        return self.best[y]
+
+class DynamicMST:
+    """
+    Minimum spanning forest maintained under edge insertions, deletions and weight
+    changes, together with Bird's cost allocation towards a root.
+
+    Tree edges live in a link-cut tree (one extra node per edge, valued by its
+    weight), so the heaviest edge on a cycle is found in O(log n) amortized time
+    (cycle property). When a tree edge is removed or becomes heavier, the smaller
+    of the two sides is explored and the lightest non-tree edge leaving it, found
+    from the weight-sorted list of non-tree edges or from the side's own edges,
+    replaces it (cut property). Every node also keeps its parent towards
+    the root; a swap only reverses the parent pointers on one path, so each update
+    touches, and reports, only the allocations it changes.
+    """
+
+    def __init__(self, num_nodes, u, v, weights, root=0, labels=None):
+        """
+        Parameters:
+        num_nodes (int): Number of nodes
+        u (np.array): First endpoint of every edge
+        v (np.array): Second endpoint of every edge
+        weights (np.array): Weight of every edge
+        root (int): Root node, which pays nothing
+        labels (list): Original node names, used as keys of the allocations (optional)
+        """
+        self.num_nodes = num_nodes
+        self.root = root
+        self.labels = labels
+        self._index = None if labels is None else {label: node for node, label in enumerate(labels)}
+        # Link-cut tree nodes: 1..n are vertices, n + 1 + slot is the tree edge in `slot`
+        self._tree = _LinkCutTree(2 * num_nodes)
+        self._free_slots = list(range(num_nodes - 2, -1, -1))
+        self._slot_edges = [None] * max(num_nodes - 1, 0)
+        self._edges = {}
+        self._spare = []
+        self._tree_adjacency = [set() for _ in range(num_nodes)]
+        self._spare_adjacency = [{} for _ in range(num_nodes)]
+        self.parent = [-1] * num_nodes
+        self.cost = [math.inf] * num_nodes
+        self.cost[root] = 0.0
+
+        u = np.asarray(u, dtype=np.int64)
+        v = np.asarray(v, dtype=np.int64)
+        weights = np.asarray(weights, dtype=float)
+        chosen = np.zeros(len(u), dtype=bool)
+        chosen[kruskal(num_nodes, u, v, weights)] = True
+
+        for a, b, weight, in_tree in zip(u.tolist(), v.tolist(), weights.tolist(), chosen.tolist()):
+            key = (a, b) if a < b else (b, a)
+            if key in self._edges or a == b:
+                raise ValueError("Edges must be distinct and connect two different nodes.")
+            if in_tree:
+                self._edges[key] = [weight, self._attach(a, b, weight)]
+            else:
+                self._edges[key] = [weight, -1]
+                self._spare.append((weight, key[0], key[1]))
+                self._spare_adjacency[a][b] = weight
+                self._spare_adjacency[b][a] = weight
+        self._spare.sort()
+
+        # Orient every tree towards the root (or, away from it, towards its first node)
+        seen = [False] * num_nodes
+        for start in [root] + list(range(num_nodes)):
+            if seen[start]:
+                continue
+            seen[start] = True
+            stack = [start]
+            while stack:
+                node = stack.pop()
+                for neighbor in self._tree_adjacency[node]:
+                    if not seen[neighbor]:
+                        seen[neighbor] = True
+                        self.parent[neighbor] = node
+                        self.cost[neighbor] = self._edges[(node, neighbor) if node < neighbor else (neighbor, node)][0]
+                        stack.append(neighbor)
+
+    @classmethod
+    def from_graph(cls, graph, root=0):
+        """
+        Parameters:
+        graph (CSRGraph): Weighted graph
+        root (int): Root node
+
+        Returns:
+        DynamicMST: Dynamic MST of the graph
+        """
+        u, v, weights = graph.edges()
+        if weights is None:
+            weights = np.ones(len(u))
+        return cls(graph.num_nodes, u, v, weights, root, graph.labels)
+
+    @property
+    def total_cost(self):
+        return sum(entry[0] for entry in self._edges.values() if entry[1] >= 0)
+
+    def allocation(self):
+        """
+        Returns:
+        dict: Bird cost share of every agent (np.inf if it cannot reach the root)
+        """
+        rooted = self._component(self.root)
+        return {self._label(node): self.cost[node] if node in rooted else math.inf
+                for node in range(self.num_nodes) if node != self.root}
+
+    def tree_edges(self):
+        """
+        Returns:
+        list: (u, v, weight) for every edge of the spanning forest
+        """
+        return [(self._label(a), self._label(b), weight)
+                for (a, b), (weight, slot) in self._edges.items() if slot >= 0]
+
+    def set_weight(self, u, v, weight):
+        """
+        Inserts the edge (u, v) or changes its weight.
+
+        Parameters:
+        u, v: Endpoints (node names if labels were given)
+        weight (float): New weight
+
+        Returns:
+        dict: New cost share of every agent whose share changed
+        """
+        a, b = self._node(u), self._node(v)
+        if a == b:
+            raise ValueError("Edges must connect two different nodes.")
+        key = (a, b) if a < b else (b, a)
+        before = {}
+        entry = self._edges.get(key)
+
+        if entry is None or entry[1] < 0:
+            if entry is not None:
+                self._remove_spare(entry[0], key)
+            self._edges[key] = [weight, -1]
+            self._insert(key, weight, before)
+        elif weight <= entry[0]:
+            # A lighter tree edge stays in the tree; only the child's share changes
+            entry[0] = weight
+            self._tree.set_value(self.num_nodes + 1 + entry[1], weight)
+            child = key[1] if self.parent[key[1]] == key[0] else key[0]
+            before.setdefault(child, self._share(child))
+            self.cost[child] = weight
+        else:
+            # A heavier tree edge competes with the lightest edge across its cut
+            child, rooted = self._detach(key, before)
+            entry[0] = weight
+            replacement = self._lightest_crossing(*key)
+            if replacement is not None and replacement[0] < weight:
+                self._remove_spare(*replacement)
+                self._edges[replacement[1]][1] = self._connect(replacement[1], replacement[0], before, rooted)
+                self._spare_insert(weight, key)
+            else:
+                self._edges[key][1] = self._connect((child, key[0] + key[1] - child), weight, before, rooted)
+        return self._changes(before, key)
+
+    def delete_edge(self, u, v):
+        """
+        Removes the edge (u, v).
+
+        Parameters:
+        u, v: Endpoints (node names if labels were given)
+
+        Returns:
+        dict: New cost share of every agent whose share changed
+        """
+        a, b = self._node(u), self._node(v)
+        key = (a, b) if a < b else (b, a)
+        entry = self._edges.pop(key, None)
+        if entry is None:
+            raise ValueError(f"There is no edge between {u} and {v}.")
+        before = {}
+        if entry[1] < 0:
+            self._remove_spare(entry[0], key)
+        else:
+            child, rooted = self._detach(key, before, entry)
+            replacement = self._lightest_crossing(*key)
+            if replacement is not None:
+                self._remove_spare(*replacement)
+                self._edges[replacement[1]][1] = self._connect(replacement[1], replacement[0], before, rooted)
+            elif rooted:
+                # The whole side of the child is cut off from the root
+                for node in self._component(child):
+                    before.setdefault(node, self.cost[node])
+        return self._changes(before, key)
+
+    def _node(self, name):
+        return name if self._index is None else self._index[name]
+
+    def _label(self, node):
+        return node if self.labels is None else self.labels[node]
+
+    def _share(self, node):
+        """
+        Bird share of a node: its parent edge's weight, or inf off the root's tree.
+        """
+        if not self._tree.connected(node + 1, self.root + 1):
+            return math.inf
+        return self.cost[node]
+
+    def _component(self, node):
+        """
+        Nodes of the tree containing node.
+        """
+        members = {node}
+        stack = [node]
+        while stack:
+            for neighbor in self._tree_adjacency[stack.pop()]:
+                if neighbor not in members:
+                    members.add(neighbor)
+                    stack.append(neighbor)
+        return members
+
+    def _changes(self, before, key):
+        """
+        New share of every recorded node whose share differs from the recorded one.
+        before maps a node to its share before the update of the edge key; every
+        recorded node is in the tree of one of its endpoints.
+        """
+        a, b = key
+        if self._tree.connected(a + 1, b + 1):
+            # One tree holds every recorded node, so one query decides all shares
+            rooted = self._tree.connected(a + 1, self.root + 1)
+            shares = ((node, self.cost[node] if rooted else math.inf) for node in before)
+        else:
+            shares = ((node, self._share(node)) for node in before)
+        return {self._label(node): share for node, share in shares
+                if node != self.root and share != before[node]}
+
+    def _spare_insert(self, weight, key):
+        insort(self._spare, (weight, key[0], key[1]))
+        self._spare_adjacency[key[0]][key[1]] = weight
+        self._spare_adjacency[key[1]][key[0]] = weight
+
+    def _remove_spare(self, weight, key):
+        position = bisect_left(self._spare, (weight, key[0], key[1]))
+        del self._spare[position]
+        del self._spare_adjacency[key[0]][key[1]]
+        del self._spare_adjacency[key[1]][key[0]]
+
+    def _attach(self, a, b, weight):
+        """
+        Links a tree edge into the link-cut tree and returns its slot.
+        """
+        slot = self._free_slots.pop()
+        node = self.num_nodes + 1 + slot
+        self._slot_edges[slot] = (a, b) if a < b else (b, a)
+        self._tree.set_value(node, weight)
+        self._tree.link(a + 1, node)
+        self._tree.link(node, b + 1)
+        self._tree_adjacency[a].add(b)
+        self._tree_adjacency[b].add(a)
+        return slot
+
+    def _detach(self, key, before, entry=None):
+        """
+        Cuts a tree edge. Returns the endpoint that lost its parent and whether the
+        edge was in the root's tree.
+        """
+        entry = entry if entry is not None else self._edges[key]
+        a, b = key
+        rooted = self._tree.connected(a + 1, self.root + 1)
+        child = b if self.parent[b] == a else a
+        before.setdefault(child, self.cost[child] if rooted else math.inf)
+        node = self.num_nodes + 1 + entry[1]
+        self._tree.cut(a + 1, node)
+        self._tree.cut(node, b + 1)
+        self._tree_adjacency[a].discard(b)
+        self._tree_adjacency[b].discard(a)
+        self._slot_edges[entry[1]] = None
+        self._free_slots.append(entry[1])
+        entry[1] = -1
+
+        self.parent[child] = -1
+        self.cost[child] = math.inf
+        return child, rooted
+
+    def _connect(self, key, weight, before, rooted=False):
+        """
+        Adds an edge between two different trees and returns its slot. The side
+        without the root is re-hung from the new edge: the parent pointers on its
+        path from the endpoint to its old top are reversed. rooted tells whether
+        that side was in the root's tree when the update began (it was split off
+        by _detach), which decides its nodes' shares before the update.
+        """
+        a, b = key
+        if self._tree.connected(a + 1, self.root + 1):
+            a, b = b, a
+        if not rooted and self._tree.connected(b + 1, self.root + 1):
+            # The whole side of a reaches the root for the first time
+            for node in self._component(a):
+                before.setdefault(node, math.inf)
+        node, parent, weight_up = a, b, weight
+        while node != -1:
+            before.setdefault(node, self.cost[node] if rooted else math.inf)
+            next_node, next_weight = self.parent[node], self.cost[node]
+            self.parent[node] = parent
+            self.cost[node] = weight_up
+            node, parent, weight_up = next_node, node, next_weight
+        return self._attach(key[0], key[1], weight)
+
+    def _insert(self, key, weight, before):
+        a, b = key
+        if not self._tree.connected(a + 1, b + 1):
+            self._edges[key][1] = self._connect(key, weight, before)
+            return
+        # Cycle property: the new edge replaces the heaviest edge on the tree path
+        heaviest = self._tree.path_max(a + 1, b + 1)
+        if self._tree.value[heaviest] <= weight:
+            self._spare_insert(weight, key)
+            return
+        old_key = self._slot_edges[heaviest - self.num_nodes - 1]
+        _, rooted = self._detach(old_key, before)
+        self._spare_insert(self._edges[old_key][0], old_key)
+        self._edges[key][1] = self._connect(key, weight, before, rooted)
+
+    def _smaller_side(self, a, b):
+        """
+        Nodes of the smaller of the two trees containing a and b, found by exploring
+        both in lockstep, so the cost is proportional to the smaller side.
+        """
+        queues = ([a], [b])
+        seen = ({a}, {b})
+        positions = [0, 0]
+        while True:
+            for side in (0, 1):
+                queue, members = queues[side], seen[side]
+                if positions[side] == len(queue):
+                    return members
+                node = queue[positions[side]]
+                positions[side] += 1
+                for neighbor in self._tree_adjacency[node]:
+                    if neighbor not in members:
+                        members.add(neighbor)
+                        queue.append(neighbor)
+
+    def _lightest_crossing(self, a, b):
+        """
+        Lightest non-tree edge across the cut that just separated a from b.
+        """
+        side = self._smaller_side(a, b)
+        local = sum(len(self._spare_adjacency[node]) for node in side)
+        # Light crossing edges usually come early in the sorted list; stop scanning
+        # once that has cost as much as looking at every edge leaving the side
+        for weight, x, y in self._spare[:local]:
+            if (x in side) != (y in side):
+                return weight, (x, y)
+
+        best = None
+        for node in side:
+            for neighbor, weight in self._spare_adjacency[node].items():
+                if neighbor not in side and (best is None or (weight, node, neighbor) < best):
+                    best = (weight, node, neighbor)
+        if best is None:
+            return None
+        weight, x, y = best
+        return weight, ((x, y) if x < y else (y, x))
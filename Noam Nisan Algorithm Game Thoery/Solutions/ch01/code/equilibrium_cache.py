@@ -0,0 +1,337 @@
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from zero_sum import normalize_payoffs
+
+def _canonical_order(A, B, rounds=4):
+    """
+    Row and column orders that make permuted copies of a game look alike: strategies
+    are first sorted by permutation-invariant signatures (their sorted payoffs), then
+    rows and columns are sorted by content in turn until the order settles.
+    """
+    rows = np.lexsort(np.hstack((np.sort(A, axis=1), np.sort(B, axis=1))).T[::-1])
+    cols = np.lexsort(np.hstack((np.sort(A, axis=0).T, np.sort(B, axis=0).T)).T[::-1])
+    for _ in range(rounds):
+        new_rows = rows[np.lexsort(np.hstack((A[np.ix_(rows, cols)], B[np.ix_(rows, cols)])).T[::-1])]
+        new_cols = cols[np.lexsort(np.vstack((A[np.ix_(new_rows, cols)], B[np.ix_(new_rows, cols)]))[::-1])]
+        if (new_rows == rows).all() and (new_cols == cols).all():
+            break
+        rows, cols = new_rows, new_cols
+    return rows, cols
+
+def canonical_bimatrix(matrix1, matrix2):
+    """
+    Canonical form of a bimatrix game up to positive affine payoff transformations,
+    strategy permutations and swapping the players.
+
+    Parameters:
+    matrix1 (np.array): Payoff matrix for player 1
+    matrix2 (np.array): Payoff matrix for player 2
+
+    Returns:
+    tuple: Canonical payoff matrices, the row and column orders applied and whether
+           the players were swapped
+    """
+    A, B = normalize_payoffs(matrix1), normalize_payoffs(matrix2)
+    candidates = []
+    for swapped, (first, second) in enumerate(((A, B), (B.T, A.T))):
+        rows, cols = _canonical_order(first, second)
+        first, second = first[np.ix_(rows, cols)], second[np.ix_(rows, cols)]
+        candidates.append((first.shape, first.tobytes() + second.tobytes(), first, second, rows, cols, bool(swapped)))
+    # Of the game and its player-swapped copy, keep whichever sorts first
+    _, _, first, second, rows, cols, swapped = min(candidates, key=lambda candidate: candidate[:2])
+    return first, second, rows, cols, swapped
+
+def game_key(namespace, arrays, **params):
+    """
+    Content hash of a canonical game and the solver parameters.
+
+    Parameters:
+    namespace (str): Name of the solver
+    arrays (list of np.array): Canonical payoff arrays
+    params: Solver options that change the result
+
+    Returns:
+    str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256(namespace.encode())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    for array in arrays:
+        array = np.ascontiguousarray(array, dtype=float)
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+def _to_canonical(x, y, rows, cols, swapped):
+    if swapped:
+        x, y = y, x
+    return np.asarray(x)[rows], np.asarray(y)[cols]
+
+def _from_canonical(x, y, rows, cols, swapped):
+    original_x = np.empty_like(x)
+    original_y = np.empty_like(y)
+    original_x[rows] = x
+    original_y[cols] = y
+    if swapped:
+        return original_y, original_x
+    return original_x, original_y
+
+class _NoneResult:
+    """
+    Stored in place of a None result, which get() could not tell from a miss.
+    """
+
+class EquilibriumCache:
+    """
+    Content-addressed cache of solver results. Games are reduced to a canonical form
+    and hashed, so repeated and isomorphic games (permuted strategies, rescaled
+    payoffs, swapped players) are solved once; results are stored in canonical
+    coordinates and mapped back to each caller's game.
+
+    Results are pickled into an in-memory LRU and, if a path is given, an SQLite
+    file shared between runs that evicts its least recently used entries once it
+    grows beyond max_bytes.
+    """
+
+    def __init__(self, path=None, max_entries=1024, max_bytes=2 ** 30):
+        """
+        Parameters:
+        path (str): SQLite file backing the cache (None keeps it in memory only)
+        max_entries (int): Number of results kept in memory
+        max_bytes (int): Size limit of the stored results on disk
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        # Last use of entries served from memory, written to the `used` column in batches
+        self._touched = {}
+        self._lock = threading.Lock()
+        self._connection = None
+        self._disk_bytes = 0
+        if path is not None:
+            self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            self._connection.execute("CREATE TABLE IF NOT EXISTS results "
+                                     "(key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+                                     "used INTEGER NOT NULL)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+            self._disk_bytes = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def close(self):
+        if self._connection is not None:
+            with self._lock:
+                self._flush_touched()
+            self._connection.close()
+            self._connection = None
+
+    def get(self, key):
+        """
+        Parameters:
+        key (str): Result key
+
+        Returns:
+        object: The stored result, or None if the key is unknown
+        """
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                if self._connection is not None:
+                    self._touched[key] = time.time_ns()
+            elif self._connection is not None:
+                row = self._connection.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    data = row[0]
+                    self._connection.execute("UPDATE results SET used = ? WHERE key = ?", (time.time_ns(), key))
+                    self._remember(key, data)
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        # Every caller gets its own copy, so mutating a result cannot corrupt the cache
+        return pickle.loads(data)
+
+    def put(self, key, value):
+        """
+        Parameters:
+        key (str): Result key
+        value (object): Picklable result
+        """
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._remember(key, data)
+            if self._connection is None:
+                return
+            self._flush_touched()
+            previous = self._connection.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            self._connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                                     (key, data, len(data), time.time_ns()))
+            self._disk_bytes += len(data) - (previous[0] if previous else 0)
+            if self._disk_bytes > self.max_bytes:
+                self._evict()
+
+    def _remember(self, key, data):
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _flush_touched(self):
+        """
+        Records the memory hits since the last flush on disk, so that eviction sees
+        which entries are really in use.
+        """
+        if self._touched:
+            self._connection.executemany("UPDATE results SET used = ? WHERE key = ?",
+                                         [(used, key) for key, used in self._touched.items()])
+            self._touched.clear()
+
+    def _evict(self):
+        """
+        Deletes the least recently used results until the store fits in max_bytes.
+        """
+        keys = []
+        for key, size in self._connection.execute("SELECT key, size FROM results ORDER BY used"):
+            if self._disk_bytes <= self.max_bytes:
+                break
+            keys.append((key,))
+            self._disk_bytes -= size
+        self._connection.executemany("DELETE FROM results WHERE key = ?", keys)
+
+    def _cached(self, key, compute):
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.put(key, _NoneResult() if result is None else result)
+            return result
+        return None if isinstance(result, _NoneResult) else result
+
+    def solve_nash_equilibrium(self, matrix1, matrix2, method="auto", exact=False):
+        """
+        Cached Q1.solve_nash_equilibrium.
+
+        Parameters:
+        matrix1 (np.array): Payoff matrix for player 1
+        matrix2 (np.array): Payoff matrix for player 2
+        method (str): "auto", "enumeration", "lemke-howson" or "minimax"
+        exact (bool): Compute in rational arithmetic and return Fractions
+
+        Returns:
+        dict: Nash equilibria found by each method
+        """
+        from Q1 import solve_nash_equilibrium
+
+        if matrix1.shape != matrix2.shape:
+            raise ValueError("The payoff matrices must have the same dimensions.")
+        A, B, rows, cols, swapped = canonical_bimatrix(matrix1, matrix2)
+
+        def compute():
+            result = solve_nash_equilibrium(matrix1, matrix2, method, exact)
+            return {name: [_to_canonical(x, y, rows, cols, swapped) for x, y in equilibria]
+                    for name, equilibria in result.items()}
+
+        canonical = self._cached(game_key("solve_nash_equilibrium", [A, B], method=method, exact=exact), compute)
+        return {name: [_from_canonical(x, y, rows, cols, swapped) for x, y in equilibria]
+                for name, equilibria in canonical.items()}
+
+    def epsilon_approximate_nash(self, payoff_matrix_1, payoff_matrix_2, epsilon=0.1, samples=32,
+                                 max_iterations=100000, seed=None):
+        """
+        Cached Q6.epsilon_approximate_nash. Epsilon is measured on payoffs rescaled to
+        [0, 1], so the achieved epsilon carries over to every isomorphic game.
+
+        Parameters:
+        payoff_matrix_1 (np.array): Payoff matrix for Player 1
+        payoff_matrix_2 (np.array): Payoff matrix for Player 2
+        epsilon (float): Approximation factor
+        samples (int): Number of k-uniform pairs drawn for every k
+        max_iterations (int): Maximum number of fictitious play rounds
+        seed (int): Seed for the sampling
+
+        Returns:
+        tuple: Approximate mixed strategy for both players and the achieved epsilon
+        """
+        from Q6 import epsilon_approximate_nash
+
+        if payoff_matrix_1.shape != payoff_matrix_2.shape:
+            raise ValueError("The payoff matrices must have the same dimensions.")
+        A, B, rows, cols, swapped = canonical_bimatrix(payoff_matrix_1, payoff_matrix_2)
+
+        def compute():
+            x, y, achieved = epsilon_approximate_nash(payoff_matrix_1, payoff_matrix_2, epsilon, samples,
+                                                      max_iterations, seed)
+            return _to_canonical(x, y, rows, cols, swapped) + (achieved,)
+
+        key = game_key("epsilon_approximate_nash", [A, B], epsilon=epsilon, samples=samples,
+                       max_iterations=max_iterations, seed=seed)
+        x, y, achieved = self._cached(key, compute)
+        return _from_canonical(x, y, rows, cols, swapped) + (achieved,)
+
+    def find_correlated_equilibrium(self, n, u_on, u_off, symmetric=False):
+        """
+        Cached Q5.find_correlated_equilibrium. Renaming "on" and "off" maps a game to
+        an isomorphic one with u_on'[k] = u_off[n - 1 - k], which shares the entry.
+
+        Parameters:
+        n (int): Number of players
+        u_on (list): Payoffs for "on" given k other players chose "on"
+        u_off (list): Payoffs for "off" given k other players chose "on"
+        symmetric (bool): Look for an anonymous equilibrium
+
+        Returns:
+        dict: Probability distribution as returned by find_correlated_equilibrium
+        """
+        from Q5 import find_correlated_equilibrium
+
+        if len(u_on) < n or len(u_off) < n:
+            raise ValueError("Payoffs are needed for k = 0, ..., n - 1 other players choosing 'on'.")
+        payoffs = normalize_payoffs(np.array([u_on[:n], u_off[:n]], dtype=float))
+        flipped_payoffs = payoffs[::-1, ::-1]
+        flipped = flipped_payoffs.tobytes() < payoffs.tobytes()
+
+        def flip(result):
+            # Relabelling complements every profile, or maps c players "on" to n - c
+            if not flipped or not isinstance(result, dict):
+                return result
+            if symmetric:
+                return {n - c: p for c, p in result.items()}
+            return {profile.translate(str.maketrans("01", "10")): p for profile, p in result.items()}
+
+        def compute():
+            return flip(find_correlated_equilibrium(n, u_on, u_off, symmetric))
+
+        key = game_key("find_correlated_equilibrium", [flipped_payoffs if flipped else payoffs], n=n,
+                       symmetric=symmetric)
+        result = flip(self._cached(key, compute))
+        if isinstance(result, dict):
+            # Keep the order find_correlated_equilibrium reports the profiles in
+            return dict(sorted(result.items(), key=lambda item: item[0] if symmetric else int(item[0], 2)))
+        return result
+
+    def analyze_bertrand_game(self, p_function, n_firms, **params):
+        """
+        Cached Q7.analyze_bertrand_game; demand functions are compared after sympy
+        parses them, so "1 - q" and "-q+1" share an entry.
+
+        Parameters:
+        p_function (str): Demand-price function as a string, e.g., "1 - q"
+        n_firms (int): Number of competing firms
+        params: Values of any other symbols in the demand function
+
+        Returns:
+        dict: Monopolist and competition total revenues
+        """
+        import sympy as sp
+        from Q7 import analyze_bertrand_game
+
+        key = game_key("analyze_bertrand_game", [], p_function=sp.srepr(sp.sympify(p_function)),
+                       n_firms=n_firms, params=params)
+        return self._cached(key, lambda: analyze_bertrand_game(p_function, n_firms, **params))
@@ -0,0 +1,129 @@
+import json
+import struct
+
+import numpy as np
+
+# File layout:
+#   8 bytes   magic
+#   8 bytes   little-endian length of the JSON header
+#   header    {"num_players", "shape", "dtype", "offsets"}
+#   blocks    one raw C-ordered payoff tensor per player, each aligned to ALIGNMENT bytes
+MAGIC = b"AGTGAME1"
+ALIGNMENT = 64
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def _write_header(f, num_players, shape, dtype):
+    """
+    Writes the header and returns the byte offset of every player's block.
+    """
+    dtype = np.dtype(dtype)
+    block_bytes = int(np.prod(shape)) * dtype.itemsize
+
+    # The offsets depend on the header length, so size the header with placeholders first
+    header = {"num_players": num_players, "shape": list(shape), "dtype": dtype.str,
+              "offsets": [0] * num_players}
+    placeholder = json.dumps(header).encode()
+    data_start = _align(len(MAGIC) + 8 + len(placeholder) + 20 * num_players)
+    header["offsets"] = [data_start + p * _align(block_bytes) for p in range(num_players)]
+
+    encoded = json.dumps(header).encode()
+    f.write(MAGIC)
+    f.write(struct.pack("<Q", len(encoded)))
+    f.write(encoded)
+    f.seek(header["offsets"][-1] + block_bytes - 1)
+    f.write(b"\0")
+    return header["offsets"]
+
+def read_header(path):
+    """
+    Reads the header of a stored game.
+
+    Parameters:
+    path (str): Path of the game file
+
+    Returns:
+    dict: Number of players, tensor shape, dtype string and block offsets
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a stored game file.")
+        (length,) = struct.unpack("<Q", f.read(8))
+        return json.loads(f.read(length))
+
+def create_game(path, shape, num_players=None, dtype=np.float64):
+    """
+    Creates an empty game file and returns writable memory maps to fill in place,
+    so games larger than RAM never have to be built in memory.
+
+    Parameters:
+    path (str): Path of the game file
+    shape (tuple): Payoff tensor shape, one axis per player
+    num_players (int): Number of payoff tensors (defaults to len(shape))
+    dtype (np.dtype): float32 or float64
+
+    Returns:
+    list: One writable np.memmap per player
+    """
+    shape = tuple(int(s) for s in shape)
+    if num_players is None:
+        num_players = len(shape)
+    if np.dtype(dtype) not in (np.dtype(np.float32), np.dtype(np.float64)):
+        raise ValueError("Payoffs must be stored as float32 or float64.")
+
+    with open(path, "wb") as f:
+        _write_header(f, num_players, shape, dtype)
+    return open_game(path, mode="r+")
+
+def save_game(path, payoff_tensors, dtype=np.float64, block_size=None):
+    """
+    Writes payoff tensors to a game file, copying them block by block.
+
+    Parameters:
+    path (str): Path of the game file
+    payoff_tensors (list of np.array): One payoff tensor per player (may be memory maps)
+    dtype (np.dtype): float32 or float64
+    block_size (int): Number of first-axis slices copied at a time
+    """
+    shape = payoff_tensors[0].shape
+    if any(tensor.shape != shape for tensor in payoff_tensors):
+        raise ValueError("All payoff tensors must have the same shape.")
+
+    stored = create_game(path, shape, len(payoff_tensors), dtype)
+    if block_size is None:
+        block_size = default_block_size(stored[0])
+    for target, tensor in zip(stored, payoff_tensors):
+        for start in range(0, shape[0], block_size):
+            target[start:start + block_size] = tensor[start:start + block_size]
+        target.flush()
+
+def open_game(path, mode="r"):
+    """
+    Opens a stored game without loading it into memory.
+
+    Parameters:
+    path (str): Path of the game file
+    mode (str): "r" for read-only, "r+" to modify payoffs in place
+
+    Returns:
+    list: One np.memmap payoff tensor per player
+    """
+    header = read_header(path)
+    shape = tuple(header["shape"])
+    return [np.memmap(path, dtype=np.dtype(header["dtype"]), mode=mode, offset=offset, shape=shape)
+            for offset in header["offsets"]]
+
+def default_block_size(tensor, max_block_bytes=2 ** 28):
+    """
+    Number of first-axis slices of a tensor that fit in a memory budget.
+
+    Parameters:
+    tensor (np.array): Payoff tensor (usually a np.memmap)
+    max_block_bytes (int): Memory budget for one block of one player
+
+    Returns:
+    int: Block size, at least 1
+    """
+    slice_bytes = tensor.itemsize * int(np.prod(tensor.shape[1:]))
+    return max(1, min(tensor.shape[0], max_block_bytes // max(1, slice_bytes)))
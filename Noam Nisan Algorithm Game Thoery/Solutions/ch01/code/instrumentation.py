@@ -0,0 +1,255 @@
+"""
+Low-overhead statistics for the solvers' hot paths: per-phase timers, event
+counters (support pairs tried, pivots, LP rows, ...) and maxima (tree depth).
+
+Recording is off by default, and each hook then costs one function call. It is on
+inside a `collect()` block, which also gathers what that block recorded:
+
+    from instrumentation import collect
+    with collect() as stats:
+        solve_nash_equilibrium(A, B)
+    print(stats.as_dict())
+
+or for the whole process with the environment variable SOLVER_STATS=1. While on,
+every record is also aggregated into process-wide histograms, exported with
+`export_json()` or `export_prometheus()`.
+
+Timers only cover work done in this process, not in worker processes. Counters
+and maxima recorded in a worker process reach this one only if the solver sends
+them back and passes them to `merge()`. Support enumeration records its counts in
+the parent, and the Lemke-Howson race merges the counts of its workers.
+"""
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Upper bounds (seconds) of the histogram buckets of phase timers
+BUCKETS = (1e-5, 1e-4, 1e-3, 1e-2, 0.1, 1.0, 10.0, 100.0, math.inf)
+
+_ENVIRONMENT = os.environ.get("SOLVER_STATS", "") not in ("", "0")
+_collectors = []
+_lock = threading.Lock()
+_NULL_TIMER = nullcontext()
+
+class SolverStats:
+    """
+    Timers, counters and maxima recorded during one collect() block.
+
+    Attributes:
+    timers (dict): Phase name -> {"count", "total", "max"} (seconds)
+    counters (dict): Event name -> total
+    maxima (dict): Gauge name -> largest value seen
+    """
+
+    def __init__(self):
+        self.timers = {}
+        self.counters = {}
+        self.maxima = {}
+
+    def __repr__(self):
+        return f"SolverStats(timers={len(self.timers)}, counters={self.counters}, maxima={self.maxima})"
+
+    def as_dict(self):
+        """
+        Returns:
+        dict: The timers, counters and maxima, ready for json.dumps
+        """
+        return {"timers": {name: dict(timer) for name, timer in self.timers.items()},
+                "counters": dict(self.counters), "maxima": dict(self.maxima)}
+
+    def _time(self, name, seconds):
+        timer = self.timers.get(name)
+        if timer is None:
+            self.timers[name] = {"count": 1, "total": seconds, "max": seconds}
+        else:
+            timer["count"] += 1
+            timer["total"] += seconds
+            timer["max"] = max(timer["max"], seconds)
+
+    def _count(self, name, value):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def _maximum(self, name, value):
+        if value > self.maxima.get(name, -math.inf):
+            self.maxima[name] = value
+
+class _Registry:
+    """
+    Process-wide aggregate of everything recorded while instrumentation is on.
+    """
+
+    def __init__(self):
+        self.stats = SolverStats()
+        # Phase name -> observation count per bucket of BUCKETS
+        self.histograms = {}
+
+    def observe(self, name, seconds):
+        self.stats._time(name, seconds)
+        counts = self.histograms.setdefault(name, [0] * len(BUCKETS))
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                counts[index] += 1
+                break
+
+_registry = _Registry()
+
+def enabled():
+    """
+    Returns:
+    bool: True if hooks currently record (SOLVER_STATS is set or collect() is active)
+    """
+    return _ENVIRONMENT or bool(_collectors)
+
+@contextmanager
+def collect():
+    """
+    Turns recording on for the block and yields a SolverStats that receives every
+    record made in the meantime (also by other threads of this process).
+
+    Yields:
+    SolverStats: Statistics of the block
+    """
+    stats = SolverStats()
+    with _lock:
+        _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        with _lock:
+            _collectors.remove(stats)
+
+def instrumented(function, *args, **kwargs):
+    """
+    Calls a solver and returns its statistics alongside the result.
+
+    Parameters:
+    function (callable): Solver to call
+    args, kwargs: Its arguments
+
+    Returns:
+    tuple: The solver's result and a SolverStats
+    """
+    with collect() as stats:
+        result = function(*args, **kwargs)
+    return result, stats
+
+def merge(stats):
+    """
+    Records the counters and maxima of a SolverStats gathered elsewhere, typically
+    by instrumented() in a worker process, as if they had been recorded here.
+
+    Parameters:
+    stats (SolverStats): Statistics to add
+    """
+    for name, value in stats.counters.items():
+        count(name, value)
+    for name, value in stats.maxima.items():
+        maximum(name, value)
+
+def timer(name):
+    """
+    Context manager timing one phase, a shared no-op when recording is off.
+
+    Parameters:
+    name (str): Phase name, e.g. "correlated_equilibrium.solve"
+    """
+    if not (_ENVIRONMENT or _collectors):
+        return _NULL_TIMER
+    return _timed(name)
+
+@contextmanager
+def _timed(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        with _lock:
+            _registry.observe(name, seconds)
+            for stats in _collectors:
+                stats._time(name, seconds)
+
+def count(name, value=1):
+    """
+    Adds to an event counter.
+
+    Parameters:
+    name (str): Counter name, e.g. "lemke_howson.pivots"
+    value (int): Amount to add
+    """
+    if not (_ENVIRONMENT or _collectors):
+        return
+    with _lock:
+        _registry.stats._count(name, value)
+        for stats in _collectors:
+            stats._count(name, value)
+
+def maximum(name, value):
+    """
+    Records a value of a gauge of which only the largest is kept.
+
+    Parameters:
+    name (str): Gauge name, e.g. "tree.depth"
+    value (float): Observed value
+    """
+    if not (_ENVIRONMENT or _collectors):
+        return
+    with _lock:
+        _registry.stats._maximum(name, value)
+        for stats in _collectors:
+            stats._maximum(name, value)
+
+def reset():
+    """
+    Clears the process-wide aggregate.
+    """
+    global _registry
+    with _lock:
+        _registry = _Registry()
+
+def export_json():
+    """
+    Returns:
+    str: JSON of the process-wide timers (with bucket counts), counters and maxima
+    """
+    with _lock:
+        report = _registry.stats.as_dict()
+        for name, counts in _registry.histograms.items():
+            report["timers"][name]["buckets"] = {("+Inf" if math.isinf(bound) else repr(bound)): total
+                                                 for bound, total in zip(BUCKETS, counts)}
+    return json.dumps(report, indent=2)
+
+def export_prometheus(prefix="game_solver"):
+    """
+    Process-wide statistics in the Prometheus text exposition format: one histogram
+    of phase durations, one counter and one gauge family.
+
+    Parameters:
+    prefix (str): Metric name prefix
+
+    Returns:
+    str: The metrics
+    """
+    lines = [f"# HELP {prefix}_phase_seconds Duration of solver phases.",
+             f"# TYPE {prefix}_phase_seconds histogram"]
+    with _lock:
+        stats = _registry.stats
+        for name, counts in sorted(_registry.histograms.items()):
+            cumulative = 0
+            for bound, total in zip(BUCKETS, counts):
+                cumulative += total
+                le = "+Inf" if math.isinf(bound) else repr(bound)
+                lines.append(f'{prefix}_phase_seconds_bucket{{phase="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}_phase_seconds_sum{{phase="{name}"}} {stats.timers[name]["total"]!r}')
+            lines.append(f'{prefix}_phase_seconds_count{{phase="{name}"}} {stats.timers[name]["count"]}')
+
+        lines += [f"# HELP {prefix}_events_total Events counted in solver hot paths.",
+                  f"# TYPE {prefix}_events_total counter"]
+        lines += [f'{prefix}_events_total{{event="{name}"}} {value}' for name, value in sorted(stats.counters.items())]
+        lines += [f"# HELP {prefix}_maximum Largest value seen of a solver gauge.",
+                  f"# TYPE {prefix}_maximum gauge"]
+        lines += [f'{prefix}_maximum{{gauge="{name}"}} {value}' for name, value in sorted(stats.maxima.items())]
+    return "\n".join(lines) + "\n"
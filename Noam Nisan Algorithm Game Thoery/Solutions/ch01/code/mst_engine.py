@@ -0,0 +1,312 @@
+import os
+
+import numpy as np
+
+from csr_graph import CSRGraph
+
+def kruskal(num_nodes, u, v, weights):
+    """
+    Kruskal's algorithm over edge arrays, with a union-find that uses path
+    compression and union by rank. Edges are sorted once with NumPy and the scan
+    stops as soon as the forest spans every node.
+
+    Parameters:
+    num_nodes (int): Number of nodes
+    u (np.array): First endpoint of every edge
+    v (np.array): Second endpoint of every edge
+    weights (np.array): Weight of every edge
+
+    Returns:
+    np.array: Indices of the minimum spanning forest's edges, in order of weight
+    """
+    order = np.argsort(weights, kind="stable")
+    # Plain lists index much faster than NumPy arrays inside the scalar loop
+    parent = list(range(num_nodes))
+    rank = [0] * num_nodes
+    chosen = []
+    for edge, a, b in zip(order.tolist(), np.asarray(u)[order].tolist(), np.asarray(v)[order].tolist()):
+        root_a = a
+        while parent[root_a] != root_a:
+            root_a = parent[root_a]
+        while parent[a] != root_a:
+            parent[a], a = root_a, parent[a]
+        root_b = b
+        while parent[root_b] != root_b:
+            root_b = parent[root_b]
+        while parent[b] != root_b:
+            parent[b], b = root_b, parent[b]
+        if root_a == root_b:
+            continue
+
+        if rank[root_a] < rank[root_b]:
+            root_a, root_b = root_b, root_a
+        parent[root_b] = root_a
+        if rank[root_a] == rank[root_b]:
+            rank[root_a] += 1
+        chosen.append(edge)
+        if len(chosen) == num_nodes - 1:
+            break
+    return np.array(chosen, dtype=np.int64)
+
+def prim(weights, root=0):
+    """
+    Prim's algorithm for a complete graph given by its dense weight matrix. Each step
+    reads one row, so the matrix may be a np.memmap larger than RAM; keeping the
+    best connection cost of every node in an array makes this O(n^2), which beats a
+    heap on dense graphs.
+
+    Parameters:
+    weights (np.array): Symmetric (n, n) weight matrix (np.inf for missing edges)
+    root (int): Node the tree is grown from
+
+    Returns:
+    tuple: Parent of every node (-1 for the root) and the weight of its parent edge
+    """
+    n = weights.shape[0]
+    best = np.array(weights[root], dtype=float)
+    parents = np.full(n, root, dtype=np.int64)
+    costs = np.zeros(n)
+    in_tree = np.zeros(n, dtype=bool)
+    in_tree[root] = True
+    parents[root] = -1
+    best[root] = np.inf
+
+    for _ in range(n - 1):
+        node = int(np.argmin(best))
+        if not np.isfinite(best[node]):
+            raise ValueError("The graph must be connected.")
+        costs[node] = best[node]
+        in_tree[node] = True
+        best[node] = np.inf
+
+        row = np.asarray(weights[node], dtype=float)
+        closer = (row < best) & ~in_tree
+        best[closer] = row[closer]
+        parents[closer] = node
+    return parents, costs
+
+def tree_parents(tree, root=0):
+    """
+    Orients a spanning tree towards a root.
+
+    Parameters:
+    tree (CSRGraph): Weighted spanning tree
+    root (int): Root node
+
+    Returns:
+    tuple: Parent of every node (-1 for the root) and the weight of its parent edge
+    """
+    indptr = tree.indptr.tolist()
+    indices = tree.indices.tolist()
+    weights = tree.weights.tolist() if tree.weights is not None else [1.0] * len(indices)
+    parents = [-2] * tree.num_nodes
+    costs = [0.0] * tree.num_nodes
+    parents[root] = -1
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        for position in range(indptr[node], indptr[node + 1]):
+            neighbor = indices[position]
+            if parents[neighbor] == -2:
+                parents[neighbor] = node
+                costs[neighbor] = weights[position]
+                stack.append(neighbor)
+    if -2 in parents:
+        raise ValueError("The graph must be connected.")
+    return np.array(parents, dtype=np.int64), np.array(costs)
+
+def minimum_spanning_tree(graph, root=0):
+    """
+    Minimum spanning tree rooted at `root`: Kruskal for a sparse CSRGraph, Prim for a
+    dense weight matrix of a complete graph.
+
+    Parameters:
+    graph (CSRGraph or np.array): Weighted graph
+    root (int): Root node
+
+    Returns:
+    tuple: Parent of every node (-1 for the root) and the weight of its parent edge
+    """
+    if not isinstance(graph, CSRGraph):
+        return prim(graph, root)
+
+    u, v, weights = graph.edges()
+    if weights is None:
+        weights = np.ones(len(u))
+    chosen = kruskal(graph.num_nodes, u, v, weights)
+    tree = CSRGraph.from_edges(graph.num_nodes, u[chosen], v[chosen], weights[chosen])
+    return tree_parents(tree, root)
+
+def bird_allocation(graph, root=0):
+    """
+    Bird's cost-sharing rule: every agent pays for the edge that connects it towards
+    the root in a minimum spanning tree. The shares add up to the MST cost and lie in
+    the core of the MST game.
+
+    Parameters:
+    graph (CSRGraph or np.array): Weighted graph (dense matrix for complete graphs)
+    root (int): Root node, which pays nothing
+
+    Returns:
+    tuple: Cost share of every node and the parent of every node in the tree
+    """
+    parents, costs = minimum_spanning_tree(graph, root)
+    return costs, parents
+
+def _insert_vertex(parents, parent_weights, order, star):
+    """
+    Adds a vertex to a minimum spanning tree in linear time (Chin and Houck). The new
+    MST only uses tree edges and the newcomer's edges `star`. Merging the subtrees
+    bottom-up closes one cycle per tree edge, and the heaviest edge of each cycle is
+    dropped.
+
+    Parameters:
+    parents (list): Parent of every member (-1 for member 0, the root)
+    parent_weights (list): Weight of every member's parent edge
+    order (list): Members with every parent before its children
+    star (list): Weight of the edge from the newcomer to every member
+
+    Returns:
+    tuple: parents, parent_weights and order of the new tree (the newcomer is member
+           len(parents)) and its cost minus the old tree's cost
+    """
+    k = len(parents)
+    # Heaviest edge on v's path to the newcomer in the merged tree so far: its weight
+    # and id, where id c >= 0 is c's parent edge and -1 - v is v's star edge
+    path_weight = list(star)
+    path_edge = [-1 - v for v in range(k)]
+    kept_tree = [True] * k
+    kept_star = [True] * k
+    change = sum(star)
+    for child in reversed(order[1:]):
+        parent = parents[child]
+        weight = parent_weights[child]
+        below = path_weight[child]
+        above = path_weight[parent]
+        if weight >= below and weight >= above:
+            dropped, change = child, change - weight
+        elif below >= above:
+            dropped, change = path_edge[child], change - below
+        else:
+            dropped, change = path_edge[parent], change - above
+            if weight >= below:
+                path_weight[parent], path_edge[parent] = weight, child
+            else:
+                path_weight[parent], path_edge[parent] = below, path_edge[child]
+        if dropped >= 0:
+            kept_tree[dropped] = False
+        else:
+            kept_star[-1 - dropped] = False
+
+    # Re-root the surviving edges at member 0
+    adjacency = [[] for _ in range(k + 1)]
+    for child in range(1, k):
+        if kept_tree[child]:
+            adjacency[child].append((parents[child], parent_weights[child]))
+            adjacency[parents[child]].append((child, parent_weights[child]))
+    for v in range(k):
+        if kept_star[v]:
+            adjacency[v].append((k, star[v]))
+            adjacency[k].append((v, star[v]))
+    new_parents = [-1] * (k + 1)
+    new_weights = [0.0] * (k + 1)
+    new_order = [0]
+    for node in new_order:
+        for neighbor, weight in adjacency[node]:
+            if neighbor != new_parents[node]:
+                new_parents[neighbor] = node
+                new_weights[neighbor] = weight
+                new_order.append(neighbor)
+    return new_parents, new_weights, new_order, change
+
+def _shapley_chunk(weights, root, permutations, seed):
+    """
+    Sums (and sums of squares of) the marginal costs of every agent over a number of
+    random arrival orders. The MST of the coalition is grown one arrival at a time
+    with _insert_vertex, so an order costs O(n^2) in total.
+    """
+    rng = np.random.default_rng(seed)
+    n = weights.shape[0]
+    agents = np.delete(np.arange(n), root)
+    totals = np.zeros(n)
+    squares = np.zeros(n)
+
+    for _ in range(permutations):
+        order = rng.permutation(agents)
+        # Coalition members are numbered by arrival: the root is 0, order[k] is k + 1
+        members = np.concatenate(([root], order))
+        parents, parent_weights, tree_order = [-1], [0.0], [0]
+        for k, agent in enumerate(order.tolist(), 1):
+            parents, parent_weights, tree_order, marginal = _insert_vertex(
+                parents, parent_weights, tree_order, weights[agent, members[:k]].tolist())
+            totals[agent] += marginal
+            squares[agent] += marginal * marginal
+    return totals, squares
+
+def shapley_cost_shares(weights, root=0, samples=1000, workers=1, seed=None, chunk_size=None):
+    """
+    Monte Carlo estimate of the Shapley value of the MST cost-sharing game, where a
+    coalition pays the cost of the MST connecting it to the root. Arrival orders are
+    sampled uniformly and every agent is charged its average marginal cost.
+
+    Every chunk of orders draws from its own stream spawned from one SeedSequence,
+    and the chunk size does not depend on the number of workers, so the estimate
+    is identical for any number of workers.
+
+    Parameters:
+    weights (np.array): Symmetric (n, n) weight matrix of a complete graph
+    root (int): Root node, which pays nothing
+    samples (int): Number of sampled arrival orders
+    workers (int): Number of worker processes (None uses all CPUs)
+    seed (int): Seed of the root SeedSequence
+    chunk_size (int): Number of orders per chunk (default keeps each chunk at
+                      roughly 2**20 edge relaxations)
+
+    Returns:
+    tuple: Estimated cost share of every node and its standard error
+    """
+    weights = np.asarray(weights, dtype=float)
+    if weights.ndim != 2 or weights.shape[0] != weights.shape[1]:
+        raise ValueError("The weight matrix must be square.")
+    off_diagonal = ~np.eye(len(weights), dtype=bool)
+    if not np.isfinite(weights[off_diagonal]).all():
+        raise ValueError("Shapley cost shares need a complete graph.")
+
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, 2 ** 20 // (len(weights) ** 2))
+    sizes = [chunk_size] * (samples // chunk_size)
+    if samples % chunk_size:
+        sizes.append(samples % chunk_size)
+    streams = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if workers == 1:
+        results = [_shapley_chunk(weights, root, size, stream) for size, stream in zip(sizes, streams)]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_shapley_chunk, [weights] * len(sizes), [root] * len(sizes),
+                                        sizes, streams))
+
+    totals = sum(result[0] for result in results)
+    squares = sum(result[1] for result in results)
+    shares = totals / samples
+    variance = np.maximum(squares / samples - shares ** 2, 0.0)
+    return shares, np.sqrt(variance / samples)
+
+def dense_weights(graph):
+    """
+    Dense weight matrix of a CSRGraph, with np.inf for missing edges.
+
+    Parameters:
+    graph (CSRGraph): Weighted graph
+
+    Returns:
+    np.array: (n, n) weight matrix with a zero diagonal
+    """
+    weights = np.full((graph.num_nodes, graph.num_nodes), np.inf)
+    np.fill_diagonal(weights, 0.0)
+    sources = np.repeat(np.arange(graph.num_nodes), graph.degree())
+    weights[sources, graph.indices] = 1.0 if graph.weights is None else graph.weights
+    return weights
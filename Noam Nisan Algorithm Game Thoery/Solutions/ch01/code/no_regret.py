@@ -0,0 +1,205 @@
+import numpy as np
+
+import instrumentation
+
+def _payoff_oracle(payoffs, num_actions):
+    """
+    (oracle, action counts) for payoff tensors or an oracle. An oracle is called as
+    oracle(player, profiles) with an (rows, players) integer array of action
+    profiles and returns that player's payoff in every row.
+    """
+    if callable(payoffs):
+        if num_actions is None:
+            raise ValueError("The number of actions of every player is needed with a payoff oracle.")
+        return payoffs, [int(count) for count in num_actions]
+
+    tensors = [np.asarray(tensor, dtype=float) for tensor in payoffs]
+    shape = tensors[0].shape
+    if len(shape) != len(tensors) or any(tensor.shape != shape for tensor in tensors):
+        raise ValueError("Every player needs a payoff tensor with one axis per player.")
+    return (lambda player, profiles: tensors[player][tuple(profiles.T)]), list(shape)
+
+class _ProfileCounter:
+    """
+    Visit counts of action profiles, with memory proportional to the number of
+    distinct profiles seen. Profiles are packed into one integer each (mixed radix)
+    when the profile space fits in int64, and kept as tuples otherwise; either way
+    a buffer of recent plays is collapsed with np.unique before merging into a dict.
+    """
+
+    def __init__(self, num_actions, buffer_size=2 ** 20):
+        self.num_actions = num_actions
+        self.buffer_size = buffer_size
+        self.counts = {}
+        self.buffer = []
+        self.buffered = 0
+        packed = 1
+        for count in num_actions:
+            packed *= count
+        self.radix = None
+        if packed < 2 ** 63:
+            self.radix = np.cumprod([1] + num_actions[:0:-1], dtype=np.int64)[::-1]
+
+    def add(self, profiles):
+        self.buffer.append(profiles @ self.radix if self.radix is not None else profiles.copy())
+        self.buffered += len(profiles)
+        if self.buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        if self.radix is not None:
+            keys, counts = np.unique(np.concatenate(self.buffer), return_counts=True)
+            keys = keys.tolist()
+        else:
+            rows, counts = np.unique(np.concatenate(self.buffer), axis=0, return_counts=True)
+            keys = [tuple(row) for row in rows.tolist()]
+        for key, count in zip(keys, counts.tolist()):
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.buffer = []
+        self.buffered = 0
+
+    def distribution(self):
+        """
+        Returns:
+        dict: Action profile (tuple) -> empirical probability
+        """
+        self.flush()
+        total = sum(self.counts.values())
+        if self.radix is None:
+            return {profile: count / total for profile, count in self.counts.items()}
+        codes = np.fromiter(self.counts, dtype=np.int64, count=len(self.counts))
+        profiles = (codes[:, None] // self.radix) % np.array(self.num_actions)
+        return {tuple(profile): count / total for profile, count in zip(profiles.tolist(), self.counts.values())}
+
+def regret_matching(payoffs, num_actions=None, rounds=10000, sequences=64, tol=None, seed=None, check_every=100):
+    """
+    Approximate correlated equilibrium of an N-player game by the regret-matching
+    dynamics of Hart and Mas-Colell: a player who just played j switches to k with
+    probability proportional to the positive part of its average conditional regret
+    for not having played k whenever it played j, and stays otherwise. The empirical
+    distribution of play converges to the set of correlated equilibria.
+
+    Many independent sequences are simulated at once. Only the N * A alternative
+    payoffs of the current profiles are evaluated in each round, and the empirical
+    distribution is stored sparsely, so memory grows with the profiles actually
+    visited and not with the A^N profile space.
+
+    The returned epsilon is exact for the returned distribution: it is the largest
+    gain any player could get from a conditional deviation "play k whenever told to
+    play j", computed from the same payoffs the dynamics saw.
+
+    Parameters:
+    payoffs (list or callable): One payoff tensor per player (axis p is player p's
+                                action), or an oracle(player, profiles) that returns
+                                the player's payoff for every row of an
+                                (rows, players) array of action profiles
+    num_actions (list): Number of actions of every player (required for an oracle)
+    rounds (int): Maximum number of rounds per sequence
+    sequences (int): Number of independent sequences simulated together
+    tol (float): Stop once epsilon is at most this (checked every check_every rounds)
+    seed (int): Seed for the random choices
+    check_every (int): Rounds between checks of tol
+
+    Returns:
+    tuple: Empirical distribution (dict: action profile tuple -> probability) and
+           its maximum conditional regret epsilon
+    """
+    if rounds < 1 or sequences < 1:
+        raise ValueError("At least one round and one sequence are needed.")
+    oracle, num_actions = _payoff_oracle(payoffs, num_actions)
+    rng = np.random.default_rng(seed)
+    players = len(num_actions)
+    profiles = np.column_stack([rng.integers(0, count, sequences) for count in num_actions])
+    batch = np.arange(sequences)
+    # regrets[i][b, j, k]: sequence b's summed gain of player i from playing k whenever it played j
+    regrets = [np.zeros((sequences, count, count)) for count in num_actions]
+    largest_gain = np.zeros(players)
+    counter = _ProfileCounter(num_actions)
+
+    for t in range(1, rounds + 1):
+        counter.add(profiles)
+        for player, count in enumerate(num_actions):
+            alternatives = np.repeat(profiles[:, None, :], count, axis=1)
+            alternatives[:, :, player] = np.arange(count)
+            values = np.asarray(oracle(player, alternatives.reshape(-1, players)), dtype=float)
+            values = values.reshape(sequences, count)
+            gain = values - values[batch, profiles[:, player]][:, None]
+            regrets[player][batch, profiles[:, player]] += gain
+            largest_gain[player] = max(largest_gain[player], np.abs(gain).max())
+
+        if tol is not None and t % check_every == 0 and _epsilon(regrets, sequences * t) <= tol:
+            break
+
+        # Hart-Mas-Colell switching: the inertia mu keeps the switching probabilities
+        # below 1/2 in total
+        uniform = rng.random((sequences, players))
+        for player, count in enumerate(num_actions):
+            if count == 1 or largest_gain[player] == 0:
+                continue
+            current = profiles[:, player]
+            mu = 2 * (count - 1) * largest_gain[player]
+            switch = np.maximum(regrets[player][batch, current], 0.0) / (t * mu)
+            switch[batch, current] = 0.0
+            switch[batch, current] = 1.0 - switch.sum(axis=1)
+            cumulative = np.cumsum(switch, axis=1)
+            profiles[:, player] = np.minimum((cumulative <= uniform[:, [player]]).sum(axis=1), count - 1)
+
+    instrumentation.count("regret_matching.rounds", t * sequences)
+    return counter.distribution(), _epsilon(regrets, sequences * t)
+
+def _epsilon(regrets, plays):
+    """
+    Maximum conditional regret of the pooled empirical distribution of all sequences.
+    """
+    return max(float(np.maximum(player_regrets.sum(axis=0), 0.0).max()) / plays for player_regrets in regrets)
+
+def max_conditional_regret(distribution, payoffs, num_actions=None):
+    """
+    Largest gain a player can get under a distribution over action profiles by a
+    conditional deviation "play k whenever recommended j"; the distribution is an
+    epsilon-correlated equilibrium for exactly this epsilon.
+
+    Parameters:
+    distribution (dict): Action profile tuple -> probability (sparse)
+    payoffs (list or callable): Payoff tensors or oracle, as for regret_matching
+    num_actions (list): Number of actions of every player (required for an oracle)
+
+    Returns:
+    float: The maximum conditional regret (0 for an exact correlated equilibrium)
+    """
+    oracle, num_actions = _payoff_oracle(payoffs, num_actions)
+    profiles = np.array(list(distribution), dtype=np.int64).reshape(len(distribution), len(num_actions))
+    probabilities = np.fromiter(distribution.values(), dtype=float, count=len(distribution))
+    epsilon = 0.0
+    for player, count in enumerate(num_actions):
+        alternatives = np.repeat(profiles[:, None, :], count, axis=1)
+        alternatives[:, :, player] = np.arange(count)
+        values = np.asarray(oracle(player, alternatives.reshape(-1, len(num_actions))), dtype=float)
+        values = values.reshape(len(profiles), count)
+        rows = np.arange(len(profiles))
+        gain = (values - values[rows, profiles[:, player]][:, None]) * probabilities[:, None]
+        # Sum the gains of deviating to k over the profiles recommending each j
+        conditional = np.zeros((count, count))
+        np.add.at(conditional, profiles[:, player], gain)
+        epsilon = max(epsilon, float(conditional.max()))
+    return epsilon
+
+if __name__ == "__main__":
+    # Chicken: the correlated equilibria put no weight on (dare, dare)
+    chicken = [np.array([[0, 7], [2, 6]]), np.array([[0, 2], [7, 6]])]
+    distribution, epsilon = regret_matching(chicken, rounds=5000, seed=0)
+    print("Chicken:", {profile: round(p, 3) for profile, p in sorted(distribution.items())}, "epsilon", epsilon)
+
+    # A 20-player coordination game with 4 actions, given by an oracle: each player
+    # earns the number of others who pick the same action, minus a private cost
+    rng = np.random.default_rng(0)
+    costs = rng.random((20, 4))
+
+    def coordination(player, profiles):
+        same = (profiles == profiles[:, [player]]).sum(axis=1) - 1
+        return same - costs[player, profiles[:, player]]
+
+    distribution, epsilon = regret_matching(coordination, [4] * 20, rounds=2000, sequences=32, seed=0)
+    print(f"20 players, 4 actions: {len(distribution)} profiles visited, epsilon {epsilon:.4f}")
@@ -0,0 +1,155 @@
+from functools import lru_cache
+
+import numpy as np
+
+@lru_cache(maxsize=4096)
+def _inverse_demand(p_function):
+    """
+    The inverse demand p(q) and its first two derivatives, compiled to NumPy
+    functions of (q, *parameters), and the names of the parameters.
+    """
+    import sympy as sp
+
+    q = sp.Symbol("q")
+    demand_function = sp.sympify(p_function)
+    parameters = tuple(sorted((symbol for symbol in demand_function.free_symbols if symbol != q),
+                              key=lambda symbol: symbol.name))
+    slope = sp.diff(demand_function, q)
+    functions = [_broadcasting(sp.lambdify((q,) + parameters, expression, "numpy"))
+                 for expression in (demand_function, slope, sp.diff(slope, q))]
+    return functions, tuple(symbol.name for symbol in parameters)
+
+def _broadcasting(function):
+    # lambdify returns plain scalars for constant expressions such as p'' of a linear demand
+    return lambda q, *params: np.broadcast_to(function(q, *params), np.shape(q))
+
+def _solve_decreasing(function, shape, tol, max_iterations):
+    """
+    Root of a decreasing function on [0, inf) for every market at once, by Newton
+    steps safeguarded with bisection. Markets where function(0) <= 0 get 0.
+
+    Parameters:
+    function (callable): Maps quantities of the given shape to (values, derivatives)
+    shape (tuple): Shape of the batch of markets
+    tol (float): Relative tolerance on the root
+    max_iterations (int): Maximum number of Newton/bisection steps
+
+    Returns:
+    np.array: The roots
+    """
+    low = np.zeros(shape)
+    high = np.ones(shape)
+    value, _ = function(low)
+    positive = value > 0
+    # Double the upper end until the function changes sign
+    for _ in range(1100):
+        growing = positive & (function(high)[0] > 0)
+        if not growing.any():
+            break
+        low = np.where(growing, high, low)
+        high = np.where(growing, 2 * high, high)
+
+    root = np.where(positive, (low + high) / 2, 0.0)
+    for _ in range(max_iterations):
+        value, derivative = function(root)
+        done = ~positive | (np.abs(value) <= tol * (1 + root)) | (high - low <= tol * (1 + high))
+        if done.all():
+            break
+        low = np.where(value > 0, root, low)
+        high = np.where(value > 0, high, root)
+        newton = root - value / derivative
+        inside = np.isfinite(newton) & (newton >= low) & (newton <= high)
+        root = np.where(done, root, np.where(inside, newton, (low + high) / 2))
+    return root
+
+def _cournot(demand, slope, curvature, costs, params, tol, max_iterations):
+    """
+    Cournot equilibrium of every market. For a total quantity Q, the first-order
+    condition p(Q) + q_i p'(Q) = c_i gives each firm's share q_i(Q), so the
+    equilibrium is the root of the single equation sum_i q_i(Q) = Q per market.
+    """
+    def aggregate(total):
+        dp = np.minimum(slope(total, *params), -1e-300)
+        margins = np.maximum(demand(total, *params)[:, None] - costs, 0.0)
+        margin = margins.sum(axis=1)
+        active = np.count_nonzero(margins, axis=1)
+        # Each active firm's share (p - c_i) / (-p') has slope -1 + (p - c_i) p'' / p'^2
+        return margin / -dp - total, margin * curvature(total, *params) / (dp * dp) - active - 1
+
+    total = _solve_decreasing(aggregate, costs.shape[:1], tol, max_iterations)
+    price = demand(total, *params)
+    dp = np.minimum(slope(total, *params), -1e-300)
+    quantities = np.maximum(price[:, None] - costs, 0.0) / -dp[:, None]
+    return quantities, price
+
+def oligopoly_equilibria(p_function, costs, tol=1e-12, max_iterations=100, **params):
+    """
+    Cournot and Bertrand equilibria of many markets with heterogeneous marginal costs,
+    compared with a monopoly run by the cheapest firm.
+
+    Cournot: every firm's first-order condition is solved at once by a safeguarded
+    Newton iteration on the total quantity. Bertrand (homogeneous goods): the cheapest
+    firm serves the whole market at the second-lowest cost, or at its monopoly price
+    if that is lower.
+
+    Parameters:
+    p_function (str): Inverse demand p(q) of the total quantity q, e.g. "a - b*q"
+    costs (np.array): (markets, firms) marginal costs; pad markets with fewer firms
+                      with np.inf
+    tol (float): Relative tolerance of the quantity solves
+    max_iterations (int): Maximum number of Newton/bisection steps
+    params: Values of the other symbols of p_function, scalars or (markets,) arrays
+
+    Returns:
+    dict: Per-market arrays: Cournot quantities (markets, firms), prices, total
+          incomes (profits) of each market form and the monopoly-vs-competition
+          ratios (NaN where competition earns nothing)
+    """
+    costs = np.asarray(costs, dtype=float)
+    if costs.ndim == 1:
+        costs = costs[None, :]
+    if costs.ndim != 2:
+        raise ValueError("Costs must be a (markets, firms) array.")
+    (demand, slope, curvature), names = _inverse_demand(p_function)
+    missing = [name for name in names if name not in params]
+    if missing:
+        raise ValueError(f"Values are needed for the demand parameters: {', '.join(missing)}.")
+    params = [np.broadcast_to(np.asarray(params[name], dtype=float), costs.shape[:1]) for name in names]
+
+    # Padded firms and demand functions singular at q = 0 produce harmless inf/NaN
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return _equilibria(demand, slope, curvature, costs, params, tol, max_iterations)
+
+def _equilibria(demand, slope, curvature, costs, params, tol, max_iterations):
+    quantities, cournot_price = _cournot(demand, slope, curvature, costs, params, tol, max_iterations)
+    cournot_income = ((cournot_price[:, None] - costs) * quantities).sum(axis=1, where=quantities > 0)
+
+    lowest = costs.min(axis=1)
+    second = np.partition(costs, 1, axis=1)[:, 1] if costs.shape[1] > 1 else np.full(len(costs), np.inf)
+    monopoly_quantity, monopoly_price = _cournot(demand, slope, curvature, lowest[:, None], params, tol,
+                                                 max_iterations)
+    monopoly_quantity = monopoly_quantity[:, 0]
+    monopoly_income = np.where(monopoly_quantity > 0, (monopoly_price - lowest) * monopoly_quantity, 0.0)
+
+    bertrand_price = np.minimum(second, monopoly_price)
+
+    def excess_price(total):
+        return demand(total, *params) - bertrand_price, slope(total, *params)
+
+    bertrand_quantity = _solve_decreasing(excess_price, costs.shape[:1], tol, max_iterations)
+    bertrand_income = np.where(bertrand_quantity > 0, (bertrand_price - lowest) * bertrand_quantity, 0.0)
+
+    cournot_ratio = np.where(cournot_income > 0, monopoly_income / cournot_income, np.nan)
+    bertrand_ratio = np.where(bertrand_income > 0, monopoly_income / bertrand_income, np.nan)
+    return {
+        "Cournot Quantities": quantities,
+        "Cournot Price": cournot_price,
+        "Cournot Income": cournot_income,
+        "Bertrand Price": bertrand_price,
+        "Bertrand Quantity": bertrand_quantity,
+        "Bertrand Income": bertrand_income,
+        "Monopoly Price": monopoly_price,
+        "Monopoly Income": monopoly_income,
+        "Monopoly vs. Cournot Ratio": cournot_ratio,
+        "Monopoly vs. Bertrand Ratio": bertrand_ratio,
+    }
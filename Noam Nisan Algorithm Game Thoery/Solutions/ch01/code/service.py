@@ -0,0 +1,383 @@
+"""
+Local HTTP service for the Q1-Q8 solvers, built on asyncio and the standard library.
+
+Every job runs in its own worker process, at most `workers` at a time. A job that
+overruns its deadline has its process killed, so a pathological game never holds
+a slot longer than its deadline. Jobs beyond the running ones wait in a bounded
+queue; when it is full, new jobs are turned away with 503 and a Retry-After
+header instead of piling up. Nash jobs solved by support enumeration stream every
+equilibrium as it is found, so a job that times out still returns the equilibria
+found so far.
+
+    python service.py --port 8750 --workers 4
+    python service.py --unix /tmp/solvers.sock
+
+Requests use the record formats of batch_solve.py, plus an optional "timeout" in
+seconds (counted from submission, capped by --max-timeout):
+
+    POST   /solve/<solver>   run a job and wait for it
+    POST   /jobs/<solver>    queue a job, answers 202 with its id
+    GET    /jobs/<id>        status, result, partial results or error of a job
+    DELETE /jobs/<id>        cancel a job, killing its worker
+    GET    /status           slots, queue length and job counts
+
+    curl -d '{"A": [[1, 0], [0, 1]], "B": [[1, 0], [0, 1]], "timeout": 5}' localhost:8750/solve/nash
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from batch_solve import SOLVERS, _json_default
+
+STATUS_TEXT = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 503: "Service Unavailable"}
+
+def _streams_equilibria(solver, record):
+    """
+    True for Nash jobs that run plain support enumeration, which can report
+    equilibria one by one. Under "auto", constant-sum games go to the minimax LP.
+    """
+    method = record.get("method", "auto")
+    if solver != "nash" or method not in ("auto", "enumeration") or record.get("exact", False):
+        return False
+    from zero_sum import is_strategically_constant_sum
+
+    return method == "enumeration" or not is_strategically_constant_sum(record["A"], record["B"])
+
+def _worker(solver, record, connection):
+    """
+    Body of a worker process: sends ("partial", json) messages while solving, then
+    ("done", json) or ("error", message).
+    """
+    try:
+        if _streams_equilibria(solver, record):
+            from Q1 import vertex_enumeration
+            from support_enumeration import iter_support_enumeration
+
+            A, B = np.asarray(record["A"]), np.asarray(record["B"])
+            if A.shape != B.shape:
+                raise ValueError("The payoff matrices must have the same dimensions.")
+            equilibria = []
+            for equilibrium in iter_support_enumeration(A, B):
+                equilibria.append(equilibrium)
+                connection.send(("partial", json.dumps(equilibrium, default=_json_default)))
+            # Same keys as solve_nash_equilibrium, which batch_solve's "nash" solver returns
+            result = {"Support Enumeration": equilibria, "Vertex Enumeration": vertex_enumeration(A, B)}
+        else:
+            result = SOLVERS[solver](record)
+        connection.send(("done", json.dumps(result, default=_json_default)))
+    except Exception as error:
+        connection.send(("error", str(error) or type(error).__name__))
+    finally:
+        connection.close()
+
+class Job:
+    """
+    One solve request and everything known about it so far.
+    """
+
+    def __init__(self, job_id, solver, record, deadline):
+        self.id = job_id
+        self.solver = solver
+        self.record = record
+        self.deadline = deadline
+        self.status = "queued"
+        self.result = None
+        self.partial = []
+        self.error = None
+        self.submitted = time.monotonic()
+        self.started = None
+        self.finished = None
+        self.process = None
+        # Task waiting for a slot and then running the job, and the timer that stops
+        # it if the deadline passes first
+        self.task = None
+        self.expiry = None
+        self.done = asyncio.Event()
+
+    def as_dict(self):
+        """
+        Returns:
+        dict: JSON-ready view of the job
+        """
+        now = time.monotonic()
+        view = {"id": self.id, "solver": self.solver, "status": self.status}
+        if self.result is not None:
+            view["result"] = self.result
+        if self.status != "done" and (self.partial or self.status in ("timeout", "cancelled")):
+            view["partial"] = self.partial
+        if self.error is not None:
+            view["error"] = self.error
+        view["queued_seconds"] = (self.started or self.finished or now) - self.submitted
+        if self.started is not None:
+            view["run_seconds"] = (self.finished or now) - self.started
+        return view
+
+class SolverService:
+    """
+    Schedules solve jobs on a bounded number of worker processes.
+    """
+
+    def __init__(self, workers=None, max_queue=64, default_timeout=30.0, max_timeout=300.0, keep_finished=1024,
+                 max_body=2 ** 24, start_method=None):
+        """
+        Parameters:
+        workers (int): Jobs run at the same time (None uses all CPUs)
+        max_queue (int): Jobs allowed to wait for a slot before new ones are refused
+        default_timeout (float): Deadline of jobs that do not set "timeout", in seconds
+        max_timeout (float): Largest deadline a job may ask for
+        keep_finished (int): Finished jobs kept for GET /jobs/<id>
+        max_body (int): Largest request body accepted, in bytes
+        start_method (str): multiprocessing start method (default: the platform's)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.default_timeout = default_timeout
+        self.max_timeout = max_timeout
+        self.keep_finished = keep_finished
+        self.max_body = max_body
+        self.jobs = OrderedDict()
+        self.counts = {"done": 0, "failed": 0, "timeout": 0, "cancelled": 0, "rejected": 0}
+        self._context = multiprocessing.get_context(start_method)
+        self._slots = None
+        self._ids = itertools.count(1)
+        self._queued = 0
+        self._running = 0
+
+    def submit(self, solver, record):
+        """
+        Queues a job unless the queue is full.
+
+        Parameters:
+        solver (str): Name of a solver in batch_solve.SOLVERS
+        record (dict): Input record; an optional "timeout" sets the deadline
+
+        Returns:
+        Job: The queued job, or None if it was refused
+        """
+        if solver not in SOLVERS:
+            raise ValueError(f"Unknown solver: {solver}")
+        if self._queued >= self.max_queue:
+            self.counts["rejected"] += 1
+            return None
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+
+        record = dict(record)
+        timeout = min(float(record.pop("timeout", self.default_timeout)), self.max_timeout)
+        job = Job(str(next(self._ids)), solver, record, time.monotonic() + timeout)
+        self.jobs[job.id] = job
+        self._queued += 1
+        loop = asyncio.get_running_loop()
+        job.task = loop.create_task(self._run(job))
+        job.expiry = loop.call_later(timeout, self._dequeue, job, "timeout",
+                                     "The deadline passed while the job was queued.")
+        return job
+
+    def cancel(self, job_id):
+        """
+        Cancels a queued or running job, killing its worker process.
+
+        Returns:
+        Job: The job, or None if the id is unknown
+        """
+        job = self.jobs.get(job_id)
+        if job is not None and job.status == "queued":
+            self._dequeue(job, "cancelled")
+        elif job is not None:
+            self._finish(job, "cancelled")
+        return job
+
+    def status(self):
+        """
+        Returns:
+        dict: Slots, queue length and counts of finished jobs
+        """
+        return {"workers": self.workers, "running": self._running, "queued": self._queued,
+                "max_queue": self.max_queue, **self.counts}
+
+    def _finish(self, job, status, result=None, error=None):
+        if job.done.is_set():
+            return
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished = time.monotonic()
+        if job.process is not None and job.process.is_alive():
+            job.process.kill()
+        self.counts[status] += 1
+        job.done.set()
+
+        # Forget the oldest finished jobs beyond keep_finished
+        finished = [key for key, old in self.jobs.items() if old.done.is_set()]
+        for key in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self.jobs[key]
+
+    def _dequeue(self, job, status, error=None):
+        """
+        Stops a job that is still waiting for a slot and frees its place in the queue
+        at once. A job is "queued" exactly while its task waits in acquire(), and the
+        semaphore hands back a slot granted to a task cancelled before it resumed.
+        """
+        if job.status != "queued":
+            return
+        job.expiry.cancel()
+        job.task.cancel()
+        self._queued -= 1
+        self._finish(job, status, error=error)
+
+    async def _run(self, job):
+        # Cancelled by _dequeue if the job is cancelled or expires while it waits
+        await self._slots.acquire()
+        job.expiry.cancel()
+        self._queued -= 1
+        try:
+            if not job.done.is_set():
+                self._running += 1
+                try:
+                    await self._execute(job)
+                finally:
+                    self._running -= 1
+        finally:
+            self._slots.release()
+
+    async def _execute(self, job):
+        loop = asyncio.get_running_loop()
+        receiver, sender = self._context.Pipe(duplex=False)
+        job.process = self._context.Process(target=_worker, args=(job.solver, job.record, sender), daemon=True)
+        job.started = time.monotonic()
+        job.status = "running"
+        job.process.start()
+        sender.close()
+
+        def receive():
+            try:
+                kind, payload = receiver.recv()
+            except (EOFError, OSError):
+                loop.remove_reader(receiver.fileno())
+                self._finish(job, "failed", error=f"The worker exited with code {job.process.exitcode}.")
+                return
+            if kind == "partial":
+                job.partial.append(json.loads(payload))
+            elif kind == "done":
+                self._finish(job, "done", result=json.loads(payload))
+            else:
+                self._finish(job, "failed", error=payload)
+
+        loop.add_reader(receiver.fileno(), receive)
+        try:
+            await asyncio.wait_for(job.done.wait(), job.deadline - time.monotonic())
+        except asyncio.TimeoutError:
+            self._finish(job, "timeout", error="The job ran past its deadline and was stopped.")
+        finally:
+            loop.remove_reader(receiver.fileno())
+            receiver.close()
+            # Reap the (finished or killed) worker without blocking the event loop
+            await loop.run_in_executor(None, job.process.join)
+
+    async def handle(self, reader, writer):
+        """
+        Serves one HTTP/1.1 request per connection.
+        """
+        try:
+            status, body, headers = await self._respond(reader)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as error:
+            status, body, headers = 400, {"error": str(error) or "Malformed request."}, {}
+        payload = json.dumps(body, default=_json_default).encode()
+        head = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}", "Content-Type: application/json",
+                f"Content-Length: {len(payload)}", "Connection: close"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        try:
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + payload)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) < 2:
+            raise ValueError("Malformed request line.")
+        method, path = request_line[0], request_line[1].split("?")[0]
+        length = 0
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        if length > self.max_body:
+            return 413, {"error": f"Request bodies are limited to {self.max_body} bytes."}, {}
+        body = await reader.readexactly(length) if length else b""
+
+        parts = [part for part in path.split("/") if part]
+        if parts == ["status"] and method == "GET":
+            return 200, self.status(), {}
+        if len(parts) != 2 or parts[0] not in ("solve", "jobs"):
+            return 404, {"error": f"No such resource: {path}"}, {}
+
+        if parts[0] == "jobs" and method in ("GET", "DELETE"):
+            job = self.jobs.get(parts[1]) if method == "GET" else self.cancel(parts[1])
+            if job is None:
+                return 404, {"error": f"Unknown job: {parts[1]}"}, {}
+            return 200, job.as_dict(), {}
+        if method != "POST":
+            return 405, {"error": f"{method} is not supported on {path}"}, {}
+
+        if parts[1] not in SOLVERS:
+            return 404, {"error": f"Unknown solver: {parts[1]}"}, {}
+        record = json.loads(body or b"{}")
+        if not isinstance(record, dict):
+            raise ValueError("The request body must be a JSON object.")
+        job = self.submit(parts[1], record)
+        if job is None:
+            return 503, {"error": "The job queue is full; retry later."}, {"Retry-After": "1"}
+        if parts[0] == "jobs":
+            return 202, {"id": job.id, "status": job.status}, {}
+        await job.done.wait()
+        return 200, job.as_dict(), {}
+
+    async def serve(self, host="127.0.0.1", port=8750, unix_path=None):
+        """
+        Serves requests until cancelled.
+
+        Parameters:
+        host (str): Address to listen on
+        port (int): TCP port
+        unix_path (str): Listen on this Unix socket instead of TCP
+        """
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self.handle, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the solvers over HTTP with deadlines and a bounded queue.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8750)
+    parser.add_argument("--unix", help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=None, help="Jobs run at the same time (default: all CPUs)")
+    parser.add_argument("--max-queue", type=int, default=64, help="Waiting jobs before new ones get 503")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Default job deadline in seconds")
+    parser.add_argument("--max-timeout", type=float, default=300.0, help="Largest deadline a job may ask for")
+    args = parser.parse_args(argv)
+
+    service = SolverService(args.workers, args.max_queue, args.timeout, args.max_timeout)
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Side-effect-free entry point for the Q1-Q8 solvers:
+
+    from solvers import solve_nash_equilibrium, find_correlated_equilibrium
+
+Nothing but this table is loaded at import time. Each solver's module, and the
+heavy dependency it needs (nashpy, scipy, sympy, networkx), is imported the first
+time the solver is accessed.
+"""
+import importlib
+
+# Public name -> module that defines it
+_EXPORTS = {
+    "solve_nash_equilibrium": "Q1",
+    "lemke_howson": "Q1",
+    "lemke_howson_first": "Q1",
+    "exact_vertex_enumeration": "Q1",
+    "batch_pure_nash_equilibria": "Q2",
+    "has_pure_nash_equilibrium": "Q2",
+    "estimate_pure_nash_probability": "Q2",
+    "iter_pure_nash_estimates": "Q2",
+    "parallel_estimate_pure_nash_probability": "Q2",
+    "find_pure_nash_equilibria_blocked": "Q2",
+    "find_pure_nash_equilibria": "Q3",
+    "find_pure_nash_equilibria_from_file": "Q3",
+    "find_nash_equilibrium_three_player": "Q3",
+    "find_pure_nash_tree": "Q4",
+    "find_pure_nash_tree_profile": "Q4",
+    "find_pure_nash_graph_profile": "Q4",
+    "find_correlated_equilibrium": "Q5",
+    "approximate_correlated_equilibrium": "Q5",
+    "onoff_payoff_oracle": "Q5",
+    "epsilon_approximate_nash": "Q6",
+    "fictitious_play": "Q6",
+    "measured_epsilon": "Q6",
+    "sample_small_support": "Q6",
+    "analyze_bertrand_game": "Q7",
+    "bertrand_revenue_curves": "Q7",
+    "total_income_monopoly": "Q7",
+    "total_income_competition": "Q7",
+    "oligopoly_equilibria": "oligopoly",
+    "compute_mst_cost_sharing": "Q8",
+    "dynamic_mst_cost_sharing": "Q8",
+    "support_enumeration": "support_enumeration",
+    "iter_support_enumeration": "support_enumeration",
+    "iterated_elimination": "support_enumeration",
+    "create_game": "game_store",
+    "open_game": "game_store",
+    "read_header": "game_store",
+    "save_game": "game_store",
+    "CSRGraph": "csr_graph",
+    "kruskal": "mst_engine",
+    "prim": "mst_engine",
+    "minimum_spanning_tree": "mst_engine",
+    "bird_allocation": "mst_engine",
+    "shapley_cost_shares": "mst_engine",
+    "DynamicMST": "dynamic_mst",
+    "EquilibriumCache": "equilibrium_cache",
+    "canonical_bimatrix": "equilibrium_cache",
+    "is_constant_sum": "zero_sum",
+    "is_strategically_constant_sum": "zero_sum",
+    "normalize_payoffs": "zero_sum",
+    "solve_zero_sum": "zero_sum",
+    "solve_zero_sum_lp": "zero_sum",
+    "optimistic_mwu": "zero_sum",
+    "regret_matching": "no_regret",
+    "max_conditional_regret": "no_regret",
+    "best_response_dynamics": "best_response",
+    "is_exact_potential": "best_response",
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return __all__
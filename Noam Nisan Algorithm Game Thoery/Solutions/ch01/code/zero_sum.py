@@ -0,0 +1,212 @@
+import numpy as np
+
+import instrumentation
+
+def is_constant_sum(*payoffs, tol=1e-9):
+    """
+    Checks whether the players' payoffs add up to the same constant in every
+    strategy profile. Constant-sum games are strategically zero-sum: subtracting the
+    constant from one player's payoffs changes no best response.
+
+    Parameters:
+    payoffs (np.array): One payoff matrix or tensor per player, all of the same shape
+    tol (float): Tolerance relative to the largest absolute payoff
+
+    Returns:
+    bool: True if the game is constant-sum
+    """
+    payoffs = [np.asarray(payoff, dtype=float) for payoff in payoffs]
+    if len(payoffs) < 2:
+        raise ValueError("At least two payoff arrays are needed.")
+    if any(payoff.shape != payoffs[0].shape for payoff in payoffs):
+        raise ValueError("The payoff arrays must have the same dimensions.")
+    total = sum(payoffs)
+    if total.size == 0:
+        return True
+    scale = 1.0 + max(np.abs(payoff).max() for payoff in payoffs)
+    return bool(np.ptp(total) <= tol * scale)
+
+def normalize_payoffs(payoffs):
+    """
+    Maps payoffs affinely onto [0, 1] (positive affine transformations do not change
+    best responses) and rounds away floating-point noise, so games that differ only
+    by such a rescaling give identical arrays.
+
+    Parameters:
+    payoffs (np.array): Payoffs of one player
+
+    Returns:
+    np.array: Rescaled payoffs (all zero if the payoffs are constant)
+    """
+    payoffs = np.asarray(payoffs, dtype=float)
+    if payoffs.size == 0:
+        return payoffs.copy()
+    low, high = payoffs.min(), payoffs.max()
+    if high == low:
+        return np.zeros_like(payoffs)
+    # Adding 0.0 turns -0.0 into 0.0, which has different bytes
+    return np.round((payoffs - low) / (high - low), 12) + 0.0
+
+def is_strategically_constant_sum(matrix1, matrix2, tol=1e-9):
+    """
+    Checks whether a bimatrix game becomes constant-sum once each player's payoffs
+    are rescaled by a positive affine map, e.g. (A, -2A). Such games have the same
+    equilibria as the zero-sum game of player 1's rescaled payoffs. With two players
+    rescaling both onto [0, 1] decides it: the rescaled payoffs must add up to 1.
+
+    Parameters:
+    matrix1 (np.array): Payoff matrix for player 1
+    matrix2 (np.array): Payoff matrix for player 2
+    tol (float): Tolerance on the rescaled payoffs
+
+    Returns:
+    bool: True if the game is constant-sum up to rescaling
+    """
+    return is_constant_sum(normalize_payoffs(matrix1), normalize_payoffs(matrix2), tol=tol)
+
+def solve_zero_sum_lp(payoff_matrix):
+    """
+    Minimax strategies of the zero-sum game in which the row player receives
+    payoff_matrix and the column player its negative, from a single linear program
+    solved with HiGHS: the row player maximizes v subject to x^T A >= v and x in the
+    simplex. The column player's optimal strategy is read from the duals of those
+    constraints, so no second solve is needed.
+
+    Parameters:
+    payoff_matrix (np.array): (m, n) payoffs of the row player
+
+    Returns:
+    tuple: Optimal mixed strategy of both players and the value of the game
+    """
+    from scipy.optimize import linprog
+
+    A = np.asarray(payoff_matrix, dtype=float)
+    m, n = A.shape
+    objective = np.zeros(m + 1)
+    objective[-1] = -1.0
+    # Columns: v - (x^T A)_j <= 0 for every column j
+    inequalities = np.hstack((-A.T, np.ones((n, 1))))
+    equality = np.ones((1, m + 1))
+    equality[0, -1] = 0.0
+    instrumentation.count("minimax.lp_rows", n + 1)
+    with instrumentation.timer("minimax.solve"):
+        result = linprog(objective, A_ub=inequalities, b_ub=np.zeros(n), A_eq=equality, b_eq=[1.0],
+                         bounds=[(0, None)] * m + [(None, None)], method="highs")
+    if result.status != 0:
+        raise ValueError(f"The minimax linear program failed: {result.message}")
+
+    x = np.maximum(result.x[:m], 0.0)
+    y = np.maximum(-result.ineqlin.marginals, 0.0)
+    return x / x.sum(), y / y.sum(), float(result.x[-1])
+
+def optimistic_mwu(payoff_matrix, tol=1e-4, max_iterations=10000, step=1.0, scale=None):
+    """
+    Optimistic multiplicative weights for a zero-sum game: both players run Hedge
+    with the last payoff vector counted twice, which makes the iterates converge at
+    rate O(1/T) instead of O(1/sqrt(T)). The payoff matrix is only used through the
+    products A @ y and A.T @ x, so it can be a np.memmap, a scipy sparse matrix or a
+    scipy LinearOperator.
+
+    The duality gap max_i (A y)_i - min_j (x^T A)_j bounds how much either player can
+    gain by deviating. It is tracked for the last and for the average iterate (whose
+    payoff vectors are the running means of the ones already computed) and the
+    better pair is returned.
+
+    Parameters:
+    payoff_matrix (array-like): (m, n) payoffs of the row player
+    tol (float): Target duality gap, relative to the payoff range
+    max_iterations (int): Maximum number of rounds
+    step (float): Learning rate on payoffs rescaled to [0, 1]
+    scale (float): Payoff range max(A) - min(A), needed for a LinearOperator
+
+    Returns:
+    tuple: Mixed strategy of both players and their duality gap
+    """
+    A = payoff_matrix
+    m, n = A.shape
+    if scale is None:
+        scale = float(A.max() - A.min())
+    if scale == 0:
+        return np.full(m, 1 / m), np.full(n, 1 / n), 0.0
+
+    x = np.full(m, 1 / m)
+    y = np.full(n, 1 / n)
+    log_x = np.zeros(m)
+    log_y = np.zeros(n)
+    sum_x, sum_y = np.zeros(m), np.zeros(n)
+    sum_row, sum_col = np.zeros(m), np.zeros(n)
+    row_payoffs = np.asarray(A @ y, dtype=float).ravel() / scale
+    col_payoffs = np.asarray(A.T @ x, dtype=float).ravel() / scale
+    # The first round has no earlier payoffs to correct, so it is a plain Hedge step
+    previous_row, previous_col = row_payoffs, col_payoffs
+    best = None
+    for t in range(1, max_iterations + 1):
+        sum_x += x
+        sum_y += y
+        sum_row += row_payoffs
+        sum_col += col_payoffs
+        for gap, pair in ((row_payoffs.max() - col_payoffs.min(), (x, y)),
+                          ((sum_row.max() - sum_col.min()) / t, (sum_x / t, sum_y / t))):
+            if best is None or gap < best[2]:
+                best = (pair[0], pair[1], gap)
+        if best[2] <= tol:
+            break
+
+        log_x += step * (2 * row_payoffs - previous_row)
+        log_y -= step * (2 * col_payoffs - previous_col)
+        previous_row, previous_col = row_payoffs, col_payoffs
+        x = np.exp(log_x - log_x.max())
+        x /= x.sum()
+        y = np.exp(log_y - log_y.max())
+        y /= y.sum()
+        row_payoffs = np.asarray(A @ y, dtype=float).ravel() / scale
+        col_payoffs = np.asarray(A.T @ x, dtype=float).ravel() / scale
+
+    instrumentation.count("minimax.mwu_rounds", t)
+    x, y, gap = best
+    return x.copy(), y.copy(), gap * scale
+
+def solve_zero_sum(payoff_matrix, method="auto", tol=1e-4, max_iterations=10000):
+    """
+    Equilibrium of a zero-sum (or constant-sum) game in which the row player
+    receives payoff_matrix.
+
+    Parameters:
+    payoff_matrix (array-like): (m, n) payoffs of the row player
+    method (str): "lp" for the exact HiGHS minimax solve, "mwu" for optimistic
+                  multiplicative weights, or "auto" to use the LP up to 2^22 payoff
+                  entries and multiplicative weights beyond
+    tol (float): Target duality gap of "mwu", relative to the payoff range
+    max_iterations (int): Maximum number of "mwu" rounds
+
+    Returns:
+    tuple: Mixed strategy of both players, the value of the game (for the row
+           player) and the duality gap
+    """
+    m, n = payoff_matrix.shape
+    if method == "auto":
+        method = "lp" if m * n <= 2 ** 22 and isinstance(payoff_matrix, np.ndarray) else "mwu"
+    if method == "lp":
+        A = np.asarray(payoff_matrix, dtype=float)
+        x, y, value = solve_zero_sum_lp(A)
+        gap = float(max((A @ y).max() - (x @ A).min(), 0.0))
+        return x, y, value, gap
+    if method != "mwu":
+        raise ValueError(f"Unknown method: {method}")
+
+    x, y, gap = optimistic_mwu(payoff_matrix, tol, max_iterations)
+    value = float(x @ np.asarray(payoff_matrix @ y, dtype=float).ravel())
+    return x, y, value, gap
+
+if __name__ == "__main__":
+    # Rock-paper-scissors has value 0 and the uniform mix as its unique equilibrium
+    rps = np.array([[0, -1, 1], [1, 0, -1], [-1, 1, 0]])
+    print("Constant-sum:", is_constant_sum(rps, -rps))
+    x, y, value, gap = solve_zero_sum(rps, method="lp")
+    print("LP:", np.round(x, 4), np.round(y, 4), "value", round(value, 6), "gap", gap)
+    x, y, value, gap = solve_zero_sum(rps, method="mwu")
+    print("MWU:", np.round(x, 4), np.round(y, 4), "value", round(value, 6), "gap", gap)
+
+    A = np.random.default_rng(0).standard_normal((500, 500))
+    x, y, value, gap = solve_zero_sum(A)
+    print("500x500 random game: value", round(value, 6), "gap", gap)